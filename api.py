@@ -3,40 +3,83 @@ REST API for Hybrid AI-Based Multi-Language Syntax Error Detection System
 FastAPI-based API for integration with external tools and CI/CD pipelines
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
 
 
 import uvicorn
 from dotenv import load_dotenv
 import os
 import logging
+import tarfile
+import zipfile
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
+try:
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # pragma: no cover - optional multipart support
+    MultipartParser = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 from src.error_engine import detect_errors
+from src.multi_error_detector import detect_all_errors
 from src.auto_fix import AutoFixer
 from src.quality_analyzer import CodeQualityAnalyzer
+from src.api_codec import FastJSONResponse, CompressionMiddleware
+from src.stream_checker import StreamingChecker, DEFAULT_MAX_ISSUES
+from src.scan_jobs import get_job_manager, shutdown_job_manager
+from src.warmup import is_ready, warmup_in_background
+from src.admission import AdmissionMiddleware
+from src.diff_checker import check_diff, DEFAULT_CONTEXT
 
 
 load_dotenv()
 
+# Streaming uploads (/check/stream)
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_STREAM_BYTES = int(os.getenv("API_MAX_STREAM_BYTES", 50 * 1024 * 1024))
+
+# Diff-only checks (/check-diff): diff plus base files
+MAX_DIFF_BYTES = int(os.getenv("API_MAX_DIFF_BYTES", 20 * 1024 * 1024))
+
+# Archive scan jobs (/jobs)
+MAX_ARCHIVE_BYTES = int(os.getenv("API_MAX_ARCHIVE_BYTES", 200 * 1024 * 1024))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm models/pipeline without blocking startup; /ready reports when done.
+    # Workers forked by start_api.py's preload mode are already warm.
+    if not is_ready():
+        warmup_in_background()
+    # Resume archive scans left unfinished by a previous run
+    if os.getenv("SCAN_JOBS_RESUME", "true").lower() == "true":
+        get_job_manager()
+    yield
+    shutdown_job_manager()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Multi-Language Syntax Error Detection API",
     description="AI-powered multi-language syntax error detection and auto-fix API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
-# Add SlowAPI rate limiter
+# Add SlowAPI rate limiter (request counts; payload-weighted admission is below)
 limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -50,12 +93,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/zstd response compression (Accept-Encoding) and compressed request bodies
+app.add_middleware(CompressionMiddleware)
+
+# Byte-weighted token-bucket admission with interactive/bulk priority lanes.
+# Added last so it runs first and rejects before any body is read.
+app.add_middleware(AdmissionMiddleware)
+
 
 # Request/Response Models
 class CodeCheckRequest(BaseModel):
     code: str = Field(..., description="Source code to check for errors")
     filename: Optional[str] = Field(None, description="Optional filename for language detection")
     language: Optional[str] = Field(None, description="Optional language override (Python, Java, C, C++)")
+    recover: bool = Field(False, description="Report every independent syntax error, not only the first (Python)")
     
     class Config:
         json_schema_extra = {
@@ -96,6 +147,25 @@ class QualityCheckRequest(BaseModel):
         }
 
 
+class DiffCheckRequest(BaseModel):
+    diff: str = Field(..., description="Unified diff (git diff or diff -u)")
+    base_files: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Content of each modified file before the change, keyed by its old path"
+    )
+    context: int = Field(DEFAULT_CONTEXT, ge=0, le=1000,
+                         description="Lines around a change in which whole-file findings are reported")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "diff": "--- a/app.py\n+++ b/app.py\n@@ -1,2 +1,2 @@\n-def run():\n+def run()\n     pass\n",
+                "base_files": {"app.py": "def run():\n    pass\n"},
+                "context": 3
+            }
+        }
+
+
 class ErrorResponse(BaseModel):
     language: str
     predicted_error: str
@@ -121,6 +191,52 @@ class QualityResponse(BaseModel):
     suggestions: List[str]
 
 
+class StreamCheckResponse(BaseModel):
+    language: str
+    predicted_error: str
+    tutor: Dict[str, str]
+    issues: List[Dict[str, Any]]
+    total_issues: int
+    truncated: bool
+    total_lines: int
+    total_bytes: int
+    has_errors: bool
+
+
+class DiffFileResult(BaseModel):
+    path: str
+    language: str
+    issues: List[Dict[str, Any]]
+    changed_lines: int
+    full_checks: List[str]
+    has_errors: bool
+
+
+class DiffCheckResponse(BaseModel):
+    files: List[DiffFileResult]
+    total_issues: int
+    has_errors: bool
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    archive_name: str
+    status: str
+    total_files: Optional[int]
+    done_files: int
+    error_files: int
+    progress: Optional[float]
+    error: Optional[str] = None
+
+
+class JobResultsResponse(BaseModel):
+    job_id: str
+    status: str
+    offset: int
+    limit: int
+    results: List[Dict[str, Any]]
+
+
 class HealthResponse(BaseModel):
     status: str
     version: str
@@ -153,14 +269,27 @@ async def health_check():
     }
 
 
-@app.post("/check", response_model=ErrorResponse, tags=["Error Detection"])
-@limiter.limit("100/minute")
+@app.get("/ready", tags=["Info"])
+async def readiness_check():
+    """Readiness probe: 503 until models and pipeline are warmed up"""
+    if not is_ready():
+        return FastJSONResponse({"status": "warming_up"}, status_code=503)
+    return {"status": "ready"}
+
+
+@app.get("/rules", tags=["Info"])
+async def detector_rules():
+    """Detector rules with their call counts and CPU time (slowest first)"""
+    from src.syntax_checker import rule_stats
+
+    return {"rules": rule_stats()}
+
+
+# The hot path returns FastJSONResponse directly: ErrorResponse documents the
+# shape but is not used to validate and re-serialize every response
+@app.post("/check", response_class=FastJSONResponse, responses={200: {"model": ErrorResponse}},
+          tags=["Error Detection"])
 async def check_code(request: CodeCheckRequest):
-    # Input validation
-    if not request.code or not request.code.strip():
-        raise HTTPException(status_code=400, detail="Code cannot be empty")
-    if len(request.code) > 100000:  # 100KB limit
-        raise HTTPException(status_code=413, detail="Code too large")
     """
     Check code for syntax errors
     
@@ -170,20 +299,329 @@ async def check_code(request: CodeCheckRequest):
     - AI tutor explanations
     - Detailed rule-based issues
     """
+    # Input validation
+    if not request.code or not request.code.strip():
+        raise HTTPException(status_code=400, detail="Code cannot be empty")
+    if len(request.code) > 100000:  # 100KB limit
+        raise HTTPException(status_code=413, detail="Code too large")
+
     try:
-        result = detect_errors(request.code, request.filename)
-        
-        return ErrorResponse(
-            language=result["language"],
-            predicted_error=result["predicted_error"],
-            confidence=result["confidence"],
-            tutor=result["tutor"],
-            rule_based_issues=result.get("rule_based_issues", []),
-            has_errors=result["predicted_error"] != "NoError"
-        )
-    
+        result = await run_in_threadpool(detect_errors, request.code, request.filename, recover=request.recover)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing code: {str(e)}")
+
+    return FastJSONResponse({
+        "language": result["language"],
+        "predicted_error": result["predicted_error"],
+        "confidence": float(result["confidence"]),
+        "tutor": result["tutor"],
+        "rule_based_issues": result.get("rule_based_issues", []),
+        "has_errors": result["predicted_error"] != "NoError"
+    })
+
+
+@app.post("/check-all", tags=["Error Detection"])
+async def check_all_errors(
+    request: CodeCheckRequest,
+    format: str = Query("full", pattern="^(full|columnar)$",
+                        description="full: grouped error views; columnar: each issue once, as columns")
+):
+    """
+    Check code for ALL errors, not just the first one
+
+    With format=columnar, issues come back as parallel arrays that index
+    shared type, message and tutor tables (much smaller for large files).
+    """
+    if not request.code or not request.code.strip():
+        raise HTTPException(status_code=400, detail="Code cannot be empty")
+    if len(request.code) > 100000:  # 100KB limit
+        raise HTTPException(status_code=413, detail="Code too large")
+
+    try:
+        result = await run_in_threadpool(detect_all_errors, request.code, request.filename,
+                                         compact=format == "columnar")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing code: {str(e)}")
+    return FastJSONResponse(result)
+
+
+class _MultipartFile:
+    """
+    The 'file' field of a multipart/form-data body, read as it arrives
+
+    The body is pushed through python-multipart's incremental parser chunk
+    by chunk, so the file content reaches the caller without first being
+    spooled to a temporary file. Other fields are skipped.
+    """
+
+    def __init__(self, request: Request, boundary: bytes):
+        self._body = request.stream().__aiter__()
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = self._value = b""
+        self._in_file = False
+        self.found = False
+        self.complete = False
+        self.filename: Optional[str] = None
+        self._data: List[bytes] = []
+
+    # -- parser callbacks -----------------------------------------
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data, start, end):
+        self._field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if options.get(b"name") == b"file" and not self.found:
+            self.found = self._in_file = True
+            name = options.get(b"filename")
+            self.filename = name.decode("utf-8", "replace") if name else None
+
+    def _on_part_data(self, data, start, end):
+        if self._in_file:
+            self._data.append(data[start:end])
+
+    def _on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self.complete = True
+
+    # -- reading --------------------------------------------------
+
+    async def _pump(self) -> bool:
+        """Parse the next body chunk; False once the body is exhausted."""
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            return False
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError as e:
+            raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+        return True
+
+    async def open(self) -> Optional[str]:
+        """Read up to the start of the 'file' field; returns its filename."""
+        while not self.found:
+            if not await self._pump():
+                raise HTTPException(status_code=400, detail="Multipart upload must include a 'file' field")
+        return self.filename
+
+    async def chunks(self):
+        """Yield the file content as it is parsed."""
+        while True:
+            if self._data:
+                data, self._data = b"".join(self._data), []
+                yield data
+            if self.complete or not await self._pump():
+                return
+
+
+async def _open_upload(request: Request, filename: Optional[str], max_bytes: int):
+    """
+    Return (filename, chunk iterator) for a raw or multipart/form-data body
+    
+    Multipart uploads must carry the content in a 'file' field; its filename
+    is used when no explicit filename was given. Both kinds are streamed:
+    chunks are handed on as they arrive. A body whose Content-Length is over
+    max_bytes is rejected (413) before any of it is read.
+    """
+    try:
+        length = int(request.headers.get("content-length", 0))
+    except ValueError:
+        length = 0
+    if length > max_bytes:
+        raise HTTPException(status_code=413, detail="Upload too large")
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        if MultipartParser is None:
+            raise HTTPException(status_code=415, detail="Multipart uploads require the 'python-multipart' package")
+        _, options = parse_options_header(content_type)
+        boundary = options.get(b"boundary")
+        if not boundary:
+            raise HTTPException(status_code=400, detail="Multipart upload without a boundary")
+        upload = _MultipartFile(request, boundary)
+        upload_name = await upload.open()
+        return filename or upload_name, upload.chunks()
+
+    return filename, request.stream()
+
+
+@app.post("/check/stream", response_model=StreamCheckResponse, tags=["Error Detection"])
+async def check_code_stream(
+    request: Request,
+    filename: Optional[str] = Query(None, description="Optional filename for language detection"),
+    language: Optional[str] = Query(None, description="Optional language override (Python, Java, C, C++)"),
+    max_issues: int = Query(DEFAULT_MAX_ISSUES, ge=1, le=10000, description="Stop collecting issues after this many")
+):
+    """
+    Check a large source file streamed in the request body
+    
+    Accepts either a raw body (text/plain, application/octet-stream) or a
+    multipart/form-data upload with a 'file' field. Either way the source
+    is read in chunks and the line-oriented detectors run as lines arrive,
+    so memory stays bounded regardless of file size:
+    - Python: missing colons, unmatched brackets
+    - Java/C/C++: missing semicolons, unmatched brackets
+    """
+    filename, chunks = await _open_upload(request, filename, MAX_STREAM_BYTES)
+
+    checker = StreamingChecker(filename, language, max_issues)
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > MAX_STREAM_BYTES:
+            raise HTTPException(status_code=413, detail="Upload too large")
+        checker.feed(chunk)
+
+    if received == 0:
+        raise HTTPException(status_code=400, detail="Code cannot be empty")
+
+    return checker.close()
+
+
+@app.post("/check-diff", response_model=DiffCheckResponse, tags=["Error Detection"])
+async def check_code_diff(request: DiffCheckRequest):
+    """
+    Check only the lines a unified diff touches
+
+    Line-oriented detectors run on the changed lines; a whole-file check
+    runs only when a hunk changes bracket balance or (Python) indentation
+    or quoting, and its findings are reported only within `context` lines
+    of a change.
+    """
+    if not request.diff.strip():
+        raise HTTPException(status_code=400, detail="Diff cannot be empty")
+    size = len(request.diff) + sum(len(c) for c in request.base_files.values())
+    if size > MAX_DIFF_BYTES:
+        raise HTTPException(status_code=413, detail="Diff too large")
+
+    try:
+        return await run_in_threadpool(check_diff, request.diff, request.base_files, request.context)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Missing base content for {e.args[0]}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing diff: {str(e)}")
+
+
+def _job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    total = job["total_files"]
+    return {
+        "job_id": job["id"],
+        "archive_name": job["archive_name"],
+        "status": job["status"],
+        "total_files": total,
+        "done_files": job["done_files"],
+        "error_files": job["error_files"],
+        "progress": round(job["done_files"] / total, 4) if total else None,
+        "error": job["error"]
+    }
+
+
+def _is_archive(path: str) -> bool:
+    return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+
+
+@app.post("/jobs", response_model=JobStatusResponse, status_code=202, tags=["Archive Scans"])
+@limiter.limit("10/minute")
+async def submit_scan_job(
+    request: Request,
+    filename: Optional[str] = Query(None, description="Archive name, e.g. project.zip or project.tar.gz")
+):
+    """
+    Submit a zip/tar archive of a project for a background scan
+    
+    The archive (raw body or multipart 'file' field) is stored once and
+    scanned by a worker pool; members are streamed from the archive, never
+    extracted to disk. Poll GET /jobs/{job_id} for progress and fetch
+    per-file results from GET /jobs/{job_id}/results.
+    """
+    manager = get_job_manager()
+    filename, chunks = await _open_upload(request, filename, MAX_ARCHIVE_BYTES)
+    job_id = manager.new_job_id()
+    path = manager.archive_path(job_id)
+
+    # File I/O runs in the threadpool so large uploads do not block the event loop.
+    # Until the job is submitted nothing else knows about the file, so it is
+    # removed on any failure (disconnects and disk errors included).
+    received = 0
+    submitted = False
+    try:
+        fh = await run_in_threadpool(open, path, "wb")
+        try:
+            async for chunk in chunks:
+                received += len(chunk)
+                if received > MAX_ARCHIVE_BYTES:
+                    raise HTTPException(status_code=413, detail="Archive too large")
+                await run_in_threadpool(fh.write, chunk)
+        finally:
+            await run_in_threadpool(fh.close)
+        if received == 0:
+            raise HTTPException(status_code=400, detail="Archive cannot be empty")
+        if not await run_in_threadpool(_is_archive, path):
+            raise HTTPException(status_code=415, detail="Expected a zip or tar archive")
+        manager.submit(job_id, filename or "archive")
+        submitted = True
+    finally:
+        if not submitted and os.path.exists(path):
+            os.remove(path)
+
+    return _job_status(manager.store.get_job(job_id))
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse, tags=["Archive Scans"])
+async def get_scan_job(job_id: str):
+    """Get the status and progress of an archive scan job"""
+    job = get_job_manager().store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_status(job)
+
+
+@app.get("/jobs/{job_id}/results", response_model=JobResultsResponse, tags=["Archive Scans"])
+async def get_scan_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    errors_only: bool = Query(False, description="Only return files with detected errors")
+):
+    """
+    Fetch per-file results of an archive scan job, in completion order
+    
+    Results are available while the job is still running.
+    """
+    store = get_job_manager().store
+    job = store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "limit": limit,
+        "results": store.get_results(job_id, offset, limit, errors_only)
+    }
 
 
 @app.post("/fix", response_model=AutoFixResponse, tags=["Auto-Fix"])
@@ -200,7 +638,8 @@ async def auto_fix(request: AutoFixRequest):
     """
     try:
         fixer = AutoFixer()
-        result = fixer.apply_fixes(
+        result = await run_in_threadpool(
+            fixer.apply_fixes,
             request.code,
             request.error_type,
             request.line_num,
@@ -233,7 +672,7 @@ async def analyze_quality(request: QualityCheckRequest):
     """
     try:
         analyzer = CodeQualityAnalyzer(request.code, request.language)
-        result = analyzer.analyze()
+        result = await run_in_threadpool(analyzer.analyze)
         
         return QualityResponse(
             line_counts=result["line_counts"],
@@ -260,7 +699,7 @@ async def check_and_fix(request: CodeCheckRequest):
     """
     try:
         # Check for errors
-        error_result = detect_errors(request.code, request.filename)
+        error_result = await run_in_threadpool(detect_errors, request.code, request.filename)
         
         # Attempt auto-fix if error detected
         fix_result = None
@@ -275,7 +714,8 @@ async def check_and_fix(request: CodeCheckRequest):
                         line_num = issue["line"] - 1
                         break
             
-            fix_result = fixer.apply_fixes(
+            fix_result = await run_in_threadpool(
+                fixer.apply_fixes,
                 request.code,
                 error_result["predicted_error"],
                 line_num,
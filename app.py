@@ -3,11 +3,33 @@
 # File: app.py
 # ============================================================
 
+import hashlib
+import math
+import os
+import time
+import zipfile
+
+import pandas as pd
 import streamlit as st
 from src.error_engine import detect_errors
-from src.auto_fix import AutoFixer
 from src.quality_analyzer import CodeQualityAnalyzer
 from src.multi_error_detector import detect_all_errors
+from src.batch_checker import analyze_report
+from src.ingest import SourceFile
+from src.warmup import warmup
+from src.scan_jobs import COMPLETED, FAILED, SUPPORTED_EXTENSIONS, get_job_manager
+
+# Analysis results are shared by all sessions, keyed by content hash
+CACHE_ENTRIES = int(os.getenv("APP_CACHE_ENTRIES", 256))
+# Edits closer together than this only get the quick verdict; the full
+# analysis (auto-fix, quality) runs once the input has been quiet this long
+DEBOUNCE_SECONDS = float(os.getenv("APP_DEBOUNCE_SECONDS", 0.8))
+
+# Multi-file / archive uploads run as background scan jobs
+SOURCE_TYPES = [ext.lstrip(".") for ext in SUPPORTED_EXTENSIONS]
+ARCHIVE_TYPES = ["zip", "tar", "tgz", "gz"]
+PAGE_SIZES = [25, 50, 100]
+POLL_SECONDS = float(os.getenv("APP_POLL_SECONDS", 1.0))
 
 # ------------------------------------------------------------
 # Page Configuration
@@ -20,6 +42,148 @@ st.set_page_config(
 
 st.title("🧠 Live Multi-Language Syntax Error Checker")
 
+
+# ------------------------------------------------------------
+# Cached Pipeline
+# ------------------------------------------------------------
+
+@st.cache_resource(show_spinner="Loading models...")
+def load_pipeline():
+    """Load models and warm every stage once per server process, shared by all sessions."""
+    return warmup()
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def analyze_single(digest, filename, _code):
+    # _code is not hashed by Streamlit; digest stands in for it
+    return analyze_report(_code, filename=filename, profile="full")
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def analyze_all(digest, filename, _code):
+    all_errors = detect_all_errors(_code, filename)
+    try:
+        quality = CodeQualityAnalyzer(_code, all_errors["language"]).analyze()
+    except Exception:
+        quality = None
+    return {"all_errors": all_errors, "quality": quality}
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def quick_verdict(digest, filename, _code):
+    return detect_errors(_code, filename=filename, first_only=True)
+
+
+def is_typing(digest):
+    """True when this input arrived within DEBOUNCE_SECONDS of the previous edit."""
+    now = time.monotonic()
+    state = st.session_state
+    if state.get("analyzed_digest") == digest:
+        return False
+    burst = now - state.get("last_edit", 0.0) < DEBOUNCE_SECONDS
+    state.last_edit = now
+    if not burst:
+        state.analyzed_digest = digest
+    return burst
+
+
+@st.cache_resource
+def job_manager():
+    """Background scan-job runner (process pool + SQLite results), shared by all sessions."""
+    return get_job_manager()
+
+
+def is_archive(name):
+    return name.lower().endswith(tuple("." + ext for ext in ARCHIVE_TYPES))
+
+
+def submit_batch(files):
+    """Queue uploaded files (or one archive) as a scan job and return its id."""
+    manager = job_manager()
+    job_id = manager.new_job_id()
+    path = manager.archive_path(job_id)
+    if len(files) == 1 and is_archive(files[0].name):
+        with open(path, "wb") as fh:
+            fh.write(files[0].getvalue())
+        name = files[0].name
+    else:
+        with zipfile.ZipFile(path, "w") as zf:
+            for f in files:
+                zf.writestr(f.name, f.getvalue())
+        name = f"{len(files)} uploaded files"
+    manager.submit(job_id, name)
+    return job_id
+
+
+def render_batch(job_id):
+    """Progress, a sortable paginated results table and on-demand per-file details."""
+    store = job_manager().store
+    job = store.get_job(job_id)
+    if job is None:
+        st.error("❌ Scan job not found.")
+        return False
+
+    total = job["total_files"]
+    done = job["done_files"]
+    running = job["status"] not in (COMPLETED, FAILED)
+    if job["status"] == FAILED:
+        st.error(f"❌ Scan failed: {job['error']}")
+    elif running:
+        st.progress(done / total if total else 0.0)
+        st.caption(f"⏳ Checked {done} of {total if total is not None else '?'} files...")
+    else:
+        st.success(f"✅ Checked {done} files: **{job['error_files']}** with errors")
+
+    col_filter, col_order, col_size = st.columns(3)
+    with col_filter:
+        errors_only = st.checkbox("Only files with errors", value=True)
+    with col_order:
+        order = st.selectbox("Sort by", ["errors", "path", "seq"],
+                             format_func={"errors": "Errors first", "path": "Path",
+                                          "seq": "Completion order"}.get)
+    with col_size:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES)
+
+    count = job["error_files"] if errors_only else done
+    pages = max(1, math.ceil(count / page_size))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1,
+                           key=f"page-{errors_only}-{order}-{page_size}")
+    # Only the current page is read from the store and rendered
+    rows = store.get_results(job_id, offset=(page - 1) * page_size, limit=page_size,
+                             errors_only=errors_only, order=order)
+    if not rows:
+        st.info("No results to show yet." if running else "No files match.")
+        return running
+
+    st.dataframe(pd.DataFrame([{
+        "File": r["path"],
+        "Language": r.get("language") or "-",
+        "Result": r.get("predicted_error"),
+        "Issues": len(r.get("rule_based_issues") or []),
+        "Line": next((i["line"] for i in r.get("rule_based_issues") or [] if i.get("line")), None),
+    } for r in rows]), use_container_width=True)
+    st.caption(f"Page {page} of {pages} ({count} files)")
+
+    # Details are rendered for the selected file only
+    selected = st.selectbox("Show details for", ["-"] + [r["path"] for r in rows])
+    detail = next((r for r in rows if r["path"] == selected), None)
+    if detail is not None:
+        if detail.get("skipped"):
+            st.info(f"⏭ Skipped: {detail['skipped']}")
+        elif detail.get("has_errors"):
+            st.error(f"❌ {detail['predicted_error']}")
+            if detail.get("tutor"):
+                st.write(f"**Why this happened:** {detail['tutor']['why']}")
+                st.write(f"**How to fix it:** {detail['tutor']['fix']}")
+            for iss in detail.get("rule_based_issues") or []:
+                st.write(f"• Line {iss.get('line')}: {iss.get('type')} - {iss.get('message')}")
+        else:
+            st.success("✅ No syntax errors detected")
+    return running
+
+
+load_pipeline()
+
 st.write(
     """
 This tool acts as an **AI tutor** and detects issues **automatically as you paste or type code**.
@@ -56,17 +220,29 @@ code_input = st.text_area(
 col_upload, col_toggle = st.columns([3, 1])
 
 with col_upload:
-    uploaded = st.file_uploader(
-        "Or upload a code file",
-        type=["py", "java", "c", "cpp"]
-    )
+    uploaded_files = st.file_uploader(
+        "Or upload code files, a folder's files, or a zip archive",
+        type=SOURCE_TYPES + ARCHIVE_TYPES,
+        accept_multiple_files=True
+    ) or []
+    
+    # One source file goes to the live editor; several files or an
+    # archive are checked in the background as a scan job
+    uploaded = None
+    batch_files = []
+    if len(uploaded_files) == 1 and not is_archive(uploaded_files[0].name):
+        uploaded = uploaded_files[0]
+    elif uploaded_files:
+        batch_files = uploaded_files
     
     if uploaded:
-        try:
-            st.session_state.code = uploaded.read().decode("utf-8")
+        # Encoding is sniffed (BOM / coding cookie / UTF-8), binary files are refused
+        source = SourceFile.from_bytes(uploaded.name, uploaded.getvalue(), policy="full")
+        if source.binary:
+            st.error("❌ Unable to read uploaded file (binary content).")
+        else:
+            st.session_state.code = source.text
             code_input = st.session_state.code
-        except Exception:
-            st.error("❌ Unable to read uploaded file.")
 
 with col_toggle:
     st.write("")  # Spacing
@@ -77,6 +253,26 @@ with col_toggle:
     )
     st.session_state.show_all_errors = show_all
 
+# ------------------------------------------------------------
+# BATCH UPLOADS (multi-file / archive)
+# ------------------------------------------------------------
+
+batch_running = False
+if batch_files:
+    st.subheader("📦 Batch Results")
+    archives = [f for f in batch_files if is_archive(f.name)]
+    if archives and len(batch_files) > 1:
+        st.error("❌ Upload either one archive or any number of source files, not both.")
+    else:
+        upload_key = hashlib.sha256(repr(sorted(
+            (f.name, f.size, getattr(f, "file_id", getattr(f, "id", None))) for f in batch_files
+        )).encode("utf-8")).hexdigest()
+        if st.session_state.get("batch_key") != upload_key:
+            st.session_state.batch_key = upload_key
+            st.session_state.batch_job = submit_batch(batch_files)
+        batch_running = render_batch(st.session_state.batch_job)
+    st.markdown("---")
+
 # ------------------------------------------------------------
 # LIVE DETECTION (NO BUTTON)
 # ------------------------------------------------------------
@@ -84,13 +280,32 @@ with col_toggle:
 if code_input.strip():
     # Pass filename if file is uploaded (important for Java/C/C++)
     filename = uploaded.name if uploaded else None
+    digest = hashlib.sha256(code_input.encode("utf-8")).hexdigest()
+    typing = is_typing(digest)
+    quality_report = None
+    
+    # --------------------------------------------------------
+    # Quick Verdict While Typing (debounced full analysis)
+    # --------------------------------------------------------
+    
+    if typing:
+        result = quick_verdict(digest, filename, code_input)
+        st.success(f"🗂 Detected Language: **{result['language']}**")
+        if result["predicted_error"] == "NoError":
+            st.success("✅ No syntax errors detected")
+        else:
+            st.error(f"❌ Detected Error Type: **{result['predicted_error']}**")
+        st.caption("⏳ Full analysis runs when you pause typing.")
+        error_lines = {i["line"] for i in result.get("rule_based_issues", []) if i.get("line")}
     
     # --------------------------------------------------------
     # Multi-Error Detection Mode
     # --------------------------------------------------------
     
-    if st.session_state.show_all_errors:
-        all_errors = detect_all_errors(code_input, filename)
+    elif st.session_state.show_all_errors:
+        analysis = analyze_all(digest, filename, code_input)
+        all_errors = analysis["all_errors"]
+        quality_report = analysis["quality"]
         
         st.success(f"🗂 Detected Language: **{all_errors['language']}**")
         
@@ -128,7 +343,9 @@ if code_input.strip():
     # --------------------------------------------------------
     
     else:
-        result = detect_errors(code_input, filename=filename)
+        report = analyze_single(digest, filename, code_input)
+        result = report["detection"]
+        quality_report = report["quality"]
 
         # --------------------------------------------------------
         # Language
@@ -164,17 +381,7 @@ if code_input.strip():
             # AUTO-FIX SUGGESTION
             # --------------------------------------------------------
             st.subheader("🔧 Auto-Fix Suggestion")
-            fixer = AutoFixer()
-            
-            # Get line number from rule-based issues if available
-            line_num = 0
-            if result.get('rule_based_issues'):
-                for issue in result['rule_based_issues']:
-                    if issue.get('line'):
-                        line_num = issue['line'] - 1
-                        break
-            
-            fix_result = fixer.apply_fixes(code_input, result['predicted_error'], line_num, result['language'])
+            fix_result = report["fix"]
             
             if fix_result['success']:
                 st.success("✅ Automatic fix applied!")
@@ -209,32 +416,29 @@ if code_input.strip():
     # --------------------------------------------------------
     # CODE QUALITY ANALYSIS
     # --------------------------------------------------------
-    st.subheader("📊 Code Quality Analysis")
-    
-    try:
-        quality = CodeQualityAnalyzer(code_input, result['language'])
-        quality_report = quality.analyze()
-        
-        col1, col2, col3 = st.columns(3)
+    if not typing:
+        st.subheader("📊 Code Quality Analysis")
         
-        with col1:
-            st.metric("Quality Score", f"{quality_report['quality_score']}/100")
-        with col2:
-            st.metric("Code Lines", quality_report['line_counts']['code'])
-        with col3:
-            complexity = quality_report.get('complexity', 'N/A')
-            st.metric("Complexity", complexity)
-        
-        # Quality suggestions
-        if quality_report['suggestions']:
-            with st.expander("💡 Quality Suggestions", expanded=False):
-                for suggestion in quality_report['suggestions']:
-                    st.write(f"• {suggestion}")
+        if quality_report:
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("Quality Score", f"{quality_report['quality_score']}/100")
+            with col2:
+                st.metric("Code Lines", quality_report['line_counts']['code'])
+            with col3:
+                complexity = quality_report.get('complexity', 'N/A')
+                st.metric("Complexity", complexity)
+            
+            # Quality suggestions
+            if quality_report['suggestions']:
+                with st.expander("💡 Quality Suggestions", expanded=False):
+                    for suggestion in quality_report['suggestions']:
+                        st.write(f"• {suggestion}")
+            else:
+                st.success("✅ Code quality looks good!")
         else:
-            st.success("✅ Code quality looks good!")
-    
-    except Exception as e:
-        st.info("ℹ️ Quality analysis unavailable for this code snippet.")
+            st.info("ℹ️ Quality analysis unavailable for this code snippet.")
 
     # --------------------------------------------------------
     # Code Display with Highlighting
@@ -261,9 +465,21 @@ if code_input.strip():
         unsafe_allow_html=True
     )
 
-else:
+    # Debounce: if no further edit arrives (which would interrupt this run),
+    # rerun once the input has been quiet long enough for the full analysis
+    if typing:
+        time.sleep(DEBOUNCE_SECONDS)
+        (getattr(st, "rerun", None) or st.experimental_rerun)()
+
+elif not batch_files:
     st.info("👆 Paste or upload code to start live analysis.")
 
+# Poll a running batch job: each run is short, so the session stays
+# responsive and any interaction simply interrupts the wait
+if batch_running:
+    time.sleep(POLL_SECONDS)
+    (getattr(st, "rerun", None) or st.experimental_rerun)()
+
 # ------------------------------------------------------------
 # Footer
 # ------------------------------------------------------------
@@ -3,46 +3,145 @@
 # File: cli.py
 # ============================================================
 
+import argparse
+import json
+import os
 import sys
-from src.error_engine import detect_errors
-from src.auto_fix import AutoFixer
-from src.quality_analyzer import CodeQualityAnalyzer
+from src.file_discovery import changed_files, discover_files, staged_files
+from src.batch_checker import PROFILES, BatchStats, default_workers, iter_batch
+from src.result_cache import CACHE_DIR, ResultCache, content_digest
+from src.ingest import over_size_limit, read_text
+from src.report_writers import FORMATS, get_writer
+from src.daemon import connect as connect_daemon
+
+# The detection pipeline (pandas/sklearn + models) is imported only when a
+# file actually needs analysis, so fully cached runs skip that startup cost
+
+# Exit codes
+EXIT_OK = 0            # no syntax errors found
+EXIT_ERRORS_FOUND = 1  # at least one file has errors
+EXIT_FAILURE = 2       # usage error or the check could not run
 
 
 def print_usage():
     print("Usage:")
     print("  python cli.py <path_to_code_file>")
+    print("  python cli.py <file|directory|glob> [...] [-j WORKERS] [--include GLOB] [--exclude GLOB]")
     print("Example:")
     print("  python cli.py test.java")
+    print("  python cli.py src/ tests/ -j 8 --exclude 'vendor/*'")
+    print("  python cli.py . --format sarif --output report.sarif")
+    print("  python cli.py --staged                  (pre-commit hook)")
+    print("  git diff | python cli.py --diff -       (changed lines only)")
+    print("  python cli.py . --profile verdict --fail-fast   (cheap CI gate)")
+    print("  python cli.py big.py --all-errors columnar      (every error, compact JSON)")
+    print("Exit codes: 0 = no errors, 1 = errors found, 2 = usage or runtime failure")
 
 
-def main():
-    # --------------------------------------------------------
-    # 1. Argument Check
-    # --------------------------------------------------------
-    if len(sys.argv) < 2:
-        print_usage()
-        sys.exit(1)
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Multi-Language Syntax Error Checker (CLI)"
+    )
+    parser.add_argument("paths", nargs="*", help="Files, directories (recursive) or glob patterns")
+    parser.add_argument("-j", "--workers", type=int, default=default_workers(),
+                        help="Worker processes for multi-file runs (default: CPU count)")
+    parser.add_argument("--include", action="append", metavar="GLOB",
+                        help="Only check files matching GLOB (repeatable; default: .py/.java/.c/.cpp)")
+    parser.add_argument("--exclude", action="append", metavar="GLOB",
+                        help="Skip files or directories matching GLOB (repeatable)")
+    parser.add_argument("--no-gitignore", action="store_true",
+                        help="Do not skip files ignored by .gitignore")
+    parser.add_argument("--show-all", action="store_true",
+                        help="List every file in the summary, not just files with errors")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="Only check files changed since git REF (plus untracked files)")
+    parser.add_argument("--staged", action="store_true",
+                        help="Check the staged (index) content of changed files, for pre-commit hooks")
+    parser.add_argument("--profile", choices=list(PROFILES),
+                        help="Pipeline stages to run: verdict (pass/fail, stops at the first issue), "
+                             "errors (all issues), recover (all issues and every independent Python "
+                             "syntax error), full (plus auto-fix and quality) "
+                             "(default: full for a single file, errors for scans)")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="Stop a multi-file scan at the first file with errors")
+    parser.add_argument("--budget", type=float, metavar="SECONDS",
+                        help="Per-file time budget; stages after it runs out are skipped and marked")
+    parser.add_argument("--diff", metavar="FILE",
+                        help="Check only the lines touched by a unified diff ('-' reads stdin)")
+    parser.add_argument("--base-dir", default=".", metavar="DIR",
+                        help="Where --diff finds the files it patches (default: current directory)")
+    parser.add_argument("--diff-context", type=int, default=3, metavar="N",
+                        help="Report whole-file findings within N lines of a change (default: 3)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help=f"Result cache directory (default: {CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Analyze every file, ignoring and not updating the cache")
+    parser.add_argument("--format", choices=FORMATS,
+                        help="Output format; non-text formats are streamed file by file "
+                             "(default: text, compact with --staged)")
+    parser.add_argument("--all-errors", nargs="?", const="full", choices=("full", "columnar"),
+                        help="Print every error of each file as JSON Lines (detect_all_errors); "
+                             "'columnar' stores each issue once, as columns (default: full)")
+    parser.add_argument("-o", "--output", metavar="FILE",
+                        help="Write the report to FILE instead of stdout")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and re-check files as they change (Ctrl+C to stop)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Use the running checker daemon (python -m src.daemon start) if available")
+    return parser
+
+
+def cached(cache, digest, kind, file_path, compute, storable=lambda value: True):
+    """Return a cached stage result for this content, computing and storing it on a miss."""
+    if cache is None:
+        return compute()
+    kind = kind + os.path.splitext(file_path)[1].lower()
+    value = cache.get(digest, kind)
+    if value is None:
+        value = compute()
+        if storable(value):
+            cache.put(digest, kind, value)
+            cache.commit()
+    return value
 
-    file_path = sys.argv[1]
 
+def print_detailed_report(file_path, cache=None, client=None, profile="full", budget=None):
+    """Full single-file report: detection, auto-fix and quality analysis. Returns True if errors were found."""
     # --------------------------------------------------------
     # 2. Read Code File
     # --------------------------------------------------------
+    # Encoding is sniffed (BOM, coding cookie, UTF-8 validity); undecodable
+    # bytes are replaced instead of aborting
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            code = f.read()
+        code, source = read_text(file_path)
     except FileNotFoundError:
         print(f"❌ File not found: {file_path}")
-        sys.exit(1)
+        sys.exit(EXIT_FAILURE)
     except Exception as e:
         print(f"❌ Error reading file: {e}")
-        sys.exit(1)
+        sys.exit(EXIT_FAILURE)
+    if code is None:
+        print(f"❌ Binary file, not checked: {file_path}")
+        sys.exit(EXIT_FAILURE)
 
     # --------------------------------------------------------
-    # 3. Detect Errors (PASS FILENAME 🔥)
+    # 3. Detect Errors, Fix, Quality (PASS FILENAME 🔥)
     # --------------------------------------------------------
-    result = detect_errors(code, filename=file_path)
+    report = None
+    if client is not None:
+        report = client.report(code, file_path, profile=profile, budget=budget)
+    if report is None:
+        def run_report():
+            from src.batch_checker import analyze_report
+            return analyze_report(code, filename=file_path, profile=profile, budget=budget)
+
+        kind = "report" if profile == "full" else f"report-{profile}"
+        # Results cut short by the time budget are not cached
+        report = cached(cache, content_digest(code.encode("utf-8")), kind, file_path, run_report,
+                        storable=lambda value: not value["skipped_stages"])
+    result = report["detection"]
+    stages = PROFILES[profile]
+    skipped_stages = report.get("skipped_stages", [])
 
     # --------------------------------------------------------
     # 4. Print Results
@@ -54,6 +153,8 @@ def main():
     print(f"📂 File        : {file_path}")
     print(f"🗂 Language    : {result['language']}")
     print(f"🤖 ML Error    : {result['predicted_error']}")
+    if profile != "full":
+        print(f"🎛 Profile     : {profile}")
     print("-" * 60)
 
     # --------------------------------------------------------
@@ -76,24 +177,16 @@ def main():
     # --------------------------------------------------------
     # 6. Auto-Fix Suggestion
     # --------------------------------------------------------
-    if result['predicted_error'] != "NoError":
+    if result['predicted_error'] != "NoError" and "fix" in stages:
         print("\n" + "=" * 60)
         print("🔧 AUTO-FIX SUGGESTION")
         print("=" * 60)
         
-        fixer = AutoFixer()
-        line_num = 0
-        
-        # Get line number from issues
-        if issues:
-            for issue in issues:
-                if issue.get('line'):
-                    line_num = issue['line'] - 1
-                    break
-        
-        fix_result = fixer.apply_fixes(code, result['predicted_error'], line_num, result['language'])
+        fix_result = report["fix"]
         
-        if fix_result['success']:
+        if "fix" in skipped_stages:
+            print("⏭ Skipped: per-file time budget exhausted.")
+        elif fix_result['success']:
             print("✅ Automatic fix available!\n")
             print("Fixed Code:")
             print("-" * 60)
@@ -108,14 +201,20 @@ def main():
     # --------------------------------------------------------
     # 7. Code Quality Analysis
     # --------------------------------------------------------
+    if "quality" not in stages:
+        print("\n" + "=" * 60)
+        print("Done.")
+        print("=" * 60)
+        return result['predicted_error'] != "NoError"
+
     print("\n" + "=" * 60)
     print("📊 CODE QUALITY ANALYSIS")
     print("=" * 60)
     
-    try:
-        quality = CodeQualityAnalyzer(code, result['language'])
-        quality_report = quality.analyze()
-        
+    quality_report = report["quality"]
+    if "quality" in skipped_stages:
+        print("⏭ Skipped: per-file time budget exhausted.")
+    elif quality_report:
         print(f"Quality Score  : {quality_report['quality_score']}/100")
         print(f"Code Lines     : {quality_report['line_counts']['code']}")
         print(f"Comment Lines  : {quality_report['line_counts']['comments']}")
@@ -131,13 +230,260 @@ def main():
                 print(f"  {i}. {suggestion}")
         else:
             print("\n✅ Code quality looks good!")
-    
-    except Exception as e:
+    else:
         print("ℹ️ Quality analysis unavailable for this code snippet.")
 
     print("\n" + "=" * 60)
     print("Done.")
     print("=" * 60)
+    return result['predicted_error'] != "NoError"
+
+
+def run_scan(files, args, cache, client=None):
+    """Check files (paths or (path, content) pairs), streaming each result to the selected writer. Returns the summary."""
+    stream = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = get_writer(args.format, stream, show_all=args.show_all)
+        stats = BatchStats()
+        writer.begin()
+        results = iter_batch(files, workers=args.workers, cache=cache, stats=stats, client=client,
+                             profile=args.profile, budget=args.budget)
+        stopped_early = False
+        try:
+            for result in results:
+                writer.write(result)
+                if args.fail_fast and result["has_errors"]:
+                    stopped_early = True
+                    break
+        finally:
+            results.close()  # stops the worker pool on --fail-fast
+        summary = stats.as_dict()
+        if stopped_early:
+            summary["stopped_early"] = True
+        writer.end(summary)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return summary
+
+
+def run_diff(args):
+    """Check the lines touched by a unified diff, reporting through the selected writer. Returns the summary."""
+    from src.diff_checker import check_diff, parse_unified_diff
+
+    if args.diff == "-":
+        diff = sys.stdin.read()
+    else:
+        with open(args.diff, "r", encoding="utf-8") as f:
+            diff = f.read()
+
+    # Base content is read by old path; a working tree that already has the
+    # change applied (plain `git diff`) is accepted too
+    base_files = {}
+    for patch in parse_unified_diff(diff):
+        old_path = patch["old_path"]
+        if old_path is not None and old_path not in base_files:
+            with open(os.path.join(args.base_dir, old_path), "r", encoding="utf-8", errors="replace") as f:
+                base_files[old_path] = f.read()
+
+    report = check_diff(diff, base_files, context=args.diff_context)
+
+    stream = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = get_writer(args.format, stream, show_all=args.show_all)
+        stats = BatchStats()
+        writer.begin()
+        for entry in report["files"]:
+            result = {
+                "path": entry["path"],
+                "language": entry["language"],
+                "predicted_error": entry["issues"][0]["type"] if entry["issues"] else "NoError",
+                "has_errors": entry["has_errors"],
+                "issues": entry["issues"],
+                "lines": entry["changed_lines"],
+                "error": None
+            }
+            stats.add(result)
+            writer.write(result)
+        stats.analyzed = stats.files
+        summary = stats.as_dict()
+        writer.end(summary)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return summary
+
+
+def run_all_errors(files, args):
+    """Write one detect_all_errors result per file as JSON Lines. Returns True if any file has errors."""
+    from src.multi_error_detector import detect_all_errors
+    from src.syntax_checker import json_default
+
+    has_errors = False
+    stream = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for path in files:
+            code, _ = read_text(path)
+            if code is None:
+                continue
+            result = detect_all_errors(code, path, compact=args.all_errors == "columnar")
+            has_errors = has_errors or result["has_errors"]
+            stream.write(json.dumps({"path": path, **result}, default=json_default) + "\n")
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return has_errors
+
+
+def run_watch(args, cache, client=None):
+    """Re-check changed files on every (debounced) save and redraw the summary."""
+    import time
+    from src.report_writers import TextWriter
+    from src.watcher import FileWatcher
+
+    watcher = FileWatcher(args.paths, include=args.include, exclude=args.exclude,
+                          use_gitignore=not args.no_gitignore)
+    results = {}
+
+    def check(paths):
+        for result in iter_batch(paths, workers=args.workers, cache=cache, client=client):
+            results[result["path"]] = result
+
+    def render(note, elapsed):
+        if sys.stdout.isatty():
+            print("\033[2J\033[H", end="")
+        stats = BatchStats()
+        writer = TextWriter(sys.stdout, show_all=args.show_all)
+        for result in results.values():
+            stats.add(result)
+            writer.write(result)
+        summary = stats.as_dict()
+        summary["analyzed"] = summary["files"]
+        summary["elapsed"] = elapsed
+        writer.end(summary)
+        print(f"👀 Watching {len(results)} files ({watcher.backend}) - {note}")
+        sys.stdout.flush()
+
+    start = time.perf_counter()
+    check(watcher.files())
+    elapsed = time.perf_counter() - start
+    render(f"initial check took {elapsed:.2f}s", elapsed)
+    try:
+        while True:
+            changed, removed = watcher.wait()
+            start = time.perf_counter()
+            for path in removed:
+                results.pop(path, None)
+            check(changed)
+            elapsed = time.perf_counter() - start
+            render(f"{time.strftime('%H:%M:%S')}: re-checked {len(changed)} changed, "
+                   f"dropped {len(removed)} removed in {elapsed:.2f}s", elapsed)
+    except KeyboardInterrupt:
+        print("\n✅ Watch stopped")
+    finally:
+        watcher.close()
+    return any(r["has_errors"] for r in results.values())
+
+
+def main(argv=None):
+    # --------------------------------------------------------
+    # 1. Argument Check
+    # --------------------------------------------------------
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print_usage()
+        sys.exit(EXIT_FAILURE)
+
+    args = build_parser().parse_args(argv)
+    if not args.paths and not args.staged and not args.diff:
+        print_usage()
+        sys.exit(EXIT_FAILURE)
+    if args.format is None:
+        args.format = "compact" if args.staged or args.diff else "text"
+    if args.budget is not None and args.budget < 0:
+        print("❌ --budget must not be negative")
+        sys.exit(EXIT_FAILURE)
+    # Keep stdout clean for machine-readable reports
+    log = sys.stdout if args.format == "text" else sys.stderr
+
+    if args.diff:
+        try:
+            summary = run_diff(args)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}", file=log)
+            sys.exit(EXIT_FAILURE)
+        sys.exit(EXIT_ERRORS_FOUND if summary["files_with_errors"] else EXIT_OK)
+
+    if args.all_errors:
+        files = list(discover_files(
+            args.paths, include=args.include, exclude=args.exclude,
+            use_gitignore=not args.no_gitignore
+        ))
+        if not files:
+            print("❌ No matching source files found", file=sys.stderr)
+            sys.exit(EXIT_FAILURE)
+        sys.exit(EXIT_ERRORS_FOUND if run_all_errors(files, args) else EXIT_OK)
+
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+
+    client = None
+    if args.daemon:
+        client = connect_daemon()
+        if client is None:
+            print("ℹ️ Checker daemon not running; checking locally", file=sys.stderr)
+
+    if args.watch:
+        has_errors = run_watch(args, cache, client)
+        if cache is not None:
+            cache.close()
+        sys.exit(EXIT_ERRORS_FOUND if has_errors else EXIT_OK)
+
+    # A single file keeps the detailed report (files over the size limit get
+    # the batch path, which applies the size policy)
+    if (len(args.paths) == 1 and os.path.isfile(args.paths[0]) and not args.changed_since
+            and not args.staged and args.format == "text" and not args.output
+            and not over_size_limit(args.paths[0])):
+        has_errors = print_detailed_report(args.paths[0], cache, client,
+                                           profile=args.profile or "full", budget=args.budget)
+        sys.exit(EXIT_ERRORS_FOUND if has_errors else EXIT_OK)
+
+    if args.profile is None:
+        args.profile = "errors"  # scans default to detection only
+
+    if args.staged:
+        try:
+            files = staged_files(args.paths or ["."], include=args.include, exclude=args.exclude)
+        except RuntimeError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(EXIT_FAILURE)
+        summary = run_scan(files, args, cache, client)
+        if cache is not None:
+            cache.close()
+        sys.exit(EXIT_ERRORS_FOUND if summary["files_with_errors"] else EXIT_OK)
+
+    if args.changed_since:
+        try:
+            files = changed_files(args.changed_since, args.paths,
+                                  include=args.include, exclude=args.exclude)
+        except RuntimeError as e:
+            print(f"❌ {e}", file=log)
+            sys.exit(EXIT_FAILURE)
+    else:
+        files = list(discover_files(
+            args.paths, include=args.include, exclude=args.exclude,
+            use_gitignore=not args.no_gitignore
+        ))
+    if not files and args.format == "text":
+        print("✅ No changed source files" if args.changed_since else "❌ No matching source files found")
+        sys.exit(EXIT_OK if args.changed_since else EXIT_FAILURE)
+    if not files and not args.changed_since:
+        print("❌ No matching source files found", file=log)
+        sys.exit(EXIT_FAILURE)
+
+    summary = run_scan(files, args, cache, client)
+    if cache is not None:
+        cache.close()
+    sys.exit(EXIT_ERRORS_FOUND if summary["files_with_errors"] else EXIT_OK)
 
 
 # ------------------------------------------------------------
@@ -0,0 +1,106 @@
+"""
+Benchmark API response serialization and bytes on the wire
+for large multi-error payloads
+
+Usage (from the project root):
+    python scripts/benchmark_serialization.py [num_functions]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api import ErrorResponse
+from src import api_codec
+from src.multi_error_detector import detect_all_errors
+from src.error_engine import detect_errors
+from src.syntax_checker import json_default
+
+
+def build_source(num_functions: int) -> str:
+    """Generate Python source where every function has several independent errors."""
+    blocks = []
+    for i in range(num_functions):
+        blocks.append(
+            f"def func_{i}(a, b)\n"
+            f"    if a > b\n"
+            f"        return (a + b\n"
+            f"    return a\n"
+        )
+    return "\n".join(blocks)
+
+
+def timed(fn, repeat: int = 20):
+    """Return (best seconds per call, last result)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    num_functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    code = build_source(num_functions)
+
+    single = detect_errors(code, "bench.py")
+    multi = detect_all_errors(code, "bench.py")
+    compact = detect_all_errors(code, "bench.py", compact=True)
+    model = ErrorResponse(
+        language=single["language"],
+        predicted_error=single["predicted_error"],
+        confidence=single["confidence"],
+        tutor=single["tutor"],
+        rule_based_issues=single["rule_based_issues"],
+        has_errors=True,
+    )
+
+    print("=" * 72)
+    print("📦 Serialization benchmark")
+    print("=" * 72)
+    print(f"Source lines      : {code.count(chr(10)) + 1}")
+    print(f"Rule-based issues : {len(single['rule_based_issues'])}")
+    print(f"Multi-error total : {multi['total_errors']}")
+    print(f"orjson available  : {api_codec.orjson is not None}")
+    print(f"zstd available    : {api_codec.zstandard is not None}")
+    print()
+
+    payloads = {
+        "ErrorResponse": model.model_dump(),
+        "detect_all_errors": multi,
+        "compact (columnar)": compact,
+    }
+
+    print(f"{'payload':<20}{'serializer':<24}{'ms':>10}{'bytes':>12}")
+    print("-" * 66)
+    for name, payload in payloads.items():
+        serializers = [
+            ("json.dumps", lambda p=payload: json.dumps(p, default=json_default).encode("utf-8")),
+            ("api_codec.dumps", lambda p=payload: api_codec.dumps(p)),
+        ]
+        if name == "ErrorResponse":
+            serializers.insert(0, ("pydantic model_dump", lambda: json.dumps(model.model_dump()).encode("utf-8")))
+            serializers.insert(1, ("pydantic dump_json", lambda: model.model_dump_json().encode("utf-8")))
+        for label, fn in serializers:
+            seconds, body = timed(fn)
+            print(f"{name:<20}{label:<24}{seconds * 1000:>10.2f}{len(body):>12}")
+    print()
+
+    print(f"{'payload':<20}{'encoding':<24}{'ms':>10}{'bytes':>12}{'ratio':>8}")
+    print("-" * 74)
+    for name, payload in payloads.items():
+        body = api_codec.dumps(payload)
+        print(f"{name:<20}{'identity':<24}{0:>10.2f}{len(body):>12}{1:>8.1f}")
+        for encoding in api_codec.supported_encodings():
+            seconds, compressed = timed(lambda e=encoding: api_codec.compress(body, e), repeat=5)
+            ratio = len(body) / max(len(compressed), 1)
+            print(f"{name:<20}{encoding:<24}{seconds * 1000:>10.2f}{len(compressed):>12}{ratio:>8.1f}")
+    print("=" * 74)
+
+
+if __name__ == "__main__":
+    main()
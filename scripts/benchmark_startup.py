@@ -0,0 +1,127 @@
+"""
+Compare API startup time and memory: uvicorn workers vs preloaded fork workers
+
+Launches `start_api.py` in PRODUCTION mode twice (PRELOAD=false / true),
+waits until /ready succeeds consistently, then sums RSS and PSS over the
+launcher's process tree. PSS splits shared pages between the processes
+sharing them, so it shows the copy-on-write savings that RSS hides.
+
+Linux only (reads /proc). Usage (from the project root):
+    python scripts/benchmark_startup.py [workers]
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def process_tree(root_pid: int):
+    """Return root_pid and all of its descendants."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as fh:
+                ppid = int(fh.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    pids, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+
+def memory_kb(pid: int):
+    """Return (rss_kb, pss_kb) for a process."""
+    rss = pss = 0
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as fh:
+            for line in fh:
+                if line.startswith("Rss:"):
+                    rss = int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, pss
+
+
+def wait_ready(port: int, workers: int, timeout: float = 180.0) -> float:
+    """Seconds until /ready answers 200 on 5 x workers consecutive requests."""
+    start = time.perf_counter()
+    streak = 0
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=2) as resp:
+                streak = streak + 1 if resp.status == 200 else 0
+        except (urllib.error.URLError, ConnectionError, OSError):
+            streak = 0
+        if streak >= workers * 5:
+            return time.perf_counter() - start
+        time.sleep(0.05 if streak else 0.2)
+    raise TimeoutError("API did not become ready")
+
+
+def measure(preload: bool, workers: int):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PRODUCTION="true",
+        PRELOAD="true" if preload else "false",
+        API_WORKERS=str(workers),
+        API_HOST="127.0.0.1",
+        API_PORT=str(port),
+        SCAN_JOBS_DIR=tempfile.mkdtemp(prefix="bench_jobs_"),
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "start_api.py"], cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        seconds = wait_ready(port, workers)
+        time.sleep(1.0)  # let worker memory settle
+        pids = process_tree(proc.pid)
+        totals = [memory_kb(pid) for pid in pids]
+        rss = sum(t[0] for t in totals)
+        pss = sum(t[1] for t in totals)
+        return seconds, len(pids), rss, pss
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    print("=" * 72)
+    print(f"🚀 API startup benchmark ({workers} workers)")
+    print("=" * 72)
+    print(f"{'mode':<22}{'ready (s)':>12}{'procs':>8}{'RSS (MB)':>14}{'PSS (MB)':>14}")
+    print("-" * 72)
+    for label, preload in [("uvicorn workers", False), ("preload + fork", True)]:
+        seconds, procs, rss, pss = measure(preload, workers)
+        print(f"{label:<22}{seconds:>12.2f}{procs:>8}{rss / 1024:>14.1f}{pss / 1024:>14.1f}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
 # Core modules for Hybrid AI-Based Multi-Language Syntax Error Detection System
-from .error_engine import detect_errors
-from .language_detector import detect_language
-from .ml_engine import detect_error_ml
-from .syntax_checker import detect_all
-from .tutor_explainer import explain_error
-from .auto_fix import AutoFixer
-from .quality_analyzer import CodeQualityAnalyzer
+#
+# Public names are imported lazily (PEP 562) so that lightweight entry points
+# (file discovery, the result cache) do not pull in pandas/sklearn and the
+# ML models just by importing a submodule of this package.
+import importlib
+
+_EXPORTS = {
+    'detect_errors': '.error_engine',
+    'detect_language': '.language_detector',
+    'detect_error_ml': '.ml_engine',
+    'detect_all': '.syntax_checker',
+    'explain_error': '.tutor_explainer',
+    'AutoFixer': '.auto_fix',
+    'CodeQualityAnalyzer': '.quality_analyzer',
+}
 
 __all__ = [
     'detect_errors',
@@ -16,3 +24,15 @@ __all__ = [
     'AutoFixer',
     'CodeQualityAnalyzer'
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
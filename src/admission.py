@@ -0,0 +1,259 @@
+"""
+Admission Control Module
+Token-bucket admission charged by payload size, with interactive and bulk
+priority lanes so bulk traffic is shed first under load
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+# Cost units: a small /check request costs ~1 unit
+RATE_PER_SECOND = float(os.getenv("ADMISSION_RATE", 2.0))        # per client and lane
+BURST = float(os.getenv("ADMISSION_BURST", 50.0))                  # bucket capacity
+COST_PER_KB = float(os.getenv("ADMISSION_COST_PER_KB", 0.1))
+MAX_INFLIGHT_COST = float(os.getenv("ADMISSION_MAX_INFLIGHT", 100.0))
+BULK_SHARE = float(os.getenv("ADMISSION_BULK_SHARE", 0.5))         # of MAX_INFLIGHT_COST
+INTERACTIVE_MAX_WAIT = float(os.getenv("ADMISSION_INTERACTIVE_WAIT", 2.0))
+
+# Relative cost of each endpoint (before the per-KB charge)
+ENDPOINT_COSTS = {
+    "/check": 1.0,
+    "/check-all": 1.0,
+    "/check-and-fix": 2.0,
+    "/fix": 0.5,
+    "/quality": 0.5,
+    "/check/stream": 1.0,
+    "/check-diff": 1.0,
+    "/jobs": 1.0,
+}
+
+# Endpoints that are always bulk regardless of the client's header
+BULK_ENDPOINTS = {"/check/stream", "/jobs"}
+
+# Size assumed for bodies without Content-Length (chunked uploads)
+UNKNOWN_BODY_BYTES = 64 * 1024
+
+# Compressed bodies are charged as if they expand by this ratio, up to the
+# decompression limit, since the decompressed size is only known after the
+# request has been admitted
+COMPRESSION_RATIO = float(os.getenv("ADMISSION_COMPRESSION_RATIO", 20.0))
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, cost: float, now: float) -> bool:
+        self._refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+    def retry_after(self, cost: float) -> float:
+        """Seconds until `cost` tokens will be available."""
+        return max(0.0, (cost - self.tokens) / self.rate) if self.rate > 0 else float("inf")
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Decides whether a request may run now
+
+    Two checks are applied:
+      1. Rate: each (client, lane) has a token bucket; a request is charged
+         its estimated cost (endpoint cost + payload KB x COST_PER_KB).
+         Exhausted buckets get 429 with Retry-After.
+      2. Load: the summed cost of in-flight requests is capped. Bulk work may
+         only use BULK_SHARE of the cap and is rejected (503) as soon as that
+         is exceeded; interactive work may use the whole cap and waits up to
+         INTERACTIVE_MAX_WAIT for capacity before being rejected.
+    """
+
+    def __init__(self, rate: float = RATE_PER_SECOND, burst: float = BURST,
+                 max_inflight: float = MAX_INFLIGHT_COST, bulk_share: float = BULK_SHARE,
+                 interactive_wait: float = INTERACTIVE_MAX_WAIT, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_inflight = max_inflight
+        self.bulk_share = bulk_share
+        self.interactive_wait = interactive_wait
+        self.clock = clock
+        self.inflight = 0.0
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._capacity_freed: Optional[asyncio.Condition] = None
+
+    @staticmethod
+    def estimate_cost(path: str, body_bytes: int, content_encoding: Optional[str] = None) -> float:
+        base = ENDPOINT_COSTS.get(path, 1.0)
+        if content_encoding and content_encoding.strip().lower() != "identity":
+            from .api_codec import MAX_DECOMPRESSED_BYTES
+
+            body_bytes = min(body_bytes * COMPRESSION_RATIO, MAX_DECOMPRESSED_BYTES)
+        return base + (body_bytes / 1024.0) * COST_PER_KB
+
+    @staticmethod
+    def classify(path: str, priority_header: Optional[str], browser: bool = False) -> str:
+        """Lane of a request: interactive only when asked for, or for browsers that do not say."""
+        if path in BULK_ENDPOINTS:
+            return BULK
+        priority = priority_header.strip().lower() if priority_header else None
+        if priority == INTERACTIVE or (priority is None and browser):
+            return INTERACTIVE
+        return BULK
+
+    def _bucket(self, client: str, lane: str) -> TokenBucket:
+        key = (client, lane)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) > 10000:
+                self._evict_full_buckets()
+            bucket = self.buckets[key] = TokenBucket(self.rate, self.burst, self.clock())
+        return bucket
+
+    def _evict_full_buckets(self) -> None:
+        """Drop buckets that have refilled completely (idle clients)."""
+        now = self.clock()
+        for key, bucket in list(self.buckets.items()):
+            bucket._refill(now)
+            if bucket.tokens >= bucket.capacity:
+                del self.buckets[key]
+
+    def _limit(self, lane: str) -> float:
+        return self.max_inflight * (self.bulk_share if lane == BULK else 1.0)
+
+    def _fits(self, lane: str, cost: float) -> bool:
+        # An idle server always admits one request, however large
+        return self.inflight == 0 or self.inflight + cost <= self._limit(lane)
+
+    def charge(self, client: str, lane: str, cost: float) -> float:
+        """Charge the client's bucket; returns the charged cost or raises AdmissionRejected."""
+        cost = min(cost, self.burst)  # oversized requests drain the bucket but are not unservable
+        bucket = self._bucket(client, lane)
+        if not bucket.try_take(cost, self.clock()):
+            raise AdmissionRejected(429, "Rate limit exceeded", bucket.retry_after(cost))
+        return cost
+
+    def refund(self, client: str, lane: str, cost: float) -> None:
+        bucket = self._bucket(client, lane)
+        bucket.tokens = min(bucket.capacity, bucket.tokens + cost)
+
+    async def acquire(self, client: str, lane: str, cost: float) -> float:
+        """Admit a request: load check for bulk, rate check, then wait for load. Returns the in-flight cost."""
+        cost = min(cost, self.burst)
+        if lane == BULK and not self._fits(lane, cost):
+            raise AdmissionRejected(503, "Server busy: bulk traffic is being shed", 1.0)
+
+        self.charge(client, lane, cost)
+
+        if not self._fits(lane, cost):
+            if self._capacity_freed is None:
+                self._capacity_freed = asyncio.Condition()
+            try:
+                async with self._capacity_freed:
+                    await asyncio.wait_for(
+                        self._capacity_freed.wait_for(lambda: self._fits(lane, cost)),
+                        timeout=self.interactive_wait
+                    )
+            except asyncio.TimeoutError:
+                self.refund(client, lane, cost)
+                raise AdmissionRejected(503, "Server busy", 1.0)
+
+        self.inflight += cost
+        return cost
+
+    async def release(self, cost: float) -> None:
+        self.inflight = max(0.0, self.inflight - cost)
+        if self._capacity_freed is not None:
+            async with self._capacity_freed:
+                self._capacity_freed.notify_all()
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying AdmissionController to the analysis endpoints
+
+    The lane comes from the `X-Priority: interactive|bulk` header. Requests
+    without it are bulk, except from browsers (which send Sec-Fetch-Mode);
+    streaming and archive endpoints are always bulk. Compressed bodies are
+    charged at COMPRESSION_RATIO times their size. The client is identified
+    by its remote address, as with the SlowAPI limiter.
+    """
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or AdmissionController()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in ENDPOINT_COSTS:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        try:
+            body_bytes = int(_header(scope, b"content-length") or UNKNOWN_BODY_BYTES)
+        except ValueError:
+            body_bytes = UNKNOWN_BODY_BYTES
+        lane = self.controller.classify(path, _header(scope, b"x-priority"),
+                                        browser=_header(scope, b"sec-fetch-mode") is not None)
+        client = (scope.get("client") or ("unknown", 0))[0]
+        cost = self.controller.estimate_cost(path, body_bytes, _header(scope, b"content-encoding"))
+
+        try:
+            admitted = await self.controller.acquire(client, lane, cost)
+        except AdmissionRejected as e:
+            await _reject(send, e, lane)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await self.controller.release(admitted)
+
+
+async def _reject(send, rejection: AdmissionRejected, lane: str) -> None:
+    from .api_codec import dumps
+
+    body = dumps({"detail": rejection.reason, "lane": lane})
+    retry_after = max(1, int(rejection.retry_after + 0.999))
+    await send({
+        "type": "http.response.start",
+        "status": rejection.status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,401 @@
+"""
+HTTP Codec Module
+Fast JSON responses and gzip/zstd content negotiation for the REST API
+"""
+
+import json
+import os
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+from .syntax_checker import json_default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional codec
+    zstandard = None
+
+
+# Responses smaller than this are sent uncompressed (headers would dominate)
+MIN_COMPRESS_SIZE = int(os.getenv("API_MIN_COMPRESS_SIZE", 1024))
+
+# Upper bound for a decompressed request body (protects against zip bombs)
+MAX_DECOMPRESSED_BYTES = int(os.getenv("API_MAX_DECOMPRESSED_BYTES", 10 * 1024 * 1024))
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/x-ndjson")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact UTF-8 JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        content,
+        default=json_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (falls back to compact stdlib json)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def supported_encodings() -> List[str]:
+    """Content codings this server can produce, in order of preference."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the best response coding from an Accept-Encoding header
+
+    Honors q-values (q=0 disables a coding) and '*'. Ties are broken by
+    server preference (zstd before gzip).
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a complete body with the given coding."""
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if encoding == "gzip":
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush()
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk so streams stay live."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        else:
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def feed(self, data: bytes) -> bytes:
+        if self.encoding == "zstd":
+            return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _ZstdFrames:
+    """
+    Finds the end of zstd frames from their headers alone
+
+    Frame and block headers are parsed and block contents skipped by size,
+    without decoding anything, so `eof` is known for a zstd stream whose
+    decompressor reports none.
+    """
+
+    MAGIC = b"\x28\xb5\x2f\xfd"
+
+    def __init__(self):
+        self._header = bytearray()
+        self._need = 4       # bytes of the next header to collect
+        self._parse = self._frame_magic
+        self._skip = 0       # content bytes still to pass over
+        self._after_skip = None
+        self._checksum = False
+        self.eof = False
+
+    def feed(self, data: bytes) -> None:
+        pos, end = 0, len(data)
+        while pos < end and self._parse is not None:
+            self.eof = False  # any byte after a frame starts another one
+            if self._skip:
+                step = min(self._skip, end - pos)
+                self._skip -= step
+                pos += step
+                if not self._skip:
+                    self._after_skip()
+                continue
+            take = min(self._need - len(self._header), end - pos)
+            self._header += data[pos:pos + take]
+            pos += take
+            if len(self._header) == self._need:
+                header, self._header = bytes(self._header), bytearray()
+                self._parse(header)
+
+    def _expect(self, size: int, parse) -> None:
+        self._need, self._parse = size, parse
+
+    def _skip_then(self, size: int, then) -> None:
+        self._skip, self._after_skip = size, then
+        if not size:
+            then()
+
+    def _frame_done(self) -> None:
+        self.eof = True
+        self._expect(4, self._frame_magic)
+
+    def _frame_magic(self, magic: bytes) -> None:
+        if magic == self.MAGIC:
+            self._expect(1, self._frame_descriptor)
+        elif magic[1:] == b"\x2a\x4d\x18" and magic[0] & 0xF0 == 0x50:
+            self._expect(4, lambda size: self._skip_then(int.from_bytes(size, "little"), self._frame_done))
+        else:
+            self._parse = None  # not zstd: the decompressor reports it
+
+    def _frame_descriptor(self, fhd: bytes) -> None:
+        descriptor = fhd[0]
+        single_segment = descriptor >> 5 & 1
+        self._checksum = bool(descriptor >> 2 & 1)
+        size = (0 if single_segment else 1) + (0, 1, 2, 4)[descriptor & 3]
+        size += (single_segment, 2, 4, 8)[descriptor >> 6]
+        self._skip_then(size, lambda: self._expect(3, self._block))
+
+    def _block(self, header: bytes) -> None:
+        value = int.from_bytes(header, "little")
+        last, block_type, size = value & 1, value >> 1 & 3, value >> 3
+        if not last:
+            then = lambda: self._expect(3, self._block)
+        elif self._checksum:
+            then = lambda: self._skip_then(4, self._frame_done)
+        else:
+            then = self._frame_done
+        self._skip_then(1 if block_type == 1 else size, then)
+
+
+class _StreamDecompressor:
+    """
+    Incremental request-body decoder with an output size limit
+
+    Output is produced and counted in bounded chunks (zlib's max_length;
+    a zstd stream_writer of ZSTD_CHUNK), so a compression bomb is stopped
+    once it crosses the limit instead of after it has been expanded in
+    memory.
+    """
+
+    # zstd output is handed over (and counted) in chunks of this size
+    ZSTD_CHUNK = 64 * 1024
+
+    def __init__(self, encoding: str, limit: int):
+        self.limit = limit
+        self.total = 0
+        self.zstd = encoding == "zstd"
+        if encoding == "zstd":
+            if zstandard is None:
+                raise ValueError("zstd request bodies require the 'zstandard' package")
+            self._parts: List[bytes] = []
+            self._frames = _ZstdFrames()
+            self._obj = zstandard.ZstdDecompressor().stream_writer(
+                self, write_size=self.ZSTD_CHUNK, write_return_read=True)
+        elif encoding == "gzip":
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._obj = zlib.decompressobj()
+        else:
+            raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+    def _count(self, out: bytes) -> bytes:
+        self.total += len(out)
+        if self.total > self.limit:
+            raise OverflowError("Decompressed request body too large")
+        return out
+
+    def write(self, chunk: bytes) -> int:
+        """stream_writer sink: one zstd output chunk."""
+        self._parts.append(self._count(chunk))
+        return len(chunk)
+
+    def feed(self, data: bytes) -> bytes:
+        if self.zstd:
+            self._frames.feed(data)
+            self._obj.write(data)
+            parts, self._parts = self._parts, []
+            return b"".join(parts)
+        parts = []
+        while data:
+            parts.append(self._count(self._obj.decompress(data, self.limit - self.total + 1)))
+            data = self._obj.unconsumed_tail
+        return b"".join(parts)
+
+    @property
+    def eof(self) -> bool:
+        """Has the end of the compressed stream been seen?"""
+        if self.zstd:
+            return self._frames.eof
+        return self._obj.eof
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _without(headers: List[Tuple[bytes, bytes]], *names: bytes) -> List[Tuple[bytes, bytes]]:
+    return [(k, v) for k, v in headers if k.lower() not in names]
+
+
+async def _send_plain_error(send, status: int, message: str):
+    body = dumps({"detail": message})
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware for compressed request and response bodies
+
+    - Requests with Content-Encoding gzip/deflate/zstd are decoded on the fly,
+      chunk by chunk, so streaming endpoints still see a stream.
+    - Responses are compressed with the best coding from Accept-Encoding.
+      Single-message bodies below MIN_COMPRESS_SIZE are left alone; streamed
+      bodies are compressed incrementally with a flush per chunk.
+    """
+
+    def __init__(self, app, minimum_size: int = MIN_COMPRESS_SIZE,
+                 max_decompressed: int = MAX_DECOMPRESSED_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.max_decompressed = max_decompressed
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = list(scope.get("headers", []))
+
+        # ---------------- Request side ----------------
+        content_encoding = (_header(headers, b"content-encoding") or "").strip().lower()
+        if content_encoding and content_encoding != "identity":
+            try:
+                decoder = _StreamDecompressor(content_encoding, self.max_decompressed)
+            except ValueError as e:
+                await _send_plain_error(send, 415, str(e))
+                return
+
+            scope = dict(scope)
+            scope["headers"] = _without(headers, b"content-encoding", b"content-length")
+            raw_receive = receive
+
+            async def receive():
+                message = await raw_receive()
+                if message["type"] == "http.request":
+                    try:
+                        body = decoder.feed(message.get("body", b""))
+                    except OverflowError as e:
+                        raise HTTPException(status_code=413, detail=str(e))
+                    except Exception as e:
+                        raise HTTPException(status_code=400, detail=f"Invalid compressed request body: {e}")
+                    if not message.get("more_body", False) and not decoder.eof:
+                        raise HTTPException(status_code=400, detail="Truncated compressed request body")
+                    message = dict(message, body=body)
+                return message
+
+        # ---------------- Response side ----------------
+        encoding = negotiate_encoding(_header(headers, b"accept-encoding") or "")
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"start": None, "compressor": None, "passthrough": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                resp_headers = message.get("headers", [])
+                content_type = (_header(resp_headers, b"content-type") or "").lower()
+                already = _header(resp_headers, b"content-encoding")
+                if already or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    state["passthrough"] = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            start = state["start"]
+
+            if state["compressor"] is None:
+                if not more_body and len(body) < self.minimum_size:
+                    state["passthrough"] = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                resp_headers = _without(start.get("headers", []), b"content-length", b"vary")
+                vary = _header(start.get("headers", []), b"vary")
+                vary = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+                resp_headers.append((b"content-encoding", encoding.encode()))
+                resp_headers.append((b"vary", vary.encode("latin-1")))
+
+                if not more_body:
+                    compressed = compress(body, encoding)
+                    resp_headers.append((b"content-length", str(len(compressed)).encode()))
+                    await send(dict(start, headers=resp_headers))
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+                state["compressor"] = _StreamCompressor(encoding)
+                await send(dict(start, headers=resp_headers))
+
+            compressor = state["compressor"]
+            chunk = compressor.feed(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,349 @@
+"""
+Batch Checker Module
+Checks many source files in parallel across a process pool
+"""
+
+import functools
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .ingest import SourceFile, open_source
+from .result_cache import ResultCache, content_digest
+
+# A file to check: a path read from disk, or (path, content) for content
+# that does not come from the working tree (e.g. staged git blobs)
+Item = Union[str, Tuple[str, bytes]]
+
+# Pipeline profiles: the stages that run after detection. "verdict" also
+# stops detection at the first issue (same pass/fail, shorter issue list);
+# "recover" reports every independent Python syntax error, not the first.
+PROFILES = {
+    "verdict": (),
+    "errors": (),
+    "recover": (),
+    "full": ("fix", "quality"),
+}
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def analyze_file(path: str, profile: str = "errors", budget: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run error detection on one file
+
+    Args:
+        path: File to check
+        profile: "verdict", "errors", "recover" or "full" (see PROFILES)
+        budget: Per-file time budget in seconds; stages after it runs out
+            are skipped and listed in skipped_stages
+
+    Returns:
+        dict with path, language, predicted_error, has_errors, issues,
+        lines, digest (sha256 of the content), error (set when the file
+        could not be read) and skipped (why the file was not checked:
+        "binary" or "too large"). The "full" profile adds fix, quality
+        and skipped_stages.
+    """
+    try:
+        source = open_source(path)
+    except OSError as e:
+        return {
+            "path": path,
+            "language": None,
+            "predicted_error": "ReadError",
+            "has_errors": False,
+            "issues": [],
+            "lines": 0,
+            "digest": None,
+            "error": str(e),
+            "skipped": None
+        }
+    with source:
+        return analyze_source(source, profile, budget)
+
+
+def analyze_bytes(path: str, data: bytes, profile: str = "errors",
+                  budget: Optional[float] = None) -> Dict[str, Any]:
+    """Run error detection on file content; same result shape as analyze_file."""
+    return analyze_source(SourceFile.from_bytes(path, data), profile, budget)
+
+
+def analyze_source(source: SourceFile, profile: str = "errors",
+                   budget: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Check an opened SourceFile under the ingestion policy: binary (and, with
+    the "skip" policy, oversized) files are skipped, oversized files under
+    the "stream" policy get the constant-memory line-oriented checks only.
+    """
+    if source.skip_reason:
+        return {
+            "path": source.path,
+            "language": None,
+            "predicted_error": "Skipped",
+            "has_errors": False,
+            "issues": [],
+            "lines": 0,
+            "digest": source.digest(),
+            "error": None,
+            "skipped": source.skip_reason
+        }
+
+    if source.streamed:
+        from .stream_checker import StreamingChecker
+
+        checker = StreamingChecker(filename=source.path, encoding=source.encoding)
+        for chunk in source.iter_chunks():
+            checker.feed(chunk)
+        result = checker.close()
+        out = {
+            "path": source.path,
+            "language": result["language"],
+            "predicted_error": result["predicted_error"],
+            "has_errors": result["has_errors"],
+            "issues": result["issues"],
+            "lines": result["total_lines"],
+            "digest": source.digest(),
+            "error": None,
+            "skipped": None
+        }
+        if profile == "full":
+            # Fix and quality need the whole text in memory; not for streamed files
+            out.update(fix=None, quality=None, skipped_stages=list(PROFILES[profile]))
+        return out
+
+    code = source.text
+    report = analyze_report(code, filename=source.path, profile=profile, budget=budget)
+    result = report["detection"]
+    out = {
+        "path": source.path,
+        "language": result["language"],
+        "predicted_error": result["predicted_error"],
+        "has_errors": result["predicted_error"] != "NoError",
+        "issues": result.get("rule_based_issues", []),
+        "lines": code.count("\n") + (1 if code and not code.endswith("\n") else 0),
+        "digest": source.digest(),
+        "error": None,
+        "skipped": None
+    }
+    if profile == "full":
+        out.update(fix=report["fix"], quality=report["quality"], skipped_stages=report["skipped_stages"])
+    return out
+
+
+def analyze_report(code: str, filename: Optional[str] = None, profile: str = "full",
+                   budget: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Single-file analysis: detection, then the stages of the profile
+    (auto-fix when an error is found, quality metrics)
+
+    Args:
+        code: Source code
+        filename: Optional filename for language detection
+        profile: "verdict", "errors", "recover" or "full" (see PROFILES)
+        budget: Time budget in seconds; once detection and earlier stages
+            have used it up, the remaining stages are skipped
+
+    Returns:
+        dict with detection (detect_errors result), fix (AutoFixer result,
+        or None), quality (analysis report, or None) and skipped_stages
+        (stages dropped because the budget ran out)
+    """
+    from .error_engine import detect_errors
+
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile}")
+    started = time.perf_counter()
+    detection = detect_errors(code, filename=filename, first_only=profile == "verdict",
+                              recover=profile == "recover")
+
+    fix = None
+    quality = None
+    skipped_stages = []
+    for stage in PROFILES[profile]:
+        if budget is not None and time.perf_counter() - started > budget:
+            skipped_stages.append(stage)
+            continue
+        if stage == "fix" and detection["predicted_error"] != "NoError":
+            from .auto_fix import AutoFixer
+
+            # Fix at the first issue that carries a line number
+            line_num = next((i["line"] - 1 for i in detection.get("rule_based_issues", []) if i.get("line")), 0)
+            fix = AutoFixer().apply_fixes(code, detection["predicted_error"], line_num, detection["language"])
+        elif stage == "quality":
+            from .quality_analyzer import CodeQualityAnalyzer
+
+            try:
+                quality = CodeQualityAnalyzer(code, detection["language"]).analyze()
+            except Exception:
+                quality = None
+
+    return {"detection": detection, "fix": fix, "quality": quality, "skipped_stages": skipped_stages}
+
+
+def _analyze_item(item: Item, profile: str = "errors", budget: Optional[float] = None) -> Dict[str, Any]:
+    if isinstance(item, tuple):
+        return analyze_bytes(item[0], item[1], profile, budget)
+    return analyze_file(item, profile, budget)
+
+
+def _item_path(item: Item) -> str:
+    return item[0] if isinstance(item, tuple) else item
+
+
+def _init_worker():
+    """Pool initializer: load the detection pipeline (and ML model) once per worker."""
+    from . import error_engine  # noqa: F401
+
+
+def _pool_context():
+    # fork shares the parent's already-loaded model pages copy-on-write
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+
+def check_files(paths: Iterable[Item], workers: Optional[int] = None,
+                client=None, profile: str = "errors",
+                budget: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Check files, yielding one result dict per file as soon as it is done
+
+    Args:
+        paths: Files to check, or (path, content) pairs
+        workers: Worker processes (default: CPU count); 1 checks inline
+        client: Optional DaemonClient; files are then checked by the warm daemon
+        profile: Pipeline profile (see PROFILES)
+        budget: Per-file time budget in seconds
+
+    Results arrive in completion order, not input order.
+    """
+    paths = list(paths)
+    if client is not None:
+        for item in paths:
+            if isinstance(item, tuple):
+                yield client.analyze_content(item[0], item[1], profile=profile, budget=budget)
+            else:
+                yield client.analyze_file(item, profile=profile, budget=budget)
+        return
+    analyze = functools.partial(_analyze_item, profile=profile, budget=budget)
+    workers = min(workers or default_workers(), len(paths))
+    if workers <= 1:
+        for item in paths:
+            yield analyze(item)
+        return
+
+    _init_worker()  # loaded once here so forked workers inherit it
+    # Large chunks amortize IPC on big trees; small ones keep workers balanced
+    chunksize = max(1, min(64, len(paths) // (workers * 8)))
+    with _pool_context().Pool(workers, initializer=_init_worker) as pool:
+        yield from pool.imap_unordered(analyze, paths, chunksize=chunksize)
+
+
+class BatchStats:
+    """Running totals over per-file results (constant memory)."""
+
+    def __init__(self):
+        self.files = 0
+        self.files_with_errors = 0
+        self.unreadable = 0
+        self.skipped = 0
+        self.lines = 0
+        self.analyzed = 0
+        self.by_language: Dict[str, Dict[str, int]] = {}
+        self.started = time.perf_counter()
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.files += 1
+        self.files_with_errors += 1 if result["has_errors"] else 0
+        self.unreadable += 1 if result["error"] else 0
+        self.skipped += 1 if result.get("skipped") else 0
+        self.lines += result["lines"]
+        stats = self.by_language.setdefault(result["language"] or "Unknown", {"files": 0, "errors": 0})
+        stats["files"] += 1
+        stats["errors"] += 1 if result["has_errors"] else 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "files_with_errors": self.files_with_errors,
+            "unreadable": self.unreadable,
+            "skipped": self.skipped,
+            "lines": self.lines,
+            "analyzed": self.analyzed,
+            "by_language": self.by_language,
+            "elapsed": time.perf_counter() - self.started
+        }
+
+
+def cache_kind(path: str, profile: str = "errors") -> str:
+    # Language detection looks at the extension, so it is part of the key
+    stage = "detect" if profile == "errors" else profile
+    return stage + os.path.splitext(path)[1].lower()
+
+
+# Commit cache inserts periodically so an interrupted scan keeps its progress
+CACHE_COMMIT_EVERY = 1000
+
+
+def iter_batch(paths: Iterable[Item], workers: Optional[int] = None,
+               cache: Optional[ResultCache] = None,
+               stats: Optional[BatchStats] = None, client=None,
+               profile: str = "errors", budget: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Check files, yielding each result as soon as it is available
+
+    With a cache, files whose content was analyzed before (by any path)
+    are answered from it first; only the rest are sent to the pool.
+    Pass a BatchStats to have totals accumulated along the way, and a
+    DaemonClient to analyze misses in the daemon instead of a local pool.
+    Results whose stages were cut short by the budget are not cached.
+    Closing the generator early (e.g. fail-fast) stops the pool and keeps
+    the results cached so far.
+    """
+    pending = []
+    for item in paths:
+        if cache is None:
+            pending.append(item)
+            continue
+        path = _item_path(item)
+        if isinstance(item, tuple):
+            digest = content_digest(item[1])
+        else:
+            digest = cache.file_digest(path)
+        cached = cache.get(digest, cache_kind(path, profile))
+        if cached is None:
+            pending.append(item)
+            continue
+        result = dict(cached, path=path, digest=digest)
+        if stats is not None:
+            stats.add(result)
+        yield result
+
+    results = check_files(pending, workers, client, profile, budget)
+    try:
+        for n, result in enumerate(results, start=1):
+            if (cache is not None and result["error"] is None
+                    and (budget is None or not result.get("skipped_stages"))):
+                stored = {k: v for k, v in result.items() if k not in ("path", "digest")}
+                cache.put(result["digest"], cache_kind(result["path"], profile), stored)
+                if n % CACHE_COMMIT_EVERY == 0:
+                    cache.commit()
+            if stats is not None:
+                stats.analyzed += 1
+                stats.add(result)
+            yield result
+    finally:
+        results.close()
+        if cache is not None:
+            cache.commit()
+
+
+def run_batch(paths: Iterable[Item], workers: Optional[int] = None,
+              cache: Optional[ResultCache] = None, profile: str = "errors"):
+    """Check files and return (results sorted by path, summary)."""
+    stats = BatchStats()
+    results = sorted(iter_batch(paths, workers, cache, stats, profile=profile), key=lambda r: r["path"])
+    return results, stats.as_dict()
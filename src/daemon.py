@@ -0,0 +1,371 @@
+"""
+Checker Daemon Module
+Keeps a warm detection / auto-fix / quality pipeline in memory behind a
+Unix-domain socket so editor hooks and pre-commit get fast answers without
+re-importing pandas/sklearn and re-loading the models on every call.
+
+Protocol: newline-delimited JSON over the socket, one response line per
+request line; a connection may send any number of requests.
+
+    {"op": "ping"}
+    {"op": "check", "content": "...", "filename": "a.py"}     -> detect_errors result
+    {"op": "report", "content": "...", "filename": "a.py"}    -> detection, fix, quality
+    {"op": "analyze_file", "path": "/abs/a.py"}               -> batch result for a file
+    {"op": "analyze_content", "path": "a.py", "content": "..."} -> batch result for content
+    {"op": "rules"}                                           -> per-rule call counts and CPU time
+    {"op": "shutdown"}
+
+report, analyze_file and analyze_content also accept "profile" (verdict,
+errors, recover, full) and "budget" (seconds per file).
+
+Responses are {"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+
+Usage:
+    python -m src.daemon start|stop|status|serve
+    python -m src.daemon check FILE [FILE ...]
+
+Only the standard library is imported at module level, so the client side
+stays cheap to start.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from .syntax_checker import json_default
+
+
+def default_socket_path() -> str:
+    env = os.getenv("SYNTAX_DAEMON_SOCKET")
+    if env:
+        return env
+    runtime = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(runtime, f"syntax-checker-{uid}.sock")
+
+
+CACHE_ENTRIES = int(os.getenv("SYNTAX_DAEMON_CACHE", 2048))
+START_TIMEOUT = 60.0
+
+
+class DaemonUnavailable(ConnectionError):
+    """No daemon is listening on the socket."""
+
+
+# ------------------------------------------------------------
+# Client
+# ------------------------------------------------------------
+
+class DaemonClient:
+    """Thin client for the checker daemon (one persistent connection)."""
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = 30.0):
+        self.socket_path = socket_path or default_socket_path()
+        try:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(self.socket_path)
+        except OSError as e:
+            raise DaemonUnavailable(f"Checker daemon not running at {self.socket_path}: {e}")
+        self._reader = self._sock.makefile("rb")
+
+    def request(self, payload: Dict[str, Any]) -> Any:
+        self._sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise DaemonUnavailable("Checker daemon closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "daemon error"))
+        return response.get("result")
+
+    def ping(self) -> Dict[str, Any]:
+        return self.request({"op": "ping"})
+
+    def check(self, content: str, filename: Optional[str] = None) -> Dict[str, Any]:
+        return self.request({"op": "check", "content": content, "filename": filename})
+
+    def report(self, content: str, filename: Optional[str] = None, profile: str = "full",
+               budget: Optional[float] = None) -> Dict[str, Any]:
+        return self.request({"op": "report", "content": content, "filename": filename,
+                             "profile": profile, "budget": budget})
+
+    def analyze_file(self, path: str, profile: str = "errors", budget: Optional[float] = None) -> Dict[str, Any]:
+        result = self.request({"op": "analyze_file", "path": os.path.abspath(path),
+                               "profile": profile, "budget": budget})
+        result["path"] = path
+        return result
+
+    def analyze_content(self, path: str, data: bytes, profile: str = "errors",
+                        budget: Optional[float] = None) -> Dict[str, Any]:
+        content = data.decode("utf-8", errors="replace")
+        return self.request({"op": "analyze_content", "path": path, "content": content,
+                             "profile": profile, "budget": budget})
+
+    def rules(self) -> List[Dict[str, Any]]:
+        return self.request({"op": "rules"})
+
+    def shutdown(self) -> None:
+        self.request({"op": "shutdown"})
+
+    def close(self) -> None:
+        try:
+            self._reader.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def connect(socket_path: Optional[str] = None) -> Optional[DaemonClient]:
+    """Return a client if a daemon is running, else None."""
+    try:
+        return DaemonClient(socket_path)
+    except DaemonUnavailable:
+        return None
+
+
+# ------------------------------------------------------------
+# Server
+# ------------------------------------------------------------
+
+class CheckerDaemon:
+    """
+    Unix-socket server with a warm pipeline
+
+    Each connection is served on its own thread. Results for identical
+    content (sha256 + filename extension + op) are kept in a small LRU so
+    repeated saves of an unchanged file are answered without re-analysis.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, cache_entries: int = CACHE_ENTRIES):
+        self.socket_path = socket_path or default_socket_path()
+        self.cache_entries = cache_entries
+        self._cache: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sock: Optional[socket.socket] = None
+        self.started = time.time()
+        self.requests = 0
+
+    # -- lifecycle ------------------------------------------------
+
+    def bind(self) -> None:
+        if os.path.exists(self.socket_path):
+            if connect(self.socket_path) is not None:
+                raise RuntimeError(f"A daemon is already running at {self.socket_path}")
+            os.unlink(self.socket_path)  # stale socket from a crashed daemon
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)  # socket usable by this user only
+        try:
+            sock.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        sock.listen(64)
+        sock.settimeout(0.5)
+        self._sock = sock
+
+    def serve_forever(self) -> None:
+        from .warmup import warmup
+
+        warmup()  # no-op if the caller already warmed up before bind()
+        if self._sock is None:
+            self.bind()
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = self._sock.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            self._sock.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # -- request handling -----------------------------------------
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        with conn, conn.makefile("rb") as reader:
+            for line in reader:
+                try:
+                    result = self.handle(json.loads(line))
+                    response = {"ok": True, "result": result}
+                except Exception as e:
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                try:
+                    conn.sendall(json.dumps(response, default=json_default).encode("utf-8") + b"\n")
+                except OSError:
+                    return
+                if self._stop.is_set():
+                    return
+
+    def handle(self, request: Dict[str, Any]) -> Any:
+        self.requests += 1
+        op = request.get("op")
+        if op == "ping":
+            return {"pid": os.getpid(), "uptime": time.time() - self.started,
+                    "requests": self.requests, "cached": len(self._cache)}
+        if op == "check":
+            return self._cached(op, request["content"], request.get("filename"), self._check)
+        profile = request.get("profile") or "errors"
+        budget = request.get("budget")
+        if op == "report":
+            profile = request.get("profile") or "full"
+            compute = lambda content, filename: self._report(content, filename, profile, budget)
+            if budget is not None:
+                return compute(request["content"], request.get("filename"))  # budget cuts are not cached
+            return self._cached(f"report:{profile}", request["content"], request.get("filename"), compute)
+        if op == "analyze_file":
+            from .batch_checker import analyze_file
+            return analyze_file(request["path"], profile, budget)
+        if op == "analyze_content":
+            from .batch_checker import analyze_bytes
+            return analyze_bytes(request["path"], request["content"].encode("utf-8"), profile, budget)
+        if op == "rules":
+            from .syntax_checker import rule_stats
+            return rule_stats()
+        if op == "shutdown":
+            self.stop()
+            return {"stopping": True}
+        raise ValueError(f"Unknown op: {op!r}")
+
+    @staticmethod
+    def _check(content: str, filename: Optional[str]):
+        from .error_engine import detect_errors
+        return detect_errors(content, filename=filename)
+
+    @staticmethod
+    def _report(content: str, filename: Optional[str], profile: str = "full", budget: Optional[float] = None):
+        from .batch_checker import analyze_report
+        return analyze_report(content, filename=filename, profile=profile, budget=budget)
+
+    def _cached(self, op: str, content: str, filename: Optional[str], compute):
+        ext = os.path.splitext(filename or "")[1].lower()
+        key = (op, ext, hashlib.sha256(content.encode("utf-8")).digest())
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        result = compute(content, filename)
+        with self._cache_lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return result
+
+
+# ------------------------------------------------------------
+# Command line
+# ------------------------------------------------------------
+
+def start_background(socket_path: Optional[str] = None, timeout: float = START_TIMEOUT) -> bool:
+    """Launch a detached daemon and wait until it answers. False if it never came up."""
+    import subprocess
+
+    socket_path = socket_path or default_socket_path()
+    if connect(socket_path) is not None:
+        return True
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, SYNTAX_DAEMON_SOCKET=socket_path)
+    subprocess.Popen(
+        [sys.executable, "-m", "src.daemon", "serve"], cwd=root, env=env,
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        client = connect(socket_path)
+        if client is not None:
+            client.close()
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def _check_files(paths: Iterable[str]) -> int:
+    client = connect()
+    if client is None:
+        print("❌ Checker daemon is not running (start it with: python -m src.daemon start)")
+        return 2
+    found = False
+    with client:
+        for path in paths:
+            result = client.analyze_file(path)
+            found = found or result["has_errors"]
+            line = next((f":{i['line']}" for i in result["issues"] if i.get("line")), "")
+            status = f"❌ {result['predicted_error']}" if result["has_errors"] else "✅ OK"
+            print(f"{path}{line}  {status}")
+    return 1 if found else 0
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "status"
+
+    if command == "serve":
+        from .warmup import warmup
+
+        # Warm up before binding so `start` returns only once answers are fast
+        warmup()
+        daemon = CheckerDaemon()
+        daemon.bind()
+        print(f"🚀 Checker daemon listening on {daemon.socket_path}")
+        daemon.serve_forever()
+        return 0
+    if command == "start":
+        if start_background():
+            print(f"✅ Checker daemon running at {default_socket_path()}")
+            return 0
+        print("❌ Checker daemon failed to start")
+        return 2
+    if command == "stop":
+        client = connect()
+        if client is None:
+            print("ℹ️ Checker daemon is not running")
+            return 0
+        with client:
+            client.shutdown()
+        deadline = time.time() + 5.0
+        while os.path.exists(default_socket_path()) and time.time() < deadline:
+            time.sleep(0.05)
+        print("✅ Checker daemon stopped")
+        return 0
+    if command == "status":
+        client = connect()
+        if client is None:
+            print("ℹ️ Checker daemon is not running")
+            return 1
+        with client:
+            info = client.ping()
+        print(f"✅ Checker daemon running (pid {info['pid']}, up {info['uptime']:.0f}s, "
+              f"{info['requests']} requests)")
+        return 0
+    if command == "check":
+        return _check_files(argv[1:])
+
+    print("Usage: python -m src.daemon start|stop|status|serve|check FILE...")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
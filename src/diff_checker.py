@@ -0,0 +1,301 @@
+"""
+Diff Checker Module
+Checks only the lines a unified diff touches. Line-oriented detectors
+(missing colon, missing semicolon) run on the changed lines; cheap
+hunk-level signals (bracket balance, indentation, quotes) decide whether a
+whole-file parse is needed to confirm and locate an error.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from .language_detector import detect_language
+from .syntax_checker import (
+    BracketScanner, Issue, check_colon_line, check_semicolon_line, classify_syntax_error, rule_enabled, try_ast_parse
+)
+
+DEFAULT_CONTEXT = 3
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+OPENERS = "([{"
+CLOSERS = ")]}"
+
+
+class DiffApplyError(ValueError):
+    """The diff does not match the supplied base content."""
+
+
+# ------------------------------------------------------------
+# Parsing and applying
+# ------------------------------------------------------------
+
+def _strip_prefix(path: str) -> Optional[str]:
+    path = path.split("\t", 1)[0].strip()
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        return path[2:]
+    return path
+
+
+def parse_unified_diff(diff: str) -> List[Dict[str, Any]]:
+    """
+    Parse a (possibly multi-file) unified diff
+
+    Returns:
+        list of {"old_path", "new_path", "hunks"}; each hunk is
+        {"old_start", "old_len", "new_start", "new_len", "lines"} with
+        lines as (tag, text) pairs, tag one of ' ', '-', '+'
+    """
+    files = []
+    current = None
+    hunk = None
+    old_left = new_left = 0
+    for line in diff.splitlines():
+        if hunk is not None and (old_left > 0 or new_left > 0):
+            tag, text = (line[:1] or " "), line[1:]
+            if tag == "\\":
+                continue  # "\ No newline at end of file"
+            if tag not in " -+":
+                raise ValueError(f"Malformed hunk line: {line!r}")
+            hunk["lines"].append((tag, text))
+            if tag != "+":
+                old_left -= 1
+            if tag != "-":
+                new_left -= 1
+            continue
+        if line.startswith("--- "):
+            current = {"old_path": _strip_prefix(line[4:]), "new_path": None, "hunks": []}
+            files.append(current)
+            hunk = None
+        elif line.startswith("+++ ") and current is not None:
+            current["new_path"] = _strip_prefix(line[4:])
+        elif line.startswith("@@"):
+            m = HUNK_HEADER.match(line)
+            if not m or current is None:
+                raise ValueError(f"Malformed hunk header: {line!r}")
+            old_len = int(m.group(2)) if m.group(2) is not None else 1
+            new_len = int(m.group(4)) if m.group(4) is not None else 1
+            hunk = {"old_start": int(m.group(1)), "old_len": old_len,
+                    "new_start": int(m.group(3)), "new_len": new_len, "lines": []}
+            current["hunks"].append(hunk)
+            old_left, new_left = old_len, new_len
+    return [f for f in files if f["hunks"]]
+
+
+def _matches(lines: List[str], start: int, hunk: Dict[str, Any], side: str) -> bool:
+    """Do the hunk's lines for `side` ('-' old, '+' new) appear at 0-based `start`?"""
+    expected = [text for tag, text in hunk["lines"] if tag in (" ", side)]
+    return lines[start:start + len(expected)] == expected
+
+
+def apply_hunks(base_lines: List[str], hunks: List[Dict[str, Any]]) -> List[str]:
+    """
+    Return the new file's lines
+
+    The hunks are applied to base_lines. If they do not apply but the
+    content already matches the new side of every hunk (the diff was
+    already applied, e.g. `git diff` against the working tree), the
+    content is returned unchanged. Otherwise raises DiffApplyError.
+    """
+    if all(_matches(base_lines, h["old_start"] - 1 if h["old_len"] else h["old_start"], h, "-")
+           for h in hunks):
+        out = []
+        pos = 0
+        for h in hunks:
+            start = h["old_start"] - 1 if h["old_len"] else h["old_start"]
+            out.extend(base_lines[pos:start])
+            out.extend(text for tag, text in h["lines"] if tag in " +")
+            pos = start + h["old_len"]
+        out.extend(base_lines[pos:])
+        return out
+    if all(_matches(base_lines, h["new_start"] - 1 if h["new_len"] else h["new_start"], h, "+")
+           for h in hunks):
+        return base_lines
+    raise DiffApplyError("Diff does not apply to the supplied base content")
+
+
+def changed_line_numbers(hunks: List[Dict[str, Any]]) -> Set[int]:
+    """
+    1-based line numbers of added lines in the new file, plus the line that
+    follows each deletion (the gap is where a deletion can break the file).
+    A deletion at the end of the file gives the line after the last one.
+    """
+    changed = set()
+    for h in hunks:
+        lineno = h["new_start"] if h["new_len"] else h["new_start"] + 1
+        for tag, _ in h["lines"]:
+            if tag != " ":
+                changed.add(lineno)
+            if tag != "-":
+                lineno += 1
+    return changed
+
+
+# ------------------------------------------------------------
+# Hunk-level signals
+# ------------------------------------------------------------
+
+def _bracket_balance(hunk: Dict[str, Any], side: str, language: str) -> List[int]:
+    """Net opener count per bracket kind on the side ('-' or '+') lines of a hunk, outside strings and comments."""
+    scanner = BracketScanner(language)
+    balance = [0] * len(OPENERS)
+    for tag, text in hunk["lines"]:
+        if tag != side and tag != " ":
+            continue
+        # Context lines are scanned too, so a string or comment they open is honoured
+        brackets = scanner.brackets(text)
+        if tag == side:
+            for _, ch in brackets:
+                if ch in OPENERS:
+                    balance[OPENERS.index(ch)] += 1
+                else:
+                    balance[CLOSERS.index(ch)] -= 1
+    return balance
+
+
+def _bracket_delta(hunk: Dict[str, Any], language: str) -> bool:
+    """True if the change alters the net bracket balance (a bracket was likely lost or added)."""
+    return _bracket_balance(hunk, "-", language) != _bracket_balance(hunk, "+", language)
+
+
+def _indent(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _python_needs_parse(new_lines: List[str], changed: Set[int]) -> bool:
+    """Cheap per-line signals that a changed Python line may break indentation or quoting."""
+    for lineno in changed:
+        line = new_lines[lineno - 1]
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = _indent(line)
+        if " " in indent and "\t" in indent:
+            return True
+        code = stripped.split("#", 1)[0]
+        if "'''" not in code and '"""' not in code and (code.count("'") % 2 or code.count('"') % 2):
+            return True
+        # Compare with the previous non-blank line
+        prev = lineno - 2
+        while prev >= 0 and not new_lines[prev].strip():
+            prev -= 1
+        if prev < 0:
+            continue
+        prev_line = new_lines[prev].rstrip()
+        prev_code = prev_line.split("#", 1)[0].rstrip()
+        deeper = len(indent) > len(_indent(prev_line))
+        if prev_code.endswith(":") and not deeper:
+            return True
+        if deeper and not prev_code.endswith((":", "\\", "(", "[", "{", ",")):
+            return True
+    # Lines right after a changed block opener must be indented too
+    for lineno in changed:
+        if lineno < len(new_lines):
+            code = new_lines[lineno - 1].split("#", 1)[0].rstrip()
+            nxt = new_lines[lineno]
+            if code.endswith(":") and nxt.strip() and len(_indent(nxt)) <= len(_indent(new_lines[lineno - 1])):
+                return True
+    return False
+
+
+# ------------------------------------------------------------
+# Checking
+# ------------------------------------------------------------
+
+def check_file_diff(path: str, base_content: str, hunks: List[Dict[str, Any]],
+                    context: int = DEFAULT_CONTEXT) -> Dict[str, Any]:
+    """
+    Check the changed lines of one file
+
+    Returns:
+        dict with path, language, issues, changed_lines, full_checks
+        (whole-file checks that were needed: "brackets", "ast") and
+        has_errors
+    """
+    new_lines = apply_hunks(base_content.splitlines(), hunks)
+    # A deletion at the end of the file maps past its last line
+    changed = {min(n, len(new_lines)) for n in changed_line_numbers(hunks)} if new_lines else set()
+    near = {n + d for n in changed for d in range(-context, context + 1)}
+    language = detect_language("\n".join(new_lines[:200]), path)
+
+    issues = []
+    for lineno in sorted(changed):
+        line = new_lines[lineno - 1]
+        issue = None
+        if language == "Python":
+            issue = check_colon_line(lineno, line) if rule_enabled("missing_colon") else None
+        elif language in ("Java", "C", "C++"):
+            issue = check_semicolon_line(lineno, line) if rule_enabled("missing_semicolon") else None
+        if issue:
+            issues.append(issue)
+
+    # Whole-file checks, only when a hunk-level signal asks for them
+    full_checks = []
+    full = []
+    if rule_enabled("unmatched_brackets") and any(_bracket_delta(h, language) for h in hunks):
+        full_checks.append("brackets")
+        scanner = BracketScanner(language)
+        for lineno, line in enumerate(new_lines, start=1):
+            full += scanner.feed_line(lineno, line)
+        full += scanner.finish()
+    if language == "Python" and rule_enabled("syntax") and (full_checks or _python_needs_parse(new_lines, changed)):
+        full_checks.append("ast")
+        ok, exc = try_ast_parse("\n".join(new_lines) + "\n")
+        if not ok and exc is not None:
+            full.append(Issue.from_dict(classify_syntax_error(exc)))
+
+    seen = {(i["type"], i["line"]) for i in issues}
+    for issue in full:
+        # Keep whole-file findings that land near the change (or have no line)
+        key = (issue.type, issue.line)
+        if (issue.line is None or issue.line in near) and key not in seen:
+            issues.append(issue)
+            seen.add(key)
+
+    issues.sort(key=lambda i: i.line or 0)
+    return {
+        "path": path,
+        "language": language,
+        "issues": issues,
+        "changed_lines": len(changed),
+        "full_checks": full_checks,
+        "has_errors": bool(issues)
+    }
+
+
+def check_diff(diff: str, base_files: Dict[str, str], context: int = DEFAULT_CONTEXT) -> Dict[str, Any]:
+    """
+    Check every file in a unified diff
+
+    Args:
+        diff: Unified diff text (git diff or diff -u)
+        base_files: Content of each file before the change, keyed by its
+            old path (new files need no entry). Content that already
+            includes the change is accepted as well.
+        context: Lines around a change in which whole-file findings are kept
+
+    Raises:
+        DiffApplyError: if a hunk does not match the base content
+        KeyError: if a modified file's base content is missing
+    """
+    results = []
+    for patch in parse_unified_diff(diff):
+        path = patch["new_path"] or patch["old_path"]
+        if patch["new_path"] is None:
+            continue  # deleted file: nothing to check
+        if patch["old_path"] is None:
+            base = ""
+        elif patch["old_path"] in base_files:
+            base = base_files[patch["old_path"]]
+        elif path in base_files:
+            base = base_files[path]
+        else:
+            raise KeyError(patch["old_path"])
+        results.append(check_file_diff(path, base, patch["hunks"], context))
+
+    return {
+        "files": results,
+        "total_issues": sum(len(r["issues"]) for r in results),
+        "has_errors": any(r["has_errors"] for r in results)
+    }
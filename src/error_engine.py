@@ -1,12 +1,15 @@
 from .language_detector import detect_language
 from .ml_engine import detect_error_ml
-from .syntax_checker import detect_all
+from .syntax_checker import detect_all, first_issue
 from .tutor_explainer import explain_error
 
 CONFIDENCE_THRESHOLD = 0.65
 
 
-def detect_errors(code: str, filename: str | None = None):
+def detect_errors(code: str, filename: str | None = None, first_only: bool = False, recover: bool = False):
+    # first_only: stop at the first rule-based issue (pass/fail verdicts);
+    # has-errors is the same as a full run, only the issue list is shorter
+    # recover: list every independent Python syntax error, not only the first
     # 🔑 language detection WITH filename
     language = detect_language(code, filename)
 
@@ -16,7 +19,11 @@ def detect_errors(code: str, filename: str | None = None):
     rule_based_issues = []
 
     if language == "Python":
-        rule_based_issues = detect_all(code)
+        if first_only:
+            issue = first_issue(code)
+            rule_based_issues = [issue] if issue else []
+        else:
+            rule_based_issues = detect_all(code, recover=recover)
 
         if not rule_based_issues:
             return {
@@ -42,54 +49,14 @@ def detect_errors(code: str, filename: str | None = None):
         }
 
     # ------------------------------------------------
-    # 2. ML-based prediction
-    # ------------------------------------------------
-    ml_error, confidence = detect_error_ml(code)
-
-    # ------------------------------------------------
-    # 3. HARD RULES: Java / C / C++
+    # 2. HARD RULES: Java / C / C++ (the ML prediction is not used here)
     # ------------------------------------------------
     if language in ["Java", "C", "C++"]:
-        lines = [l.strip() for l in code.splitlines() if l.strip()]
-
-        # More sophisticated semicolon check
-        semicolon_required_lines = []
-        import re
-        # Patterns for simple statements that require semicolons
-        simple_statements = [
-            r'^return\s+.+$',                # return statements
-            r'^cout\s*<<.*$',                # C++ cout
-            r'^cin\s*>>.*$',                 # C++ cin
-            r'^printf\s*\(.*\)$',          # C printf
-            r'^fprintf\s*\(.*\)$',         # C fprintf
-            r'^puts\s*\(.*\)$',            # C puts
-            r'^std::cout\s*<<.*$',           # C++ std::cout
-            r'^std::cin\s*>>.*$',            # C++ std::cin
-        ]
-        for l in lines:
-            # Skip comments, preprocessor directives, and control structures
-            if (l.startswith('//') or l.startswith('/*') or l.startswith('*') or 
-                l.startswith('#') or l.endswith('{') or l.endswith('}') or
-                l.startswith('import') or l.startswith('package') or
-                l.startswith('using') or l.startswith('namespace') or
-                l.startswith('public class') or l.startswith('class ') or
-                l.startswith('private class') or l.startswith('protected class')):
-                continue
-            # Check if line looks like it needs a semicolon but doesn't have one
-            is_control = any(keyword in l for keyword in [
-                'if (', 'if(', 'for (', 'for(', 'while (', 'while(', 'else', 'try', 'catch', 
-                'switch (', 'switch(', 'case ', 'default:', 'do ', 'do{'
-            ])
-            if not is_control and not l.endswith(';') and not l.endswith('{') and not l.endswith('}'):
-                # Check for simple statement patterns
-                if any(re.match(pat, l) for pat in simple_statements):
-                    semicolon_required_lines.append(l)
-                # Also check for assignment or function call
-                elif ('=' in l or ('(' in l and ')' in l)) and not l.startswith('}'):
-                    semicolon_required_lines.append(l)
+        # Semicolon check (the missing_semicolon rule)
+        semicolon_required = first_issue(code, language)
 
         # ❌ Missing semicolon is ALWAYS an error
-        if semicolon_required_lines:
+        if semicolon_required:
             tutor_help = explain_error("MissingDelimiter")
             return {
                 "language": language,
@@ -112,6 +79,11 @@ def detect_errors(code: str, filename: str | None = None):
             "rule_based_issues": []
         }
 
+    # ------------------------------------------------
+    # 3. ML-based prediction
+    # ------------------------------------------------
+    ml_error, confidence = detect_error_ml(code)
+
     # ------------------------------------------------
     # 4. Fallback (non-Java languages only)
     # ------------------------------------------------
@@ -0,0 +1,344 @@
+"""
+File Discovery Module
+Expands CLI path arguments (files, directories, globs) into source files,
+honoring include/exclude patterns and .gitignore rules
+"""
+
+import fnmatch
+import glob
+import os
+import re
+import subprocess
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+SUPPORTED_EXTENSIONS = (".py", ".java", ".c", ".cpp")
+
+# Directories never worth descending into
+ALWAYS_SKIP_DIRS = {".git", ".hg", ".svn", "__pycache__", ".mypy_cache", ".pytest_cache", ".tox", ".venv"}
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob into a regex (without anchors)."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 3] == "**/":
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern[i:i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class GitIgnoreRule:
+    """One line of a .gitignore file, bound to the directory that contains it."""
+
+    __slots__ = ("base", "prefix", "negate", "dir_only", "regex")
+
+    def __init__(self, base: str, pattern: str):
+        self.base = base
+        self.prefix = base.rstrip(os.sep) + os.sep
+        self.negate = pattern.startswith("!")
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+        prefix = "" if anchored else "(?:.*/)?"
+        self.regex = re.compile(f"^{prefix}{_translate(pattern)}$")
+
+    def matches(self, abs_path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if not abs_path.startswith(self.prefix):
+            return False
+        rel = abs_path[len(self.prefix):]
+        if os.sep != "/":
+            rel = rel.replace(os.sep, "/")
+        return bool(self.regex.match(rel))
+
+
+def parse_gitignore(path: str) -> List[GitIgnoreRule]:
+    """Parse a .gitignore file into rules (missing/unreadable files give no rules)."""
+    rules = []
+    base = os.path.dirname(os.path.abspath(path))
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            for line in fh:
+                line = line.rstrip("\n").rstrip("\r")
+                if not line.endswith("\\ "):
+                    line = line.rstrip(" ")
+                if not line or line.startswith("#"):
+                    continue
+                rules.append(GitIgnoreRule(base, line))
+    except OSError:
+        pass
+    return rules
+
+
+def is_ignored(abs_path: str, is_dir: bool, rules: List[GitIgnoreRule]) -> bool:
+    """Apply rules in order; the last matching rule decides."""
+    ignored = False
+    for rule in rules:
+        if rule.matches(abs_path, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+def _ancestor_rules(directory: str) -> List[GitIgnoreRule]:
+    """Collect .gitignore rules from the enclosing repository down to `directory`."""
+    directory = os.path.abspath(directory)
+    chain = []
+    current = directory
+    while True:
+        chain.append(current)
+        if os.path.isdir(os.path.join(current, ".git")):
+            break
+        parent = os.path.dirname(current)
+        if parent == current:
+            # Not inside a git repository: only the directory's own .gitignore applies
+            chain = [directory]
+            break
+        current = parent
+    rules = []
+    for d in reversed(chain[1:]):
+        rules += parse_gitignore(os.path.join(d, ".gitignore"))
+    return rules
+
+
+def _matches_any(rel_path: str, patterns: Optional[Iterable[str]]) -> bool:
+    if not patterns:
+        return False
+    name = os.path.basename(rel_path)
+    return any(fnmatch.fnmatch(rel_path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def _wanted(rel_path: str, include, exclude) -> bool:
+    if _matches_any(rel_path, exclude):
+        return False
+    if include:
+        return _matches_any(rel_path, include)
+    return rel_path.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def _walk(root: str, include, exclude, use_gitignore: bool) -> Iterator[str]:
+    root_abs = os.path.abspath(root)
+    base_rules = _ancestor_rules(root_abs) if use_gitignore else []
+    stack: List[Tuple[str, str, List[GitIgnoreRule]]] = [(root_abs, "", base_rules)]
+    while stack:
+        directory, rel_dir, rules = stack.pop()
+        if use_gitignore:
+            rules = rules + parse_gitignore(os.path.join(directory, ".gitignore"))
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir and entry.name in ALWAYS_SKIP_DIRS:
+                continue
+            if rules and is_ignored(entry.path, is_dir, rules):
+                continue
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if is_dir:
+                if not _matches_any(rel, exclude):
+                    subdirs.append((entry.path, rel, rules))
+            elif entry.is_file() and _wanted(rel, include, exclude):
+                yield os.path.join(root, rel)
+        stack.extend(reversed(subdirs))
+
+
+def is_candidate(path: str, root: str, include=None, exclude=None, use_gitignore: bool = True) -> bool:
+    """
+    Would a walk of `root` yield `path`? Used to classify single paths
+    (e.g. from file-system events) without re-walking the whole tree.
+    """
+    abs_root = os.path.abspath(root)
+    abs_path = os.path.abspath(path)
+    if not abs_path.startswith(abs_root.rstrip(os.sep) + os.sep) or not os.path.isfile(abs_path):
+        return False
+    parts = os.path.relpath(abs_path, abs_root).split(os.sep)
+    if any(p in ALWAYS_SKIP_DIRS for p in parts[:-1]):
+        return False
+    rel = "/".join(parts)
+    if not _wanted(rel, include, exclude) or any(_matches_any("/".join(parts[:i]), exclude)
+                                                  for i in range(1, len(parts))):
+        return False
+    if not use_gitignore:
+        return True
+    rules = _ancestor_rules(abs_root)
+    current = abs_root
+    for i, part in enumerate(parts):
+        rules = rules + parse_gitignore(os.path.join(current, ".gitignore"))
+        current = os.path.join(current, part)
+        if is_ignored(current, i < len(parts) - 1, rules):
+            return False
+    return True
+
+
+def discover_files(paths: Iterable[str], include: Optional[List[str]] = None,
+                   exclude: Optional[List[str]] = None, use_gitignore: bool = True) -> Iterator[str]:
+    """
+    Expand paths into source files to check
+
+    Args:
+        paths: Files, directories (searched recursively) or glob patterns
+        include: Glob patterns a file must match (default: supported extensions)
+        exclude: Glob patterns for files/directories to skip
+        use_gitignore: Skip files ignored by .gitignore rules in walked directories
+
+    Explicitly named files are always yielded. Each file is yielded once.
+    """
+    seen = set()
+    for arg in paths:
+        if os.path.isfile(arg):
+            candidates = [arg]
+        elif os.path.isdir(arg):
+            candidates = _walk(arg, include, exclude, use_gitignore)
+        else:
+            candidates = (
+                p for p in sorted(glob.glob(arg, recursive=True))
+                if os.path.isfile(p) and _wanted(p.replace(os.sep, "/"), include, exclude)
+            )
+        for path in candidates:
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                yield path
+
+
+def _git(args: List[str], cwd: str) -> bytes:
+    try:
+        proc = subprocess.run(["git", *args], cwd=cwd, capture_output=True, check=False)
+    except OSError as e:
+        raise RuntimeError(f"git is not available: {e}")
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode("utf-8", errors="replace").strip() or "git failed")
+    return proc.stdout
+
+
+def _scopes(paths: Iterable[str]) -> List[Tuple[str, str]]:
+    scopes = []
+    for arg in paths:
+        abs_arg = os.path.abspath(arg)
+        if os.path.isdir(abs_arg):
+            scopes.append(("dir", abs_arg.rstrip(os.sep) + os.sep))
+        elif os.path.isfile(abs_arg):
+            scopes.append(("file", abs_arg))
+        else:
+            scopes.append(("glob", abs_arg))
+    return scopes
+
+
+def _in_scope(abs_path: str, scopes: List[Tuple[str, str]]) -> bool:
+    return any(
+        abs_path.startswith(value) if kind == "dir"
+        else abs_path == value if kind == "file"
+        else fnmatch.fnmatch(abs_path, value)
+        for kind, value in scopes
+    )
+
+
+def changed_files(ref: str, paths: Iterable[str] = (".",), include: Optional[List[str]] = None,
+                  exclude: Optional[List[str]] = None, cwd: str = ".") -> List[str]:
+    """
+    Files changed since a git ref, limited to `paths`
+
+    Uses `git diff --name-only <ref>` (committed and uncommitted changes,
+    deletions excluded) plus untracked files not ignored by .gitignore.
+    Raises RuntimeError if git fails (unknown ref, not a repository).
+    """
+    top = _git(["rev-parse", "--show-toplevel"], cwd).decode().strip()
+    diff = _git(["diff", "--name-only", "-z", "--diff-filter=ACMR", ref, "--"], top)
+    untracked = _git(["ls-files", "--others", "--exclude-standard", "-z"], top)
+    names = {n for n in (diff + untracked).decode("utf-8", errors="surrogateescape").split("\0") if n}
+
+    scopes = _scopes(paths)
+    files = []
+    for name in sorted(names):
+        abs_path = os.path.join(top, *name.split("/"))
+        if os.path.isfile(abs_path) and _in_scope(abs_path, scopes) and _wanted(name, include, exclude):
+            files.append(os.path.relpath(abs_path))
+    return files
+
+
+def staged_files(paths: Iterable[str] = (".",), include: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None, cwd: str = ".") -> List[Tuple[str, bytes]]:
+    """
+    Staged (index) content of added/copied/modified/renamed source files
+
+    Two git calls regardless of the number of files: `git diff --cached
+    --raw` lists the staged blob ids and one `git cat-file --batch` reads
+    them all. Content comes from the index, not the working tree, so what
+    is checked is exactly what will be committed. Returns (path, content)
+    pairs with paths relative to the current directory.
+    """
+    top = _git(["rev-parse", "--show-toplevel"], cwd).decode().strip()
+    raw = _git(["diff", "--cached", "--raw", "-z", "--no-abbrev", "--diff-filter=ACMR"], top)
+
+    fields = raw.split(b"\0")
+    entries = []
+    i = 0
+    while i < len(fields) - 1:
+        meta = fields[i].decode().split()
+        status = meta[4] if len(meta) > 4 else ""
+        # Renames/copies list old and new path; the new one is last
+        width = 2 if status[:1] in ("R", "C") else 1
+        name = fields[i + width].decode("utf-8", errors="surrogateescape")
+        i += 1 + width
+        if meta[1] not in ("100644", "100755"):
+            continue  # symlinks, submodules
+        entries.append((name, meta[3]))
+
+    scopes = _scopes(paths)
+    wanted = []
+    for name, blob in entries:
+        abs_path = os.path.join(top, *name.split("/"))
+        if _in_scope(abs_path, scopes) and _wanted(name, include, exclude):
+            wanted.append((os.path.relpath(abs_path), blob))
+    if not wanted:
+        return []
+
+    proc = subprocess.run(["git", "cat-file", "--batch"], cwd=top, capture_output=True,
+                          input="".join(f"{blob}\n" for _, blob in wanted).encode())
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode("utf-8", errors="replace").strip() or "git cat-file failed")
+    out = proc.stdout
+    files = []
+    pos = 0
+    for path, blob in wanted:
+        header_end = out.index(b"\n", pos)
+        size = int(out[pos:header_end].split()[2])
+        start = header_end + 1
+        files.append((path, out[start:start + size]))
+        pos = start + size + 1
+    return files
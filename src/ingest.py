@@ -0,0 +1,222 @@
+"""
+File Ingestion Module
+Opens source files for checking without assuming UTF-8 or small sizes.
+Large files are memory-mapped instead of read, the encoding is sniffed
+from a prefix (BOM, PEP 263 coding cookie, UTF-8 validity), text is decoded
+only when first needed, binary files are detected from their first few KB,
+and huge or vendored files are handled by a configurable size policy.
+
+Environment:
+    SYNTAX_MAX_FILE_BYTES      files above this size fall under the policy (default 5 MB)
+    SYNTAX_VENDORED_MAX_BYTES  the same limit for vendored/generated files (default 256 KB)
+    SYNTAX_SIZE_POLICY         stream (line-oriented checks only), skip, or full
+    SYNTAX_MMAP_THRESHOLD      files at least this large are memory-mapped (default 1 MB)
+"""
+
+import codecs
+import hashlib
+import mmap
+import os
+import re
+from typing import Iterator, Optional, Tuple, Union
+
+SNIFF_BYTES = 8192
+CHUNK_SIZE = 1024 * 1024
+
+SIZE_POLICIES = ("stream", "skip", "full")
+MAX_FILE_BYTES = int(os.getenv("SYNTAX_MAX_FILE_BYTES", 5 * 1024 * 1024))
+VENDORED_MAX_BYTES = int(os.getenv("SYNTAX_VENDORED_MAX_BYTES", 256 * 1024))
+SIZE_POLICY = os.getenv("SYNTAX_SIZE_POLICY", "stream")
+MMAP_THRESHOLD = int(os.getenv("SYNTAX_MMAP_THRESHOLD", 1024 * 1024))
+
+if SIZE_POLICY not in SIZE_POLICIES:
+    raise ValueError(f"SYNTAX_SIZE_POLICY must be one of {', '.join(SIZE_POLICIES)}")
+
+# UTF-32 BOMs first: the UTF-32-LE BOM starts with the UTF-16-LE one
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+CODING_COOKIE = re.compile(rb"^[ \t\f]*#.*?coding[:=][ \t]*([-\w.]+)")
+FALLBACK_ENCODING = "cp1252"
+
+VENDORED_DIRS = {"vendor", "vendored", "third_party", "thirdparty", "third-party", "node_modules", "external"}
+GENERATED_MARKERS = (b"@generated", b"DO NOT EDIT", b"Code generated by", b"autogenerated", b"auto-generated")
+
+# Control bytes that do not occur in text (tab, LF, FF, CR and ESC do)
+_TEXT_CONTROLS = {8, 9, 10, 12, 13, 27}
+_CONTROL_BYTES = bytes(b for b in range(32) if b not in _TEXT_CONTROLS) + b"\x7f"
+
+
+def policy_fingerprint() -> str:
+    """Settings that change results; part of the result-cache version."""
+    return f"{SIZE_POLICY}:{MAX_FILE_BYTES}:{VENDORED_MAX_BYTES}"
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """Encoding from a BOM, a PEP 263 coding cookie, or UTF-8 validity of the prefix."""
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    for line in prefix.splitlines()[:2]:
+        m = CODING_COOKIE.match(line)
+        if m:
+            try:
+                return codecs.lookup(m.group(1).decode("ascii")).name
+            except (LookupError, UnicodeDecodeError):
+                break
+    try:
+        # final=False: a multi-byte character cut at the prefix end is fine
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def is_binary(prefix: bytes) -> bool:
+    """NUL bytes or >30% non-text control bytes in the prefix (UTF-16/32 with a BOM is text)."""
+    if not prefix:
+        return False
+    if any(prefix.startswith(bom) for bom, encoding in BOMS if encoding != "utf-8-sig"):
+        return False
+    if b"\0" in prefix:
+        return True
+    controls = len(prefix) - len(prefix.translate(None, _CONTROL_BYTES))
+    return controls / len(prefix) > 0.3
+
+
+def is_vendored(path: str, prefix: bytes = b"") -> bool:
+    """Third-party (vendor directory) or generated (marker in the header) source."""
+    parts = path.replace("\\", "/").split("/")[:-1]
+    if any(part.lower() in VENDORED_DIRS for part in parts):
+        return True
+    head = prefix[:1024]
+    return any(marker in head for marker in GENERATED_MARKERS)
+
+
+class SourceFile:
+    """
+    A source file opened for checking
+
+    `data` is the raw content: bytes for small files, a read-only mmap for
+    large ones. `text` decodes it on first access; iter_chunks() and
+    iter_text() walk it piecewise without a full copy. Use as a context
+    manager (or call close()) to release the mapping.
+
+    Attributes:
+        skip_reason: "binary" or "too large" when the file should not be checked
+        streamed: True when the file is over its size limit and the policy
+            is "stream" (only the line-oriented, constant-memory checks run)
+    """
+
+    def __init__(self, path: str, data: Union[bytes, mmap.mmap], size: int,
+                 policy: str = None, max_bytes: int = None):
+        self.path = path
+        self.data = data
+        self.size = size
+        prefix = bytes(data[:SNIFF_BYTES])
+        self.encoding = sniff_encoding(prefix)
+        self.binary = is_binary(prefix)
+        self.vendored = is_vendored(path, prefix)
+        policy = policy or SIZE_POLICY
+        if max_bytes is None:
+            max_bytes = VENDORED_MAX_BYTES if self.vendored else MAX_FILE_BYTES
+        self.oversized = size > max_bytes
+        if self.binary:
+            self.skip_reason = "binary"
+        elif self.oversized and policy == "skip":
+            self.skip_reason = "too large"
+        else:
+            self.skip_reason = None
+        self.streamed = self.skip_reason is None and self.oversized and policy == "stream"
+        self._text: Optional[str] = None
+
+    @classmethod
+    def from_bytes(cls, path: str, data: bytes, **kwargs) -> "SourceFile":
+        return cls(path, data, len(data), **kwargs)
+
+    @property
+    def mapped(self) -> bool:
+        return isinstance(self.data, mmap.mmap)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = str(self.data, self.encoding, errors="replace") if self.size else ""
+        return self._text
+
+    def digest(self) -> str:
+        """sha256 of the raw content (hashed straight from the mapping)."""
+        return hashlib.sha256(self.data).hexdigest()
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[memoryview]:
+        view = memoryview(self.data)
+        try:
+            for start in range(0, self.size, chunk_size):
+                yield view[start:start + chunk_size]
+        finally:
+            view.release()
+
+    def iter_text(self, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        for chunk in self.iter_chunks(chunk_size):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def close(self) -> None:
+        if self.mapped and not self.data.closed:
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_source(path: str, policy: str = None, max_bytes: int = None) -> SourceFile:
+    """
+    Open a file for checking; files of MMAP_THRESHOLD bytes or more are
+    memory-mapped rather than read. Raises OSError if it cannot be read.
+    """
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size and size >= MMAP_THRESHOLD:
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = fh.read()
+    return SourceFile(path, data, len(data), policy=policy, max_bytes=max_bytes)
+
+
+def over_size_limit(path: str) -> bool:
+    """Is the file larger than its limit (the vendored limit for vendored files)?"""
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size <= VENDORED_MAX_BYTES:
+            return False
+        limit = VENDORED_MAX_BYTES if is_vendored(path, fh.read(1024)) else MAX_FILE_BYTES
+    return size > limit
+
+
+def read_text(path: str) -> Tuple[Optional[str], SourceFile]:
+    """Decoded text of a file (None for binary files) and its SourceFile (already closed)."""
+    with open_source(path, policy="full") as source:
+        text = None if source.binary else source.text
+    return text, source
+
+
+def file_sha256(path: str) -> str:
+    """sha256 of a file's content without reading large files into memory."""
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size and size >= MMAP_THRESHOLD:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.sha256(mm).hexdigest()
+        return hashlib.sha256(fh.read()).hexdigest()
@@ -0,0 +1,558 @@
+"""
+Language Server Module
+A stdio Language Server Protocol server for editors. Documents are synced
+incrementally (the editor sends only the edited ranges) and a burst of
+edits is analyzed once the user pauses typing.
+
+Python documents keep an IncrementalChecker, so an edit re-checks only the
+edited lines, the lines whose bracket state it changed and the top-level
+blocks it touched. Other languages are checked with detect_all_errors
+whenever their text changed, with the ML prediction made from an
+IncrementalVectorizer (only the edited lines are re-vectorized). AutoFixer fixes are offered as quick-fix code
+actions, and CodeQualityAnalyzer findings (naming, long functions) are
+published as information diagnostics, refreshed when a document is opened
+or saved.
+
+Usage:
+    python -m src.lsp_server      (speaks LSP over stdin/stdout)
+
+Environment:
+    LSP_DEBOUNCE    quiet period in seconds before diagnostics are published (default 0.3)
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlparse
+
+from .syntax_checker import IncrementalChecker, Issue
+
+DEBOUNCE_SECONDS = float(os.getenv("LSP_DEBOUNCE", 0.3))
+
+SERVER_NAME = "syntax-checker"
+SERVER_VERSION = "1.0.0"
+
+# LSP constants
+SYNC_INCREMENTAL = 2
+SEVERITY_ERROR = 1
+SEVERITY_INFORMATION = 3
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+SERVER_NOT_INITIALIZED = -32002
+
+# Extension used for language detection when the URI has none
+LANGUAGE_IDS = {"python": ".py", "java": ".java", "c": ".c", "cpp": ".cpp"}
+
+LINE_BREAK = re.compile(r"\r\n|\r|\n")
+DEF_NAME = re.compile(r"\s*(?:async\s+)?def\s+([A-Za-z_]\w*)")
+
+
+# ------------------------------------------------------------
+# Framing
+# ------------------------------------------------------------
+
+def read_message(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """Read one Content-Length framed JSON-RPC message; None at end of input."""
+    length = None
+    while True:
+        header = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            if length is None:
+                continue  # stray blank line between messages
+            break
+        name, _, value = header.decode("ascii").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    body = stream.read(length)
+    if len(body) < length:
+        return None
+    return json.loads(body)
+
+
+def write_message(stream: BinaryIO, payload: Dict[str, Any]) -> None:
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+# ------------------------------------------------------------
+# Documents
+# ------------------------------------------------------------
+
+def uri_filename(uri: str, language_id: Optional[str] = None) -> str:
+    """File name for language detection, from the URI or the editor's languageId."""
+    name = os.path.basename(unquote(urlparse(uri).path))
+    if not os.path.splitext(name)[1] and language_id in LANGUAGE_IDS:
+        name += LANGUAGE_IDS[language_id]
+    return name
+
+
+def _utf16_to_index(line: str, character: int) -> int:
+    """Code-point index of a UTF-16 code-unit offset (LSP's default encoding)."""
+    if line.isascii():
+        return min(character, len(line))
+    units = 0
+    for index, ch in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(ch) > 0xFFFF else 1
+    return len(line)
+
+
+def _index_to_utf16(line: str, index: int) -> int:
+    if line.isascii():
+        return index
+    return index + sum(1 for ch in line[:index] if ord(ch) > 0xFFFF)
+
+
+class Document:
+    """
+    An open text document: its lines (without line breaks), version and
+    analysis state kept in step with the edits (an IncrementalChecker for
+    Python; an IncrementalVectorizer and the last result for other
+    languages).
+
+    Edits only update the lines and queue themselves; the analysis state
+    catches up in analyze(), under analysis_lock, so an edit never waits
+    for an analysis to finish.
+    """
+
+    def __init__(self, uri: str, text: str, version: int = 0,
+                 language_id: Optional[str] = None, utf16: bool = True):
+        self.uri = uri
+        self.version = version
+        self.filename = uri_filename(uri, language_id)
+        self.utf16 = utf16
+        self.lines = LINE_BREAK.split(text)
+        self.eol = "\r\n" if "\r\n" in text[:4096] else "\n"
+        self.checker: Optional[IncrementalChecker] = None
+        self.vectorizer = None  # ml_engine.IncrementalVectorizer
+        self.quality: Optional[Dict[str, Any]] = None
+        self._language: Optional[str] = None
+        self._last: Tuple[Optional[str], List[Issue]] = (None, [])
+        # Edits not yet applied to the checker / vectorizer (None: rebuild them)
+        self._edits: Optional[List[Tuple[int, int, List[str]]]] = None
+        self.analysis_lock = threading.Lock()
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def language(self) -> str:
+        if self._language is None:
+            from .language_detector import detect_language
+            self._language = detect_language("\n".join(self.lines[:200]), self.filename)
+        return self._language
+
+    def _index(self, position: Dict[str, int]) -> Tuple[int, int]:
+        line = position["line"]
+        if line >= len(self.lines):
+            return len(self.lines) - 1, len(self.lines[-1])
+        character = position["character"]
+        if self.utf16:
+            character = _utf16_to_index(self.lines[line], character)
+        return line, min(character, len(self.lines[line]))
+
+    def column(self, line: int, index: int, lines: Optional[Sequence[str]] = None) -> int:
+        """Position character for a code-point index on a line (of `lines`, default the current ones)."""
+        lines = self.lines if lines is None else lines
+        if self.utf16 and line < len(lines):
+            return _index_to_utf16(lines[line], index)
+        return index
+
+    def apply_change(self, change: Dict[str, Any]) -> None:
+        """Apply one TextDocumentContentChangeEvent (ranged, or whole-text)."""
+        if "range" not in change:
+            self.lines = LINE_BREAK.split(change["text"])
+            self._language = None
+            self._edits = None
+            return
+        start_line, start_col = self._index(change["range"]["start"])
+        end_line, end_col = self._index(change["range"]["end"])
+        prefix = self.lines[start_line][:start_col]
+        suffix = self.lines[end_line][end_col:]
+        new = LINE_BREAK.split(prefix + change["text"])
+        new[-1] += suffix
+        self.lines[start_line:end_line + 1] = new
+        if self._edits is not None:
+            self._edits.append((start_line, end_line + 1, new))
+
+    def snapshot(self) -> Tuple[Tuple[str, ...], str, Optional[List[Tuple[int, int, List[str]]]]]:
+        """Lines, language and queued edits for analyze() (take it while edits are held off)."""
+        edits, self._edits = self._edits, []
+        return tuple(self.lines), self.language, edits
+
+    def analyze(self, snapshot=None) -> List[Issue]:
+        """
+        Issues for the whole document, with 1-based lines
+
+        With a snapshot(), only the snapshot and the analysis state are
+        used, so edits may continue meanwhile; callers hold analysis_lock
+        so the queued edits are applied in order.
+        """
+        lines, language, edits = self.snapshot() if snapshot is None else snapshot
+        if language == "Python":
+            if self.checker is None or edits is None:
+                self.checker = IncrementalChecker("\n".join(lines))
+            else:
+                for start, end, new in edits:
+                    self.checker.replace_lines(start, end, new)
+            return self.checker.check()
+        text = "\n".join(lines)
+        if self.vectorizer is not None:
+            if edits is None:
+                self.vectorizer = None
+            else:
+                for start, end, new in edits:
+                    self.vectorizer.replace_lines(start, end, new)
+        if self._last[0] != text:
+            from . import ml_engine
+            from .multi_error_detector import detect_all_errors
+
+            if self.vectorizer is None and ml_engine.vectorizer is not None:
+                self.vectorizer = ml_engine.IncrementalVectorizer(text)
+            ml = self.vectorizer.predict() if self.vectorizer is not None else None
+            self._last = (text, _detected_issues(detect_all_errors(text, self.filename, ml=ml)))
+        return self._last[1]
+
+
+def _detected_issues(result: Dict[str, Any]) -> List[Issue]:
+    """Flatten a (non-Python) detect_all_errors result into line issues."""
+    issues = []
+    for error_type, locations in result["errors_by_type"].items():
+        for loc in locations:
+            issues.append(Issue(error_type, loc.get("message"), line=loc.get("line") or 1))
+    return issues
+
+
+# ------------------------------------------------------------
+# Server
+# ------------------------------------------------------------
+
+class LanguageServer:
+    """
+    JSON-RPC dispatcher over a pair of binary streams
+
+    Requests and notifications are handled on the calling thread; a
+    background thread publishes diagnostics for documents that have been
+    quiet for `debounce` seconds. Outgoing messages are serialized by a lock.
+    """
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO, debounce: float = DEBOUNCE_SECONDS):
+        self.reader = reader
+        self.writer = writer
+        self.debounce = debounce
+        self.documents: Dict[str, Document] = {}
+        self.utf16 = True
+        self.initialized = False
+        self.shutdown_requested = False
+        self._pending: Dict[str, float] = {}  # uri -> publish time
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._stop = False
+        self._worker = threading.Thread(target=self._publish_loop, daemon=True)
+
+    # -- main loop ------------------------------------------------
+
+    def serve(self) -> int:
+        """Serve until `exit`; returns the process exit code."""
+        self._worker.start()
+        try:
+            while True:
+                message = read_message(self.reader)
+                if message is None:
+                    return 1
+                if message.get("method") == "exit":
+                    return 0 if self.shutdown_requested else 1
+                self.dispatch(message)
+        finally:
+            with self._lock:
+                self._stop = True
+                self._wake.notify()
+
+    def send(self, payload: Dict[str, Any]) -> None:
+        payload["jsonrpc"] = "2.0"
+        with self._write_lock:
+            write_message(self.writer, payload)
+
+    def notify(self, method: str, params: Dict[str, Any]) -> None:
+        self.send({"method": method, "params": params})
+
+    def dispatch(self, message: Dict[str, Any]) -> None:
+        method = message.get("method")
+        if method is None:
+            return  # a response to a server-initiated request; none are sent
+        handler = getattr(self, "on_" + method.replace("/", "_").replace("$", "_"), None)
+        is_request = "id" in message
+        if is_request and not self.initialized and method != "initialize":
+            self.send({"id": message["id"], "error": {"code": SERVER_NOT_INITIALIZED,
+                                                      "message": "Server not initialized"}})
+            return
+        if handler is None:
+            if is_request:
+                self.send({"id": message["id"], "error": {"code": METHOD_NOT_FOUND,
+                                                          "message": f"Unhandled method {method}"}})
+            return
+        try:
+            result = handler(message.get("params") or {})
+        except Exception as e:
+            if is_request:
+                self.send({"id": message["id"], "error": {"code": INTERNAL_ERROR,
+                                                          "message": f"{type(e).__name__}: {e}"}})
+            return
+        if is_request:
+            self.send({"id": message["id"], "result": result})
+
+    # -- lifecycle ------------------------------------------------
+
+    def on_initialize(self, params):
+        encodings = ((params.get("capabilities") or {}).get("general") or {}).get("positionEncodings") or []
+        self.utf16 = "utf-32" not in encodings
+        self.initialized = True
+        return {
+            "capabilities": {
+                "positionEncoding": "utf-16" if self.utf16 else "utf-32",
+                "textDocumentSync": {"openClose": True, "change": SYNC_INCREMENTAL,
+                                     "save": {"includeText": False}},
+                "codeActionProvider": {"codeActionKinds": ["quickfix"]},
+            },
+            "serverInfo": {"name": SERVER_NAME, "version": SERVER_VERSION},
+        }
+
+    def on_initialized(self, params):
+        pass
+
+    def on_shutdown(self, params):
+        self.shutdown_requested = True
+        return None
+
+    # -- document sync --------------------------------------------
+
+    def on_textDocument_didOpen(self, params):
+        item = params["textDocument"]
+        doc = Document(item["uri"], item["text"], item.get("version", 0),
+                       item.get("languageId"), utf16=self.utf16)
+        with self._lock:
+            self.documents[doc.uri] = doc
+        self._refresh_quality(doc)
+        self.schedule(doc.uri, delay=0)
+
+    def on_textDocument_didChange(self, params):
+        uri = params["textDocument"]["uri"]
+        with self._lock:
+            doc = self.documents.get(uri)
+            if doc is None:
+                return
+            for change in params["contentChanges"]:
+                doc.apply_change(change)
+            doc.version = params["textDocument"].get("version", doc.version)
+        self.schedule(uri)
+
+    def on_textDocument_didSave(self, params):
+        with self._lock:
+            doc = self.documents.get(params["textDocument"]["uri"])
+        if doc is not None:
+            self._refresh_quality(doc)
+            self.schedule(doc.uri, delay=0)
+
+    def on_textDocument_didClose(self, params):
+        uri = params["textDocument"]["uri"]
+        with self._lock:
+            self.documents.pop(uri, None)
+            self._pending.pop(uri, None)
+        self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    # -- code actions ---------------------------------------------
+
+    def on_textDocument_codeAction(self, params):
+        from .auto_fix import AutoFixer
+
+        uri = params["textDocument"]["uri"]
+        with self._lock:
+            doc = self.documents.get(uri)
+            if doc is None:
+                return []
+            lines = list(doc.lines)
+            language = doc.language
+            eol = doc.eol
+        code = "\n".join(lines)
+        actions = []
+        for diagnostic in (params.get("context") or {}).get("diagnostics", []):
+            if diagnostic.get("source") != SERVER_NAME or diagnostic.get("severity") != SEVERITY_ERROR:
+                continue
+            line_num = diagnostic["range"]["start"]["line"]
+            fix = AutoFixer().apply_fixes(code, diagnostic.get("code"), line_num, language)
+            if not fix["success"] or fix["fixed_code"] == code:
+                continue
+            actions.append({
+                "title": f"Fix: {fix['changes'][0]}",
+                "kind": "quickfix",
+                "diagnostics": [diagnostic],
+                "edit": {"changes": {uri: [_line_edit(lines, fix["fixed_code"].split("\n"), eol, self.utf16)]}},
+            })
+        return actions
+
+    # -- diagnostics ----------------------------------------------
+
+    def schedule(self, uri: str, delay: Optional[float] = None) -> None:
+        """(Re)start the quiet-period timer for a document."""
+        with self._lock:
+            self._pending[uri] = time.monotonic() + (self.debounce if delay is None else delay)
+            self._wake.notify()
+
+    def flush(self) -> None:
+        """Publish every pending document now (used by tests and on shutdown)."""
+        with self._lock:
+            uris = list(self._pending)
+            self._pending.clear()
+        for uri in uris:
+            self.publish(uri)
+
+    def _publish_loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._stop:
+                    now = time.monotonic()
+                    due = [uri for uri, at in self._pending.items() if at <= now]
+                    if due:
+                        break
+                    timeout = min(self._pending.values()) - now if self._pending else None
+                    self._wake.wait(timeout)
+                if self._stop:
+                    return
+                for uri in due:
+                    del self._pending[uri]
+            for uri in due:
+                try:
+                    self.publish(uri)
+                except Exception as e:
+                    self.notify("window/logMessage", {"type": 1, "message": f"{SERVER_NAME}: {e}"})
+
+    def publish(self, uri: str) -> None:
+        with self._lock:
+            doc = self.documents.get(uri)
+        if doc is None:
+            return
+        # Only a snapshot is taken under the server lock; the analysis runs
+        # outside it, so edits keep syncing meanwhile. Publishers of one
+        # document take turns on its analysis_lock, which keeps the queued
+        # edits and the published versions in order.
+        with doc.analysis_lock:
+            with self._lock:
+                if self.documents.get(uri) is not doc:
+                    return
+                version = doc.version
+                snapshot = doc.snapshot()
+                quality = doc.quality
+            lines = snapshot[0]
+            diagnostics = [self._diagnostic(doc, issue, lines) for issue in doc.analyze(snapshot)]
+            diagnostics += self._quality_diagnostics(doc, lines, quality)
+            with self._lock:
+                # Edited meanwhile (its own publish is scheduled) or closed
+                if self.documents.get(uri) is not doc or doc.version != version:
+                    return
+            self.notify("textDocument/publishDiagnostics",
+                        {"uri": uri, "version": version, "diagnostics": diagnostics})
+
+    def _diagnostic(self, doc: Document, issue: Issue, lines: Sequence[str]) -> Dict[str, Any]:
+        line = min(max((issue["line"] or 1) - 1, 0), len(lines) - 1)
+        text = lines[line]
+        start = issue["col"] - 1 if issue.get("col") else len(text) - len(text.lstrip())
+        end = start + 1 if issue.get("col") else len(text.rstrip())
+        message = issue.get("message") or f"{issue['type']} detected"
+        if issue.get("suggestion"):
+            message += f"\n{issue['suggestion']}"
+        return {
+            "range": {"start": {"line": line, "character": doc.column(line, start, lines)},
+                      "end": {"line": line, "character": doc.column(line, max(end, start), lines)}},
+            "severity": SEVERITY_ERROR,
+            "source": SERVER_NAME,
+            "code": issue["type"],
+            "message": message,
+        }
+
+    def _refresh_quality(self, doc: Document) -> None:
+        from .quality_analyzer import CodeQualityAnalyzer
+
+        with self._lock:
+            code, language = doc.text, doc.language
+        try:
+            quality = CodeQualityAnalyzer(code, language.lower()).analyze()
+        except Exception:
+            quality = None
+        with self._lock:
+            doc.quality = quality
+
+    def _quality_diagnostics(self, doc: Document, lines: Sequence[str],
+                             quality: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Quality findings placed on their function's current `def` line."""
+        if not quality:
+            return []
+        findings = {}
+        for name in quality["naming_issues"].get("snake_case_violations", []):
+            findings.setdefault(name, []).append(f"Function name '{name}' is not snake_case")
+        for entry in quality["long_functions"]:
+            name = entry.split(" (", 1)[0]
+            findings.setdefault(name, []).append(f"Long function: {entry}")
+        diagnostics = []
+        if not findings:
+            return diagnostics
+        for n, line in enumerate(lines):
+            m = DEF_NAME.match(line)
+            if m and m.group(1) in findings:
+                for message in findings.pop(m.group(1)):
+                    diagnostics.append({
+                        "range": {"start": {"line": n, "character": doc.column(n, m.start(1), lines)},
+                                  "end": {"line": n, "character": doc.column(n, m.end(1), lines)}},
+                        "severity": SEVERITY_INFORMATION,
+                        "source": SERVER_NAME,
+                        "code": "Quality",
+                        "message": message,
+                    })
+        return diagnostics
+
+
+def _line_edit(old: List[str], new: List[str], eol: str = "\n", utf16: bool = True) -> Dict[str, Any]:
+    """A single TextEdit replacing only the lines that differ between old and new."""
+    head = 0
+    while head < min(len(old), len(new)) and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while (tail < min(len(old), len(new)) - head
+           and old[len(old) - 1 - tail] == new[len(new) - 1 - tail]):
+        tail += 1
+    replaced = new[head:len(new) - tail]
+    if tail:
+        start = {"line": head, "character": 0}
+        end = {"line": len(old) - tail, "character": 0}
+        text = "".join(line + eol for line in replaced)
+    else:
+        # The change reaches the last line, which has no line break to anchor on
+        last = old[-1]
+        end = {"line": len(old) - 1, "character": _index_to_utf16(last, len(last)) if utf16 else len(last)}
+        if head:
+            prev = old[head - 1]
+            start = {"line": head - 1, "character": _index_to_utf16(prev, len(prev)) if utf16 else len(prev)}
+            text = "".join(eol + line for line in replaced)
+        else:
+            start = {"line": 0, "character": 0}
+            text = eol.join(replaced)
+    return {"range": {"start": start, "end": end}, "newText": text}
+
+
+def main() -> int:
+    server = LanguageServer(sys.stdin.buffer, sys.stdout.buffer)
+    return server.serve()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
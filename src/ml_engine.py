@@ -3,8 +3,11 @@ import joblib
 import numpy as np
 import pandas as pd
 import os
+import re
 import sys
 import logging
+from collections import Counter
+from typing import Dict, List, Optional
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -100,27 +103,243 @@ def detect_error_ml(code: str):
     
     try:
         # TF-IDF vectorization
-        vec = vectorizer.transform([code])
-        
-        # Add numerical features if using enhanced model
-        if use_enhanced_features:
-            try:
-                from scipy.sparse import hstack
-                numerical = extract_numerical_features(code)
-                numerical_array = np.array(numerical).reshape(1, -1)
-                vec = hstack([vec, numerical_array])
-            except Exception as e:
-                logger.warning(f"Feature extraction warning: {e}")
-                pass
-        
-        # Prediction
-        probs = model.predict_proba(vec)[0]
-        max_prob = float(np.max(probs))
-        pred_index = int(np.argmax(probs))
-        pred_label = label_encoder.inverse_transform([pred_index])[0]
-
-        return pred_label, max_prob
-    
+        return _predict(vectorizer.transform([code]), code)
     except Exception as e:
         return "NoError", 0.0
 
+
+def _predict(vec, code: str):
+    """Classify a TF-IDF row (plus the numerical features of code)."""
+    # Add numerical features if using enhanced model
+    if use_enhanced_features:
+        try:
+            from scipy.sparse import hstack
+            numerical = extract_numerical_features(code)
+            numerical_array = np.array(numerical).reshape(1, -1)
+            vec = hstack([vec, numerical_array])
+        except Exception as e:
+            logger.warning(f"Feature extraction warning: {e}")
+            pass
+    
+    # Prediction
+    probs = model.predict_proba(vec)[0]
+    max_prob = float(np.max(probs))
+    pred_index = int(np.argmax(probs))
+    pred_label = label_encoder.inverse_transform([pred_index])[0]
+
+    return pred_label, max_prob
+
+
+# ------------------------------------------------------------
+# Incremental vectorization (live editing)
+# ------------------------------------------------------------
+
+# The char analyzer collapses every whitespace run of 2+ characters to " "
+_WHITESPACE_RUN = re.compile(r"\s\s+")
+
+
+class IncrementalVectorizer:
+    """
+    TF-IDF vector of a document that is edited line by line
+
+    The char analyzer sees the document with whitespace runs collapsed,
+    so every line owns a segment of that normalized text: its stripped,
+    collapsed content plus the separator that follows it (the collapsed
+    whitespace run up to the next non-blank line). A line's n-gram counts
+    are the n-grams starting in its segment; they read at most
+    max_n - 1 characters into the following segments.
+
+    replace_lines() recomputes the segments of the edited lines and of the
+    non-blank line before them, then the counts of every line whose
+    segment or lookahead changed (walking back from the edit until one is
+    unchanged), and updates the document counts by subtracting the old and
+    adding the new. transform() re-applies tf weighting, idf and the
+    norm, giving the same row as vectorizer.transform([text]).
+
+    Only a fitted char analyzer is counted this way (see supports());
+    any other vectorizer is applied to the whole text on transform().
+    """
+
+    def __init__(self, code: str = "", tfidf=None):
+        self.tfidf = tfidf if tfidf is not None else vectorizer
+        self._transformer = self._build_transformer(self.tfidf) if self.supports(self.tfidf) else None
+        self.incremental = self._transformer is not None
+        if self.incremental:
+            self._preprocess = self.tfidf.build_preprocessor()
+            self._vocabulary = self.tfidf.vocabulary_
+            self._min_n, self._max_n = self.tfidf.ngram_range
+        self.reset(code)
+
+    @staticmethod
+    def supports(tfidf) -> bool:
+        """True if tfidf's n-grams can be counted line by line as described above."""
+        ngram_range = getattr(tfidf, "ngram_range", None)
+        return (getattr(tfidf, "analyzer", None) == "char"
+                and isinstance(ngram_range, tuple) and len(ngram_range) == 2
+                and 1 <= ngram_range[0] <= ngram_range[1]
+                and getattr(tfidf, "binary", True) is False
+                and hasattr(tfidf, "vocabulary_"))
+
+    @staticmethod
+    def _build_transformer(tfidf):
+        """
+        TfidfTransformer applying tfidf's tf weighting, idf and norm
+
+        Built from the vectorizer's public parameters and idf_. Returns None
+        when the idf cannot be read, e.g. for a model pickled by an older
+        scikit-learn.
+        """
+        from scipy.sparse import csr_matrix
+        from sklearn.exceptions import NotFittedError
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        try:
+            idf = tfidf.idf_ if tfidf.use_idf else None
+        except (AttributeError, NotFittedError):
+            return None
+        transformer = TfidfTransformer(norm=tfidf.norm, use_idf=tfidf.use_idf,
+                                       smooth_idf=tfidf.smooth_idf, sublinear_tf=tfidf.sublinear_tf)
+        transformer.fit(csr_matrix(np.ones((1, len(tfidf.vocabulary_)))))
+        if idf is not None:
+            transformer.idf_ = idf
+        return transformer
+
+    def reset(self, code: str) -> None:
+        self.lines: List[str] = []
+        self._pre: List[str] = []
+        self._segments: List[str] = []
+        self._keys: List[Optional[tuple]] = []
+        self._counts: List[Dict[int, int]] = []
+        self._head_key: Optional[tuple] = None  # leading whitespace of the document
+        self._head_counts: Dict[int, int] = {}
+        self._total: Counter = Counter()
+        self.last_recounted = 0
+        self.replace_lines(0, 0, code.split("\n"))
+
+    # -- segments -------------------------------------------------
+
+    def _separator(self, i: int) -> str:
+        """Normalized whitespace run after line i's content (i = -1: document start)."""
+        run = ""
+        if i >= 0:
+            pre = self._pre[i]
+            run = pre[len(pre.rstrip()):]
+        j = i + 1
+        while len(run) < 2 and j < len(self._pre):
+            if j > 0:
+                run += "\n"
+            pre = self._pre[j]
+            if pre.strip():
+                run += pre[:len(pre) - len(pre.lstrip())]
+                break
+            run += pre
+            j += 1
+        return run if len(run) < 2 else " "
+
+    def _segment(self, i: int) -> str:
+        core = self._pre[i].strip()
+        if not core:
+            return ""  # blank: part of the previous line's separator run
+        return _WHITESPACE_RUN.sub(" ", core) + self._separator(i)
+
+    def _lookahead(self, i: int) -> str:
+        need = self._max_n - 1
+        text = ""
+        j = i + 1
+        while len(text) < need and j < len(self._segments):
+            text += self._segments[j]
+            j += 1
+        return text[:need]
+
+    def _ngram_counts(self, segment: str, lookahead: str) -> Dict[int, int]:
+        text = segment + lookahead
+        vocabulary = self._vocabulary
+        counts: Dict[int, int] = {}
+        for n in range(self._min_n, self._max_n + 1):
+            for start in range(min(len(segment), len(text) - n + 1)):
+                index = vocabulary.get(text[start:start + n])
+                if index is not None:
+                    counts[index] = counts.get(index, 0) + 1
+        return counts
+
+    def _recount(self, old: Dict[int, int], new: Dict[int, int]) -> None:
+        total = self._total
+        total.subtract(old)
+        total.update(new)
+        for index in old:
+            if total[index] <= 0:
+                del total[index]
+
+    # -- editing --------------------------------------------------
+
+    def replace_lines(self, start: int, end: int, new_lines: List[str]) -> None:
+        """Replace lines[start:end] (0-based) with new_lines and update the counts."""
+        count = len(new_lines)
+        if not self.incremental:
+            self.lines[start:end] = new_lines
+            return
+        for old in self._counts[start:end]:
+            self._recount(old, {})
+        self.lines[start:end] = new_lines
+        self._pre[start:end] = [self._preprocess(line) for line in new_lines]
+        self._segments[start:end] = [""] * count
+        self._keys[start:end] = [None] * count
+        self._counts[start:end] = [{} for _ in new_lines]
+        for i in range(start, start + count):
+            self._segments[i] = self._segment(i)
+
+        # The separator of the last non-blank line before the edit runs into it
+        previous = start - 1
+        while previous >= 0 and not self._pre[previous].strip():
+            previous -= 1
+        if previous >= 0:
+            self._segments[previous] = self._segment(previous)
+
+        recounted = 0
+        i = start + count - 1
+        while i >= 0:
+            if i < start and not self._segments[i]:
+                i -= 1  # blank lines own no n-grams
+                continue
+            key = (self._segments[i], self._lookahead(i))
+            if i < start and key == self._keys[i]:
+                break  # unchanged, and so is everything before it
+            counts = self._ngram_counts(*key)
+            self._recount(self._counts[i], counts)
+            self._keys[i], self._counts[i] = key, counts
+            recounted += 1
+            i -= 1
+        if previous < 0 or i < 0:
+            key = (self._separator(-1), self._lookahead(-1))
+            if key != self._head_key:
+                counts = self._ngram_counts(*key)
+                self._recount(self._head_counts, counts)
+                self._head_key, self._head_counts = key, counts
+        self.last_recounted = recounted
+
+    # -- vectors --------------------------------------------------
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def transform(self):
+        """The document's TF-IDF row (a 1 x n_features CSR matrix)."""
+        from scipy.sparse import csr_matrix
+
+        if not self.incremental:
+            return self.tfidf.transform([self.text])
+
+        indices = np.array(sorted(self._total), dtype=np.int32)
+        data = np.array([self._total[i] for i in indices], dtype=np.float64)
+        counts = csr_matrix((data, indices, [0, len(indices)]), shape=(1, len(self._vocabulary)))
+        return self._transformer.transform(counts, copy=False)
+
+    def predict(self):
+        """Same result as detect_error_ml(text), without re-vectorizing the text."""
+        if not model_loaded:
+            return "NoError", 0.0
+        try:
+            return _predict(self.transform(), self.text)
+        except Exception as e:
+            return "NoError", 0.0
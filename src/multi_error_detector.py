@@ -9,10 +9,19 @@ from .syntax_checker import detect_all
 from .tutor_explainer import explain_error
 
 
-def detect_all_errors(code: str, filename: str | None = None):
+def detect_all_errors(code: str, filename: str | None = None, ml=None, compact: bool = False):
     """
     Detect ALL syntax errors in the code
     
+    Args:
+        code: Source code
+        filename: Optional filename for language detection
+        ml: (label, confidence) ML prediction already made for this code
+            (e.g. by an IncrementalVectorizer kept in step with an editor
+            buffer); predicted here when not given
+        compact: Return the columnar form (see columnar_result) instead of
+            the errors / errors_by_type / rule_based_issues views
+    
     Returns:
         dict: {
             'language': str,
@@ -29,33 +38,33 @@ def detect_all_errors(code: str, filename: str | None = None):
     # ------------------------------------------------
     if language == "Python":
         rule_based_issues = detect_all(code)
+        if compact:
+            rows = ((i.type, i.line, i.col, i.message, i.suggestion) for i in rule_based_issues)
+            return columnar_result(language, rows, len(rule_based_issues))
         
-        if rule_based_issues:
-            # Group errors by type
-            error_types = {}
-            for issue in rule_based_issues:
-                error_type = issue.get('type', 'SyntaxError')
-                if error_type not in error_types:
-                    error_types[error_type] = {
-                        'type': error_type,
-                        'count': 0,
-                        'locations': [],
-                        'tutor': explain_error(error_type)
-                    }
-                error_types[error_type]['count'] += 1
-                error_types[error_type]['locations'].append({
-                    'line': issue.get('line'),
-                    'message': issue.get('message'),
-                    'suggestion': issue.get('suggestion')
-                })
-            
-            all_errors = list(error_types.values())
+        # Group errors by type (both views in one pass over the issues)
+        error_types = {}
+        errors_by_type = {}
+        for issue in rule_based_issues:
+            group = error_types.get(issue.type)
+            if group is None:
+                group = error_types[issue.type] = {
+                    'type': issue.type,
+                    'count': 0,
+                    'locations': [],
+                    'tutor': explain_error(issue.type)
+                }
+                errors_by_type[issue.type] = []
+            group['count'] += 1
+            group['locations'].append({'line': issue.line, 'message': issue.message, 'suggestion': issue.suggestion})
+            errors_by_type[issue.type].append({'line': issue.line, 'message': issue.message, 'snippet': issue.suggestion})
+        all_errors = list(error_types.values())
         
         return {
             'language': language,
             'errors': all_errors,
-            'errors_by_type': {err['type']: [{'line': loc['line'], 'message': loc['message'], 'snippet': loc.get('suggestion', '')} for loc in err['locations']] for err in all_errors},
-            'total_errors': sum(err['count'] for err in all_errors),
+            'errors_by_type': errors_by_type,
+            'total_errors': len(rule_based_issues),
             'has_errors': len(all_errors) > 0,
             'rule_based_issues': rule_based_issues
         }
@@ -128,7 +137,7 @@ def detect_all_errors(code: str, filename: str | None = None):
     # ------------------------------------------------
     # 3. ML-based detection (as additional check)
     # ------------------------------------------------
-    ml_error, confidence = detect_error_ml(code)
+    ml_error, confidence = ml if ml is not None else detect_error_ml(code)
     
     # If ML detected an error not caught by rules, add it
     if ml_error != "NoError" and confidence >= 0.65:
@@ -141,6 +150,11 @@ def detect_all_errors(code: str, filename: str | None = None):
                 'tutor': explain_error(ml_error)
             })
     
+    if compact:
+        rows = ((err['type'], loc.get('line'), None, f"{err['type']} detected", None)
+                for err in all_errors for loc in err['locations'])
+        return columnar_result(language, rows, sum(err['count'] for err in all_errors))
+    
     return {
         'language': language,
         'errors': all_errors,
@@ -151,6 +165,53 @@ def detect_all_errors(code: str, filename: str | None = None):
     }
 
 
+def columnar_result(language: str, rows, total_errors: int) -> dict:
+    """
+    Build the compact detect_all_errors response
+    
+    Every issue is stored once, as one entry in each column of 'issues'
+    (type, line, col, message, suggestion). Repeated strings are stored
+    once in lookup tables and referenced by index:
+    
+        'types':      error type names, indexed by the type column
+        'messages':   distinct texts, indexed by the message and suggestion
+                      columns (None when an issue has none)
+        'tutors':     distinct explain_error() entries
+        'type_tutor': index into 'tutors' for each entry of 'types'
+    
+    Args:
+        language: Detected language
+        rows: (type, line, col, message, suggestion) per issue
+        total_errors: Error count reported in the result
+    """
+    types, texts, tutors = {}, {}, {}
+    type_tutor = []
+    columns = {'type': [], 'line': [], 'col': [], 'message': [], 'suggestion': []}
+    for error_type, line, col, message, suggestion in rows:
+        type_id = types.get(error_type)
+        if type_id is None:
+            type_id = types[error_type] = len(types)
+            tutor = explain_error(error_type)
+            type_tutor.append(tutors.setdefault((tutor['why'], tutor['fix']), len(tutors)))
+        columns['type'].append(type_id)
+        columns['line'].append(line)
+        columns['col'].append(col)
+        columns['message'].append(None if message is None else texts.setdefault(message, len(texts)))
+        columns['suggestion'].append(None if suggestion is None else texts.setdefault(suggestion, len(texts)))
+    
+    return {
+        'language': language,
+        'format': 'columnar',
+        'types': list(types),
+        'messages': list(texts),
+        'tutors': [{'why': why, 'fix': fix} for why, fix in tutors],
+        'type_tutor': type_tutor,
+        'issues': columns,
+        'total_errors': total_errors,
+        'has_errors': total_errors > 0
+    }
+
+
 # Add to error_engine.py
 def detect_errors_multi(code: str, filename: str | None = None):
     """
@@ -0,0 +1,246 @@
+"""
+Report Writers Module
+Streams batch results as human text, JSON Lines, SARIF or JUnit XML.
+Each writer emits a file's entry as soon as its result arrives, so memory
+stays flat no matter how many files are scanned.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from .syntax_checker import json_default
+
+FORMATS = ("text", "compact", "jsonl", "sarif", "junit")
+
+TOOL_NAME = "LLM-Syntax-Error-Checker"
+TOOL_VERSION = "1.0.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+def _uri(path: str) -> str:
+    uri = path.replace(os.sep, "/")
+    while uri.startswith("./"):
+        uri = uri[2:]
+    return uri
+
+
+def _findings(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One finding per rule-based issue, or a single file-level finding."""
+    if not result["has_errors"]:
+        return []
+    if result["issues"]:
+        return result["issues"]
+    return [{"type": result["predicted_error"], "line": None,
+             "message": f"{result['predicted_error']} detected"}]
+
+
+class ReportWriter:
+    """Base writer: begin() once, write() per file result, end() with the summary."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def begin(self) -> None:
+        pass
+
+    def write(self, result: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def end(self, summary: Dict[str, Any]) -> None:
+        pass
+
+
+class TextWriter(ReportWriter):
+    """Human-readable summary table (only rows that will be shown are kept)."""
+
+    def __init__(self, stream: TextIO, show_all: bool = False):
+        super().__init__(stream)
+        self.show_all = show_all
+        self.rows = []
+
+    def write(self, result):
+        if self.show_all or result["has_errors"] or result["error"]:
+            line = next((str(i["line"]) for i in result["issues"] if i.get("line")), "")
+            self.rows.append((result["path"], result["language"], result["predicted_error"],
+                              result["has_errors"], result["error"], result.get("skipped"), line))
+
+    def end(self, summary):
+        out = lambda text="": print(text, file=self.stream)
+        out("=" * 78)
+        out("🧠 Multi-Language Syntax Error Checker (CLI)")
+        out("=" * 78)
+
+        if self.rows:
+            self.rows.sort()
+            width = min(50, max(len(r[0]) for r in self.rows))
+            out(f"{'File':<{width}}  {'Language':<9} {'Result':<22} Line")
+            out("-" * 78)
+            for path, language, error, has_errors, read_error, skipped, line in self.rows:
+                path = path if len(path) <= width else "..." + path[-(width - 3):]
+                if has_errors:
+                    status = "❌ " + error
+                elif read_error:
+                    status = "⚠️ Unreadable"
+                elif skipped:
+                    status = f"⏭ Skipped ({skipped})"
+                else:
+                    status = "✅ OK"
+                out(f"{path:<{width}}  {language or '-':<9} {status:<22} {line}")
+            out("-" * 78)
+        else:
+            out("✅ No syntax errors detected.")
+            out("-" * 78)
+
+        out(f"{'Language':<12}{'Files':>8}{'Errors':>8}")
+        for language, stats in sorted(summary["by_language"].items()):
+            out(f"{language:<12}{stats['files']:>8}{stats['errors']:>8}")
+        out("-" * 78)
+        rate = summary["files"] / summary["elapsed"] if summary["elapsed"] else 0
+        out(f"📂 Files checked    : {summary['files']} ({summary['lines']} lines)")
+        if summary["analyzed"] != summary["files"]:
+            out(f"💾 From cache       : {summary['files'] - summary['analyzed']} "
+                f"(analyzed {summary['analyzed']})")
+        out(f"❌ Files with errors: {summary['files_with_errors']}")
+        if summary["unreadable"]:
+            out(f"⚠️ Unreadable files : {summary['unreadable']}")
+        if summary.get("skipped"):
+            out(f"⏭ Skipped files    : {summary['skipped']} (binary or over the size limit)")
+        out(f"⏱ Time             : {summary['elapsed']:.2f}s ({rate:.0f} files/s)")
+        if summary.get("stopped_early"):
+            out("⏹ Stopped at the first file with errors (--fail-fast)")
+        out("=" * 78)
+
+
+class CompactWriter(ReportWriter):
+    """One `path:line: Type: message` line per finding (hook and editor friendly)."""
+
+    def write(self, result):
+        if result["error"]:
+            print(f"{result['path']}: ReadError: {result['error']}", file=self.stream)
+        for issue in _findings(result):
+            line = f":{issue['line']}" if issue.get("line") else ""
+            print(f"{result['path']}{line}: {issue.get('type')}: {issue.get('message')}", file=self.stream)
+
+    def end(self, summary):
+        if summary.get("stopped_early"):
+            print(f"❌ Stopped at the first file with syntax errors ({summary['files']} checked)",
+                  file=self.stream)
+        elif summary["files_with_errors"]:
+            print(f"❌ {summary['files_with_errors']} of {summary['files']} files have syntax errors",
+                  file=self.stream)
+        else:
+            print(f"✅ {summary['files']} files checked, no syntax errors", file=self.stream)
+
+
+class JsonLinesWriter(ReportWriter):
+    """One JSON object per file ({"type": "file", ...}), then a summary object."""
+
+    def write(self, result):
+        record = {"type": "file"}
+        record.update((k, v) for k, v in result.items() if k != "digest")
+        self.stream.write(json.dumps(record, default=json_default) + "\n")
+        self.stream.flush()
+
+    def end(self, summary):
+        self.stream.write(json.dumps({"type": "summary", **summary}) + "\n")
+        self.stream.flush()
+
+
+class SarifWriter(ReportWriter):
+    """SARIF 2.1.0 log with one run; results are written incrementally."""
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self.count = 0
+
+    def begin(self):
+        from .tutor_explainer import EXPLANATIONS
+
+        rules = [
+            {"id": name, "shortDescription": {"text": info["why"]}, "help": {"text": info["fix"]}}
+            for name, info in EXPLANATIONS.items()
+        ]
+        driver = {"name": TOOL_NAME, "version": TOOL_VERSION, "rules": rules}
+        head = json.dumps({"$schema": SARIF_SCHEMA, "version": "2.1.0"})[:-1]
+        self.stream.write(head + ', "runs": [{"tool": {"driver": ' + json.dumps(driver) + '}, "results": [\n')
+
+    def write(self, result):
+        if result["error"]:
+            findings = [{"type": "ReadError", "line": None, "message": result["error"]}]
+            level = "warning"
+        else:
+            findings = _findings(result)
+            level = "error"
+        for issue in findings:
+            region = {"startLine": issue["line"]} if issue.get("line") else None
+            location = {"physicalLocation": {"artifactLocation": {"uri": _uri(result["path"])}}}
+            if region:
+                location["physicalLocation"]["region"] = region
+            entry = {
+                "ruleId": issue.get("type") or result["predicted_error"],
+                "level": level,
+                "message": {"text": issue.get("message") or result["predicted_error"]},
+                "locations": [location],
+            }
+            self.stream.write((",\n" if self.count else "") + json.dumps(entry))
+            self.count += 1
+        self.stream.flush()
+
+    def end(self, summary):
+        self.stream.write("\n]}]}\n")
+        self.stream.flush()
+
+
+class JUnitWriter(ReportWriter):
+    """
+    JUnit XML with one <testcase> per file
+
+    Counts are not known until the end, so they are reported as a final
+    <system-out> line instead of <testsuite> attributes; CI consumers
+    count the testcases themselves.
+    """
+
+    def begin(self):
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        self.stream.write(f'  <testsuite name={quoteattr(TOOL_NAME)}>\n')
+
+    def write(self, result):
+        name = quoteattr(_uri(result["path"]))
+        classname = quoteattr(result["language"] or "Unknown")
+        body = ""
+        if result["error"]:
+            body = f'\n      <error message={quoteattr(result["error"])} type="ReadError"/>\n    '
+        elif result.get("skipped"):
+            body = f'\n      <skipped message={quoteattr(result["skipped"])}/>\n    '
+        elif result["has_errors"]:
+            details = "\n".join(
+                (f"line {i['line']}: " if i.get("line") else "") + f"{i.get('type')}: {i.get('message')}"
+                for i in _findings(result)
+            )
+            body = (f'\n      <failure message={quoteattr(result["predicted_error"])} '
+                    f'type={quoteattr(result["predicted_error"])}>{escape(details)}</failure>\n    ')
+        self.stream.write(f"    <testcase classname={classname} name={name}>{body}</testcase>\n")
+        self.stream.flush()
+
+    def end(self, summary):
+        text = (f"files={summary['files']} failures={summary['files_with_errors']} "
+                f"errors={summary['unreadable']} time={summary['elapsed']:.3f}")
+        self.stream.write(f"    <system-out>{escape(text)}</system-out>\n")
+        self.stream.write("  </testsuite>\n</testsuites>\n")
+        self.stream.flush()
+
+
+def get_writer(fmt: str, stream: TextIO, show_all: bool = False) -> ReportWriter:
+    if fmt == "text":
+        return TextWriter(stream, show_all=show_all)
+    if fmt == "compact":
+        return CompactWriter(stream)
+    if fmt == "jsonl":
+        return JsonLinesWriter(stream)
+    if fmt == "sarif":
+        return SarifWriter(stream)
+    if fmt == "junit":
+        return JUnitWriter(stream)
+    raise ValueError(f"Unknown output format: {fmt}")
@@ -0,0 +1,144 @@
+"""
+Result Cache Module
+Persistent on-disk cache of analysis results keyed by file content hash
+and tool/model version, so re-runs only analyze changed files
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .ingest import file_sha256, policy_fingerprint
+from .syntax_checker import disabled_rules, json_default
+
+CACHE_DIR = os.getenv("SYNTAX_CACHE_DIR", ".syntax_cache")
+CACHE_SCHEMA_VERSION = 1
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = "models"  # same relative location ml_engine loads from
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    digest  TEXT NOT NULL,
+    kind    TEXT NOT NULL,
+    result  TEXT NOT NULL,
+    PRIMARY KEY (digest, kind)
+);
+CREATE TABLE IF NOT EXISTS files (
+    path      TEXT PRIMARY KEY,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    digest    TEXT NOT NULL
+);
+"""
+
+
+def tool_version() -> str:
+    """
+    Fingerprint of everything that can change a result: the analysis source
+    code (src/*.py), the model files (name, size, mtime), the ingestion
+    size policy and the disabled detector rules.
+    """
+    rules = ",".join(disabled_rules())
+    h = hashlib.sha256(f"schema={CACHE_SCHEMA_VERSION};ingest={policy_fingerprint()};rules={rules}".encode())
+    for path in sorted(glob.glob(os.path.join(SRC_DIR, "*.py"))):
+        with open(path, "rb") as fh:
+            h.update(os.path.basename(path).encode())
+            h.update(hashlib.sha256(fh.read()).digest())
+    for path in sorted(glob.glob(os.path.join(MODEL_DIR, "*.pkl"))):
+        st = os.stat(path)
+        h.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-backed result cache
+
+    One database per tool version lives under `cache_dir`, so a code or model
+    change simply starts a fresh database. Results are keyed by
+    (content sha256, kind), e.g. kind "detect", "fix" or "quality". A second
+    table remembers each path's size/mtime/digest so unchanged files are not
+    even re-read; a fresh checkout (new mtimes) falls back to hashing.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, version: Optional[str] = None):
+        self.version = version or tool_version()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, f"results-{self.version}.sqlite3")
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def file_digest(self, path: str) -> Optional[str]:
+        """
+        Return the content digest of a file (None if it cannot be read).
+        Unchanged files (same size and mtime) are answered from the stat
+        table; others are hashed without reading large files into memory.
+        """
+        key = os.path.abspath(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            return None
+        row = self._conn.execute(
+            "SELECT digest FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (key, st.st_size, st.st_mtime_ns)
+        ).fetchone()
+        if row:
+            return row[0]
+        try:
+            digest = file_sha256(key)
+        except OSError:
+            return None
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+            (key, st.st_size, st.st_mtime_ns, digest)
+        )
+        return digest
+
+    def get(self, digest: Optional[str], kind: str) -> Optional[Any]:
+        if digest is None:
+            return None
+        row = self._conn.execute(
+            "SELECT result FROM results WHERE digest = ? AND kind = ?", (digest, kind)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, digest: Optional[str], kind: str, result: Any) -> None:
+        if digest is None:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results (digest, kind, result) VALUES (?, ?, ?)",
+            (digest, kind, json.dumps(result, default=json_default))
+        )
+
+    def put_many(self, items: Iterable[Tuple[str, str, Any]]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO results (digest, kind, result) VALUES (?, ?, ?)",
+            ((d, k, json.dumps(r, default=json_default)) for d, k, r in items if d is not None)
+        )
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.commit()
+        self._conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,435 @@
+"""
+Archive Scan Jobs Module
+Background scanning of zip/tar project archives with results stored in SQLite
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tarfile
+import threading
+import time
+import uuid
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, ALL_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .syntax_checker import json_default
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = os.getenv("SCAN_JOBS_DIR", os.path.join("data", "scan_jobs"))
+JOBS_DB = os.getenv("SCAN_JOBS_DB", os.path.join(JOBS_DIR, "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("SCAN_JOB_WORKERS", os.cpu_count() or 2))
+
+# Archive members larger than this are recorded as skipped instead of checked
+MAX_MEMBER_BYTES = int(os.getenv("SCAN_MAX_MEMBER_BYTES", 2 * 1024 * 1024))
+
+SUPPORTED_EXTENSIONS = (".py", ".java", ".c", ".cpp")
+
+# A running job whose owner has not recorded progress for this long is
+# considered abandoned (e.g. its worker process died) and may be taken over
+STALE_JOB_SECONDS = int(os.getenv("SCAN_STALE_JOB_SECONDS", 120))
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Sort orders accepted by JobStore.get_results
+RESULT_ORDERS = {
+    "seq": "seq",
+    "path": "path",
+    "errors": "has_errors DESC, path",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    archive_name TEXT NOT NULL,
+    archive_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT,
+    total_files INTEGER,
+    done_files INTEGER NOT NULL DEFAULT 0,
+    error_files INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    language TEXT,
+    predicted_error TEXT,
+    has_errors INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (job_id, path)
+);
+CREATE INDEX IF NOT EXISTS results_by_seq ON results (job_id, seq);
+"""
+
+
+# ------------------------------------------------------------
+# Archive reading (members are streamed, never extracted to disk)
+# ------------------------------------------------------------
+
+def _is_source(name: str) -> bool:
+    return name.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def iter_archive_members(path: str) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """
+    Yield (member_path, content) for every source file in a zip or tar archive
+
+    Content is None for members over MAX_MEMBER_BYTES. Both formats allow a
+    path to repeat; only its first member is yielded, so every path has one
+    result.
+    """
+    seen = set()
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not _is_source(info.filename) or info.filename in seen:
+                    continue
+                seen.add(info.filename)
+                if info.file_size > MAX_MEMBER_BYTES:
+                    yield info.filename, None
+                    continue
+                with zf.open(info) as fh:
+                    yield info.filename, fh.read()
+        return
+
+    with tarfile.open(path, mode="r:*") as tf:
+        for member in tf:
+            if not member.isfile() or not _is_source(member.name) or member.name in seen:
+                continue
+            seen.add(member.name)
+            if member.size > MAX_MEMBER_BYTES:
+                yield member.name, None
+                continue
+            fh = tf.extractfile(member)
+            if fh is not None:
+                yield member.name, fh.read()
+
+
+def count_archive_members(path: str) -> int:
+    """Count distinct source paths in an archive (reads headers only for zip files)."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            return len({i.filename for i in zf.infolist() if not i.is_dir() and _is_source(i.filename)})
+    with tarfile.open(path, mode="r:*") as tf:
+        return len({m.name for m in tf if m.isfile() and _is_source(m.name)})
+
+
+def check_member(name: str, content: Optional[bytes]) -> Dict[str, Any]:
+    """Check one archive member (runs inside a worker process)."""
+    from .error_engine import detect_errors
+
+    if content is None:
+        return {
+            "language": None,
+            "predicted_error": "Skipped",
+            "has_errors": False,
+            "skipped": f"File larger than {MAX_MEMBER_BYTES} bytes"
+        }
+    code = content.decode("utf-8", errors="replace")
+    result = detect_errors(code, filename=name)
+    result["has_errors"] = result["predicted_error"] != "NoError"
+    return result
+
+
+def _warm_worker():
+    """Process-pool initializer: import the detection pipeline once per worker."""
+    from . import error_engine  # noqa: F401
+
+
+# ------------------------------------------------------------
+# SQLite store
+# ------------------------------------------------------------
+
+class JobStore:
+    """SQLite-backed store for scan jobs and their per-file results."""
+
+    def __init__(self, db_path: str = JOBS_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def create_job(self, job_id: str, archive_name: str, archive_path: str, owner: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, archive_name, archive_path, status, owner, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, archive_name, archive_path, QUEUED, owner, now, now)
+            )
+
+    def claim_job(self, job_id: str, owner: str) -> bool:
+        """Atomically take ownership of an unfinished job that is ours or abandoned."""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET owner = ?, updated_at = ? "
+                "WHERE id = ? AND status IN (?, ?) AND (owner IS NULL OR owner = ? OR updated_at < ?)",
+                (owner, now, job_id, QUEUED, RUNNING, owner, now - STALE_JOB_SECONDS)
+            )
+        return cursor.rowcount == 1
+
+    def update_job(self, job_id: str, **fields) -> None:
+        fields.setdefault("updated_at", time.time())
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def unfinished_jobs(self, stale_only: bool = False) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM jobs WHERE status IN (?, ?)"
+        params = [QUEUED, RUNNING]
+        if stale_only:
+            query += " AND updated_at < ?"
+            params.append(time.time() - STALE_JOB_SECONDS)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at", params).fetchall()
+        return [dict(r) for r in rows]
+
+    def done_paths(self, job_id: str) -> set:
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM results WHERE job_id = ?", (job_id,)).fetchall()
+        return {r["path"] for r in rows}
+
+    def add_result(self, job_id: str, path: str, result: Dict[str, Any]) -> None:
+        """Record a file's result; a path recorded before is replaced, and counted once."""
+        has_errors = bool(result.get("has_errors"))
+        with self._lock, self._conn:
+            old = self._conn.execute(
+                "SELECT seq, has_errors FROM results WHERE job_id = ? AND path = ?", (job_id, path)
+            ).fetchone()
+            if old is None:
+                seq = self._conn.execute(
+                    "SELECT done_files FROM jobs WHERE id = ?", (job_id,)
+                ).fetchone()[0]
+                added, error_delta = 1, int(has_errors)
+            else:
+                seq, added, error_delta = old["seq"], 0, int(has_errors) - old["has_errors"]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (job_id, seq, path, language, predicted_error, has_errors, result) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, seq, path, result.get("language"), result.get("predicted_error"),
+                 int(has_errors), json.dumps(result, default=json_default))
+            )
+            self._conn.execute(
+                "UPDATE jobs SET done_files = done_files + ?, error_files = error_files + ?, updated_at = ? "
+                "WHERE id = ?",
+                (added, error_delta, time.time(), job_id)
+            )
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = 100,
+                    errors_only: bool = False, order: str = "seq") -> List[Dict[str, Any]]:
+        """A page of results, in completion order ("seq"), by "path", or "errors" first."""
+        query = "SELECT path, result FROM results WHERE job_id = ?"
+        if errors_only:
+            query += " AND has_errors = 1"
+        query += f" ORDER BY {RESULT_ORDERS[order]} LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(query, (job_id, limit, offset)).fetchall()
+        return [dict(json.loads(r["result"]), path=r["path"]) for r in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ------------------------------------------------------------
+# Job manager
+# ------------------------------------------------------------
+
+class JobManager:
+    """
+    Runs queued scan jobs on a background thread
+
+    Each job streams its archive members into a process pool, keeping at most
+    2 x workers members in flight. Results are committed per file, so a job
+    interrupted by a restart resumes with the files not yet recorded. Jobs are
+    claimed in the store before processing, so several API worker processes
+    sharing one database never scan the same job twice.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, jobs_dir: str = JOBS_DIR,
+                 workers: int = JOB_WORKERS):
+        self.store = store or JobStore()
+        self.jobs_dir = jobs_dir
+        self.workers = max(1, workers)
+        self._queue: List[str] = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._pool = None
+        self._thread = None
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    def start(self) -> None:
+        """Start the worker thread and requeue jobs left unfinished by a restart."""
+        if self._thread is not None:
+            return
+        self._requeue(self.store.unfinished_jobs())
+        self._thread = threading.Thread(target=self._run, name="scan-jobs", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def archive_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.archive")
+
+    def new_job_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def submit(self, job_id: str, archive_name: str) -> None:
+        """Queue a job whose archive has already been written to archive_path(job_id)."""
+        self.store.create_job(job_id, archive_name, self.archive_path(job_id), self.owner)
+        with self._cond:
+            self._queue.append(job_id)
+            self._cond.notify()
+
+    # --------------------------------------------------------
+    # Worker thread
+    # --------------------------------------------------------
+
+    def _requeue(self, jobs: List[Dict[str, Any]]) -> None:
+        with self._cond:
+            for job in jobs:
+                if job["id"] not in self._queue:
+                    self._queue.append(job["id"])
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    if not self._cond.wait(timeout=STALE_JOB_SECONDS):
+                        break
+                if self._stopping:
+                    return
+                if not self._queue:
+                    # Idle: pick up jobs abandoned by dead workers
+                    job_id = None
+                else:
+                    job_id = self._queue.pop(0)
+            if job_id is None:
+                self._requeue(self.store.unfinished_jobs(stale_only=True))
+                continue
+            self._run_job(job_id)
+
+    def _run_job(self, job_id: str) -> None:
+        """Claim and scan one job; its archive is deleted once the job completes or fails."""
+        if not self.store.claim_job(job_id, self.owner):
+            return
+        try:
+            self._process(job_id)
+        except BrokenProcessPool as e:
+            # A worker died: drop the pool so the next job gets a fresh one
+            logger.exception("Scan job %s failed", job_id)
+            self._pool = None
+            self.store.update_job(job_id, status=FAILED, error=str(e))
+        except Exception as e:
+            logger.exception("Scan job %s failed", job_id)
+            self.store.update_job(job_id, status=FAILED, error=str(e))
+
+        # A job interrupted by stop() keeps its archive so it can resume
+        job = self.store.get_job(job_id)
+        if job is not None and job["status"] in (COMPLETED, FAILED):
+            try:
+                os.remove(job["archive_path"])
+            except FileNotFoundError:
+                pass
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a multi-threaded server process is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker
+            )
+        return self._pool
+
+    def _process(self, job_id: str) -> None:
+        job = self.store.get_job(job_id)
+        if job is None:
+            return
+        path = job["archive_path"]
+        done = self.store.done_paths(job_id)
+        self.store.update_job(job_id, status=RUNNING, total_files=count_archive_members(path))
+
+        pool = self._get_pool()
+        pending = {}
+        window = self.workers * 2
+
+        for name, content in iter_archive_members(path):
+            if self._stopping:
+                return
+            if name in done:
+                continue
+            pending[pool.submit(check_member, name, content)] = name
+            if len(pending) >= window:
+                self._drain(job_id, pending, FIRST_COMPLETED)
+        self._drain(job_id, pending, ALL_COMPLETED)
+
+        if not self._stopping:
+            self.store.update_job(job_id, status=COMPLETED)
+
+    def _drain(self, job_id: str, pending: Dict, return_when) -> None:
+        while pending:
+            finished, _ = wait(pending, return_when=return_when)
+            for future in finished:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"predicted_error": "CheckFailed", "has_errors": False, "error": str(e)}
+                self.store.add_result(job_id, name, result)
+            if return_when == FIRST_COMPLETED:
+                return
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide JobManager, starting it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+            _manager.start()
+        return _manager
+
+
+def shutdown_job_manager() -> None:
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.stop()
+            _manager = None
@@ -0,0 +1,177 @@
+"""
+Streaming Checker Module
+Runs the line-oriented detectors incrementally over text arriving in chunks
+"""
+
+import codecs
+from typing import Any, Dict, List, Optional
+
+from .language_detector import detect_language
+from .syntax_checker import BracketScanner, Issue, check_colon_line, check_semicolon_line, rule_enabled
+from .tutor_explainer import explain_error
+
+# Stop collecting issues after this many (keeps memory bounded on huge inputs)
+DEFAULT_MAX_ISSUES = 1000
+
+# Bytes of the first chunk used for content-based language detection
+LANGUAGE_SNIFF_BYTES = 4096
+
+
+class StreamingChecker:
+    """
+    Incremental syntax checker for sources too large to buffer
+
+    Text is fed in arbitrary chunks (bytes or str). Complete lines are
+    checked as soon as they arrive and then discarded, so memory use is
+    bounded by the longest line, the open-bracket stack and the issue cap.
+
+    Line-oriented checks:
+        - Python: missing colons, unmatched brackets
+        - Java / C / C++: missing semicolons, unmatched brackets
+    """
+
+    def __init__(self, filename: Optional[str] = None, language: Optional[str] = None,
+                 max_issues: int = DEFAULT_MAX_ISSUES, encoding: str = "utf-8"):
+        self.filename = filename
+        self.language = language
+        self.max_issues = max_issues
+        self.issues: List[Issue] = []
+        self.truncated = False
+        self.total_lines = 0
+        self.total_bytes = 0
+        # Rules switched off with SYNTAX_DISABLED_RULES stay off here too
+        self._colons = rule_enabled("missing_colon")
+        self._semicolons = rule_enabled("missing_semicolon")
+        self._bracket_check = rule_enabled("unmatched_brackets")
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._carry = ""
+        self._sniff = ""
+        if self.language is None and filename:
+            by_extension = detect_language("", filename)
+            if by_extension != "Unknown":
+                self.language = by_extension
+        # Skips strings and comments the way the (known) language writes them
+        self._brackets = BracketScanner(self.language or "Python")
+
+    # --------------------------------------------------------
+    # Feeding
+    # --------------------------------------------------------
+
+    def feed(self, chunk) -> None:
+        """Consume the next chunk of source (bytes-like chunks are decoded with `encoding`)."""
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            self.total_bytes += len(chunk)
+            chunk = self._decoder.decode(chunk)
+        else:
+            self.total_bytes += len(chunk.encode("utf-8"))
+        if not chunk:
+            return
+
+        if self.language is None:
+            self._sniff += chunk
+            if len(self._sniff) < LANGUAGE_SNIFF_BYTES:
+                return
+            chunk, self._sniff = self._sniff, ""
+            self._resolve_language(chunk)
+
+        self._consume(chunk)
+
+    def close(self) -> Dict[str, Any]:
+        """Flush the remaining partial line and return the final result."""
+        tail = self._decoder.decode(b"", final=True)
+        if self.language is None:
+            tail = self._sniff + tail
+            self._sniff = ""
+            self._resolve_language(tail)
+        self._consume(tail)
+        if self._carry:
+            self._check_line(self._carry)
+            self._carry = ""
+        if self.language in ["Python", "Java", "C", "C++"] and self._bracket_check:
+            self._add(self._brackets.finish())
+        return self.result()
+
+    # --------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------
+
+    def _resolve_language(self, prefix: str) -> None:
+        self.language = detect_language(prefix, self.filename)
+        self._brackets = BracketScanner(self.language)
+
+    def _consume(self, text: str) -> None:
+        if not text:
+            return
+        parts = (self._carry + text).splitlines(keepends=True)
+        self._carry = ""
+        # Keep an unterminated last line (or a lone '\r' that may start '\r\n')
+        if parts and (not parts[-1].endswith(("\n", "\r")) or parts[-1].endswith("\r")):
+            self._carry = parts.pop()
+        for part in parts:
+            self._check_line(part.rstrip("\r\n"))
+
+    def _check_line(self, line: str) -> None:
+        self.total_lines += 1
+        lineno = self.total_lines
+        if self.language == "Python":
+            issue = check_colon_line(lineno, line) if self._colons else None
+            if issue:
+                self._add([issue])
+            if self._bracket_check:
+                self._add(self._brackets.feed_line(lineno, line))
+        elif self.language in ["Java", "C", "C++"]:
+            issue = check_semicolon_line(lineno, line) if self._semicolons else None
+            if issue:
+                self._add([issue])
+            if self._bracket_check:
+                self._add(self._brackets.feed_line(lineno, line))
+
+    def _add(self, issues: List[Issue]) -> None:
+        for issue in issues:
+            if len(self.issues) >= self.max_issues:
+                self.truncated = True
+                return
+            self.issues.append(issue)
+
+    def result(self) -> Dict[str, Any]:
+        issues = sorted(self.issues, key=lambda x: x.line if x.line is not None else 0)
+        if issues:
+            predicted = issues[0]["type"]
+            tutor = explain_error(predicted)
+        else:
+            predicted = "NoError"
+            tutor = {
+                "why": "No line-level syntax issues were found.",
+                "fix": "No changes are required."
+            }
+        return {
+            "language": self.language or "Unknown",
+            "predicted_error": predicted,
+            "tutor": tutor,
+            "issues": issues,
+            "total_issues": len(issues),
+            "truncated": self.truncated,
+            "total_lines": self.total_lines,
+            "total_bytes": self.total_bytes,
+            "has_errors": bool(issues)
+        }
+
+
+def check_stream(chunks, filename: Optional[str] = None, language: Optional[str] = None,
+                 max_issues: int = DEFAULT_MAX_ISSUES) -> Dict[str, Any]:
+    """
+    Convenience function: run StreamingChecker over an iterable of chunks
+
+    Args:
+        chunks: Iterable of bytes or str
+        filename: Optional filename for language detection
+        language: Optional language override
+        max_issues: Maximum number of issues to collect
+
+    Returns:
+        dict with detected language, issues and stream statistics
+    """
+    checker = StreamingChecker(filename, language, max_issues)
+    for chunk in chunks:
+        checker.feed(chunk)
+    return checker.close()
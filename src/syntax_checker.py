@@ -1,8 +1,109 @@
 import ast
+import atexit
+import bisect
+import collections.abc
+import functools
+import io
+import multiprocessing
+import operator
+import os
 import re
+import threading
+import time
 import tokenize
-import io
-from typing import List, Dict, Any, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class Issue:
+    """
+    One finding of a rule
+
+    A __slots__ record rather than a dict, so inputs with thousands of
+    findings do not allocate a dict per finding (plus the copies made when
+    merging and sorting). It still reads like the dict it replaces:
+    issue["line"], issue.get("suggestion"), dict(issue) and comparison with
+    a dict all work. JSON encoders take it through json_default (or
+    to_dict()) at the API/CLI boundary.
+    """
+
+    __slots__ = ("type", "message", "line", "col", "snippet", "suggestion", "order")
+    FIELDS = ("type", "message", "line", "col", "snippet", "suggestion")
+
+    def __init__(self, type: str, message: Optional[str], line: Optional[int] = None, col: Optional[int] = None,
+                 snippet: Optional[str] = None, suggestion: Optional[str] = None):
+        self.type = type
+        self.message = message
+        self.line = line
+        self.col = col
+        self.snippet = snippet
+        self.suggestion = suggestion
+        # Sort position: by line, issues without a line last
+        self.order = 9999 if line is None else line
+
+    @classmethod
+    def from_dict(cls, issue: Dict[str, Any]) -> "Issue":
+        return cls(issue.get("type"), issue.get("message"), issue.get("line"), issue.get("col"),
+                   issue.get("snippet"), issue.get("suggestion"))
+
+    def moved(self, line: int) -> "Issue":
+        """Copy of the issue reported at another line."""
+        return Issue(self.type, self.message, line, self.col, self.snippet, self.suggestion)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "message": self.message, "line": self.line, "col": self.col,
+                "snippet": self.snippet, "suggestion": self.suggestion}
+
+    # -- read-only mapping interface ------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        if key in Issue.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in Issue.FIELDS else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in Issue.FIELDS
+
+    def __iter__(self):
+        return iter(Issue.FIELDS)
+
+    def __len__(self) -> int:
+        return len(Issue.FIELDS)
+
+    def keys(self) -> Tuple[str, ...]:
+        return Issue.FIELDS
+
+    def values(self) -> List[Any]:
+        return [getattr(self, key) for key in Issue.FIELDS]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, getattr(self, key)) for key in Issue.FIELDS]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Issue):
+            return self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Issue({self.to_dict()!r})"
+
+
+collections.abc.Mapping.register(Issue)
+
+_BY_LINE = operator.attrgetter("order")
+
+
+def json_default(obj: Any) -> Any:
+    """default= hook for json/orjson dumps: issues become plain objects."""
+    if isinstance(obj, Issue):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 def try_ast_parse(code: str) -> Tuple[bool, Any]:
@@ -14,7 +115,7 @@ def try_ast_parse(code: str) -> Tuple[bool, Any]:
         return False, e
 
 
-def detect_unclosed_quotes(code: str) -> List[Dict[str, Any]]:
+def detect_unclosed_quotes(code: str) -> List[Issue]:
     """Detect unclosed or unterminated string quotes safely, even when indentation is invalid."""
     issues = []
     try:
@@ -25,114 +126,469 @@ def detect_unclosed_quotes(code: str) -> List[Dict[str, Any]]:
             _ = list(tokenize.generate_tokens(io.StringIO(code).readline))
         except (tokenize.TokenError, IndentationError, SyntaxError) as e:
             msg = str(e)
-            issues.append({
-                "type": "UnclosedQuotes",
-                "message": msg if msg else "Tokenizer failed — possible unterminated string or indentation issue.",
-                "line": None,
-                "suggestion": "Check for missing quotes or inconsistent indentation."
-            })
+            issues.append(Issue(
+                "UnclosedQuotes",
+                msg if msg else "Tokenizer failed — possible unterminated string or indentation issue.",
+                line=None,
+                suggestion="Check for missing quotes or inconsistent indentation."
+            ))
         except Exception as e:
             # Absolute fallback for any unknown tokenizer failure
-            issues.append({
-                "type": "UnclosedQuotes",
-                "message": f"Tokenizer crash: {e}",
-                "line": None,
-                "suggestion": "Check quotes and indentation."
-            })
+            issues.append(Issue(
+                "UnclosedQuotes",
+                f"Tokenizer crash: {e}",
+                line=None,
+                suggestion="Check quotes and indentation."
+            ))
     except Exception as e:
         # Final global fail-safe
-        issues.append({
-            "type": "UnclosedQuotes",
-            "message": f"Unexpected error: {e}",
-            "line": None,
-            "suggestion": "Unexpected parsing issue while checking quotes."
-        })
+        issues.append(Issue(
+            "UnclosedQuotes",
+            f"Unexpected error: {e}",
+            line=None,
+            suggestion="Unexpected parsing issue while checking quotes."
+        ))
     return issues
 
 
-def detect_unmatched_brackets(code: str) -> List[Dict[str, Any]]:
-    """Detect missing or extra brackets/parentheses."""
-    stack = []
-    pairs = {')': '(', ']': '[', '}': '{'}
-    issues = []
-    for lineno, line in enumerate(code.splitlines(), start=1):
-        for col, ch in enumerate(line, start=1):
+# Characters the bracket scanner stops at; everything in between is skipped
+# by the regex engine instead of a per-character Python loop
+_PY_SCAN = re.compile(r"""[()\[\]{}#"']""")
+_C_SCAN = re.compile(r"""[()\[\]{}"']|//|/\*""")
+# Rest of a string (or block comment) from just after its opening delimiter
+# (unrolled loops: runs of plain characters are consumed in one step)
+_STRING_END = {
+    '"': re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"'),
+    "'": re.compile(r"[^'\\]*(?:\\.[^'\\]*)*'"),
+    '"""': re.compile(r'[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""'),
+    "'''": re.compile(r"[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''"),
+    "/*": re.compile(r".*?\*/"),
+}
+# Python f-strings (PEP 701: replacement fields may nest strings that reuse
+# the enclosing quote). The prefix is matched just before the quote.
+_FSTRING_PREFIX = re.compile(r"(?<!\w)(?:[fF][rR]?|[rR][fF])\Z")
+# Next escape, doubled brace, field brace or closing quote in an f-string body
+_FSTRING_BODY = {
+    q: re.compile(r"\\N\{[^}]*\}|\\[^{}]|\{\{|\}\}|[{}]|" + q) for q in ('"', "'", '"""', "'''")
+}
+_RAW_FSTRING_BODY = {q: re.compile(r"\\[^{}]|\{\{|\}\}|[{}]|" + q) for q in _FSTRING_BODY}
+# Code inside a replacement field, and the format spec after its ':'
+_FIELD_SCAN = re.compile(r"""[()\[\]{}#"':]""")
+_SPEC_SCAN = re.compile(r"[{}]")
+_SPEC = -1  # replacement-field mode: in the format spec
+C_FAMILY = ("Java", "C", "C++")
+
+# Whole-document strings and comments, removed in one re.sub for the
+# balanced fast path (an unterminated string runs to the end of its line,
+# an unterminated triple quote or block comment to the end of the text)
+_SINGLE_QUOTED = r"""|"[^"\\\n]*(?:\\.[^"\\\n]*)*"?|'[^'\\\n]*(?:\\.[^'\\\n]*)*'?"""
+_TRIPLE_QUOTED = (r'|"""[^"\\]*(?:(?:\\.?|"(?!""))[^"\\]*)*(?:"""|\Z)'
+                  r"|'''[^'\\]*(?:(?:\\.?|'(?!''))[^'\\]*)*(?:'''|\Z)")
+_C_COMMENTS = r"//[^\n]*|/\*.*?(?:\*/|\Z)"
+_NON_CODE = {
+    "Python": re.compile(r"#[^\n]*" + _TRIPLE_QUOTED + _SINGLE_QUOTED, re.S),
+    "Java": re.compile(_C_COMMENTS + _TRIPLE_QUOTED + _SINGLE_QUOTED, re.S),
+    "C": re.compile(_C_COMMENTS + _SINGLE_QUOTED, re.S),
+}
+_NON_CODE["C++"] = _NON_CODE["C"]
+# bytes.translate delete table: everything but the six bracket bytes
+_NOT_BRACKETS = bytes(b for b in range(256) if chr(b) not in "()[]{}")
+
+
+def _continues(line: str) -> bool:
+    """Does the line end in a backslash continuation (an odd number of backslashes)?"""
+    return (len(line) - len(line.rstrip("\\"))) % 2 == 1
+
+
+class BracketScanner:
+    """
+    Line-by-line bracket matcher that keeps the open-bracket stack between lines
+
+    Brackets inside strings and comments are ignored. The scanner jumps
+    from one bracket, quote or comment character to the next with a
+    compiled regex, and carries an open triple-quoted string (Python, Java
+    text blocks), block comment (C family) or backslash-continued string
+    over to the next line in `string`. Python f-strings are followed into
+    their replacement fields, whose brackets are code; `string` then holds
+    the nested f-strings as (quote, raw, field modes) tuples.
+    """
+
+    PAIRS = {')': '(', ']': '[', '}': '{'}
+
+    def __init__(self, language: str = "Python"):
+        self.stack = []
+        self.string: Optional[str] = None
+        c_family = language in C_FAMILY
+        self._scan = (_C_SCAN if c_family else _PY_SCAN).search
+        self._triple = language != "C" and language != "C++"
+        self._fstrings = language == "Python"
+
+    def brackets(self, line: str) -> List[Tuple[int, str]]:
+        """(column, bracket) pairs of one line that are code, not string or comment."""
+        found = []
+        pos = 0
+        if type(self.string) is tuple:
+            frames = [[quote, raw, list(modes)] for quote, raw, modes in self.string]
+            self.string = None
+            pos = self._fstring(line, 0, found, frames)
+            if pos is None:
+                return found
+        elif self.string:
+            m = _STRING_END[self.string].match(line)
+            if not m:
+                if len(self.string) == 1 and not _continues(line):
+                    self.string = None  # unterminated string: the parser reports it
+                return found
+            pos = m.end()
+            self.string = None
+        scan = self._scan
+        while True:
+            m = scan(line, pos)
+            if m is None:
+                return found
+            tok = m.group()
+            start = m.start()
+            if tok in "()[]{}":
+                found.append((start + 1, tok))
+                pos = start + 1
+                continue
+            if tok == "#" or tok == "//":
+                return found
+            if tok != "/*" and self._triple and line.startswith(tok * 3, start):
+                tok *= 3
+            if self._fstrings and start and line[start - 1] in "fFrR":
+                prefix = _FSTRING_PREFIX.search(line, max(0, start - 3), start)
+                if prefix:
+                    frames = [[tok, "r" in prefix.group().lower(), []]]
+                    pos = self._fstring(line, start + len(tok), found, frames)
+                    if pos is None:
+                        return found
+                    continue
+            end = _STRING_END[tok].match(line, start + len(tok))
+            if end:
+                pos = end.end()
+                continue
+            if len(tok) > 1 or _continues(line):
+                self.string = tok
+            return found
+
+    def _fstring(self, line: str, pos: int, found: list, frames: list) -> Optional[int]:
+        """
+        Scan from pos inside the f-strings in frames (outermost first, each
+        [quote, raw, modes] where modes holds one entry per open replacement
+        field: its bracket depth, or _SPEC in the format spec).
+
+        Returns:
+            The position after the outermost f-string, or None when the line
+            ends inside it (the state to carry over is then in `string`)
+        """
+        while frames:
+            quote, raw, modes = frames[-1]
+            if not modes or modes[-1] == _SPEC:
+                # Literal text: the f-string body or a format spec
+                if modes:
+                    m = _SPEC_SCAN.search(line, pos)
+                else:
+                    m = (_RAW_FSTRING_BODY if raw else _FSTRING_BODY)[quote].search(line, pos)
+                if m is None:
+                    break
+                tok = m.group()
+                pos = m.end()
+                if tok == "{":
+                    modes.append(0)
+                elif tok == "}":
+                    if modes:
+                        modes.pop()
+                elif tok == quote:
+                    frames.pop()
+                continue
+            # Replacement field: code
+            m = _FIELD_SCAN.search(line, pos)
+            if m is None:
+                break
+            tok = m.group()
+            start = m.start()
+            pos = start + 1
+            depth = modes[-1]
+            if tok == "}" and not depth:
+                modes.pop()
+            elif tok in "([{":
+                found.append((start + 1, tok))
+                modes[-1] = depth + 1
+            elif tok in ")]}":
+                found.append((start + 1, tok))
+                modes[-1] = max(depth - 1, 0)
+            elif tok == ":":
+                if not depth:
+                    modes[-1] = _SPEC
+            elif tok == "#":
+                break
+            else:
+                if line.startswith(tok * 3, start):
+                    tok *= 3
+                prefix = start and _FSTRING_PREFIX.search(line, max(0, start - 3), start)
+                if prefix:
+                    frames.append([tok, "r" in prefix.group().lower(), []])
+                    pos = start + len(tok)
+                    continue
+                end = _STRING_END[tok].match(line, start + len(tok))
+                if not end:
+                    frames.clear()  # unterminated string: the parser reports it
+                    break
+                pos = end.end()
+        else:
+            return pos
+        # The line ends inside the f-string: replacement fields (code) and
+        # triple-quoted or backslash-continued bodies go on to the next line
+        if frames:
+            quote, _, modes = frames[-1]
+            if (modes and modes[-1] != _SPEC) or len(quote) == 3 or _continues(line):
+                self.string = tuple((quote, raw, tuple(modes)) for quote, raw, modes in frames)
+        return None
+
+    def feed_line(self, lineno: int, line: str) -> List[Issue]:
+        """Scan one line and return the issues found on it."""
+        stack = self.stack
+        pairs = self.PAIRS
+        issues = []
+        for col, ch in self.brackets(line):
             if ch in "([{":
                 stack.append((ch, lineno, col))
-            elif ch in ")]}":
-                if not stack:
-                    issues.append({
-                        "type": "UnmatchedBracket",
-                        "message": f"Found closing {ch} without opening bracket.",
-                        "line": lineno,
-                        "col": col,
-                        "suggestion": "Remove the extra closing bracket or add matching opening bracket."
-                    })
+            elif not stack:
+                issues.append(Issue(
+                    "UnmatchedBracket",
+                    f"Found closing {ch} without opening bracket.",
+                    line=lineno,
+                    col=col,
+                    suggestion="Remove the extra closing bracket or add matching opening bracket."
+                ))
+            else:
+                top, tline, tcol = stack[-1]
+                if top == pairs[ch]:
+                    stack.pop()
                 else:
-                    top, tline, tcol = stack[-1]
-                    if top == pairs[ch]:
-                        stack.pop()
-                    else:
-                        issues.append({
-                            "type": "UnmatchedBracket",
-                            "message": f"Bracket mismatch: found {ch} but last opening is {top}.",
-                            "line": lineno,
-                            "col": col,
-                            "suggestion": "Fix the matching bracket types."
-                        })
+                    issues.append(Issue(
+                        "UnmatchedBracket",
+                        f"Bracket mismatch: found {ch} but last opening is {top}.",
+                        line=lineno,
+                        col=col,
+                        suggestion="Fix the matching bracket types."
+                    ))
+        return issues
+
+    def finish(self) -> List[Issue]:
+        """Report every opening bracket that is still unmatched."""
+        issues = []
+        for (ch, lineno, col) in self.stack:
+            issues.append(Issue(
+                "UnmatchedBracket",
+                f"Opening {ch} at line {lineno} has no matching closing bracket.",
+                line=lineno,
+                col=col,
+                suggestion=f"Add a closing bracket for {ch}."
+            ))
+        return issues
+
+
+def brackets_balanced(code: str, language: str = "Python") -> bool:
+    """
+    Do the code brackets (outside strings and comments) pair up? Strings
+    and comments are removed with one regex pass, bytes.translate keeps the
+    brackets, then matched pairs are removed with bytes.replace.
+    """
+    non_code = _NON_CODE.get(language, _NON_CODE["Python"])
+    return _pairs_up(non_code.sub("", code))
+
+
+def _pairs_up(code_only: str) -> bool:
+    brackets = code_only.encode("utf-8", "surrogatepass").translate(None, _NOT_BRACKETS)
+    while brackets:
+        reduced = brackets.replace(b"()", b"").replace(b"[]", b"").replace(b"{}", b"")
+        if len(reduced) == len(brackets):
+            return False
+        brackets = reduced
+    return True
+
+
+# Lines per block when locating bracket problems (blocks are 1-2x this long)
+LOCATE_BLOCK_LINES = 128
+# First characters of lines that are not unindented statements
+_NOT_UNINDENTED = ("", " ", "\t", ")", "]", "}")
+
+
+def _block_cuts(lines: List[str]) -> List[int]:
+    """
+    Block boundaries for detect_unmatched_brackets: each block ends at the
+    first unindented line of its last LOCATE_BLOCK_LINES lines, or else the
+    least indented one, most likely where a statement or definition (not
+    a closing bracket) starts.
+    """
+    def indent(i: int) -> Tuple[bool, int]:
+        stripped = lines[i].lstrip()
+        return not stripped or stripped[0] in ")]}", len(lines[i]) - len(stripped)
+
+    cuts = []
+    cut = 0
+    while cut + 2 * LOCATE_BLOCK_LINES <= len(lines):
+        window = range(cut + LOCATE_BLOCK_LINES, cut + 2 * LOCATE_BLOCK_LINES)
+        cut = next((i for i in window if lines[i][:1] not in _NOT_UNINDENTED), None)
+        if cut is None:
+            cut = min(window, key=indent)
+        cuts.append(cut)
+    cuts.append(len(lines))
+    return cuts
+
+
+def detect_unmatched_brackets(code: str, language: str = "Python", first_line: int = 1) -> List[Issue]:
+    """Detect missing or extra brackets/parentheses outside strings and comments."""
+    if brackets_balanced(code, language):
+        return []
+    # Locate the problems line by line. A block of lines whose brackets pair
+    # up on their own, starting and ending outside strings and comments,
+    # leaves the stack as it was and reports nothing: it is skipped.
+    non_code = _NON_CODE.get(language, _NON_CODE["Python"])
+    lines = code.splitlines()
+    scanner = BracketScanner(language)
+    issues = []
+    start = 0
+    for end in _block_cuts(lines):
+        if scanner.string is None:
+            # An unterminated string or comment would swallow the \0 sentinel
+            code_only = non_code.sub("", "\n".join(lines[start:end]) + "\n\0")
+            if code_only.endswith("\0") and _pairs_up(code_only):
+                start = end
+                continue
+        for lineno in range(start, end):
+            issues += scanner.feed_line(lineno + first_line, lines[lineno])
+        start = end
     # If any opening bracket is left unmatched
-    for (ch, lineno, col) in stack:
-        issues.append({
-            "type": "UnmatchedBracket",
-            "message": f"Opening {ch} at line {lineno} has no matching closing bracket.",
-            "line": lineno,
-            "col": col,
-            "suggestion": f"Add a closing bracket for {ch}."
-        })
+    issues += scanner.finish()
     return issues
 
 
-def detect_missing_colon(code: str) -> List[Dict[str, Any]]:
+COLON_KEYWORDS = ['def ', 'class ', 'if ', 'elif ', 'else', 'for ', 'while ', 'try', 'except', 'with ']
+
+# One alternation for all keywords, tried in COLON_KEYWORDS order: the line
+# starts with the keyword, or with the keyword minus its last character at a
+# word boundary. Group k<i> tells which keyword matched.
+COLON_KEYWORD_PATTERN = re.compile("|".join(
+    f"(?P<k{i}>{re.escape(kw)}|{re.escape(kw[:-1])}\\b)" for i, kw in enumerate(COLON_KEYWORDS)
+))
+
+
+def check_colon_line(lineno: int, raw: str) -> Optional[Issue]:
+    """Check a single line for a missing colon after a control or function definition."""
+    line = raw.strip()
+    if not line or line.startswith('#'):
+        return None
+    code_part = line.split('#', 1)[0].rstrip()
+    m = COLON_KEYWORD_PATTERN.match(code_part)
+    if m and not code_part.endswith(':'):
+        kw = COLON_KEYWORDS[m.lastindex - 1]
+        return Issue(
+            "MissingColon",
+            f"Probable missing ':' after statement starting with '{kw.strip()}'",
+            line=lineno,
+            snippet=raw.strip(),
+            suggestion="Add a ':' at the end of this line."
+        )
+    return None
+
+
+def detect_missing_colon(code: str) -> List[Issue]:
     """Detect lines missing colon after control or function definitions."""
     issues = []
-    keywords = ['def ', 'class ', 'if ', 'elif ', 'else', 'for ', 'while ', 'try', 'except', 'with ']
     for lineno, raw in enumerate(code.splitlines(), start=1):
-        line = raw.strip()
-        if not line or line.startswith('#'):
-            continue
-        code_part = line.split('#', 1)[0].rstrip()
-        for kw in keywords:
-            if code_part.startswith(kw) or re.match(rf'^{kw[:-1]}\b', code_part):
-                if not code_part.endswith(':'):
-                    issues.append({
-                        "type": "MissingColon",
-                        "message": f"Probable missing ':' after statement starting with '{kw.strip()}'",
-                        "line": lineno,
-                        "snippet": raw.strip(),
-                        "suggestion": "Add a ':' at the end of this line."
-                    })
-                break
+        issue = check_colon_line(lineno, raw)
+        if issue:
+            issues.append(issue)
     return issues
 
 
-def detect_indentation_errors(code: str) -> List[Dict[str, Any]]:
+# Java / C / C++: simple statements that require a trailing semicolon
+SEMICOLON_STATEMENT_PATTERNS = [re.compile(p) for p in [
+    r'^return\s+.+$',                # return statements
+    r'^cout\s*<<.*$',                # C++ cout
+    r'^cin\s*>>.*$',                 # C++ cin
+    r'^printf\s*\(.*\)$',          # C printf
+    r'^fprintf\s*\(.*\)$',         # C fprintf
+    r'^puts\s*\(.*\)$',            # C puts
+    r'^std::cout\s*<<.*$',           # C++ std::cout
+    r'^std::cin\s*>>.*$',            # C++ std::cin
+]]
+
+SEMICOLON_SKIP_PREFIXES = (
+    '//', '/*', '*', '#', 'import', 'package', 'using', 'namespace',
+    'public class', 'class ', 'private class', 'protected class'
+)
+
+SEMICOLON_CONTROL_KEYWORDS = [
+    'if (', 'if(', 'for (', 'for(', 'while (', 'while(', 'else', 'try', 'catch',
+    'switch (', 'switch(', 'case ', 'default:', 'do ', 'do{'
+]
+
+
+def needs_semicolon(line: str) -> bool:
+    """Return True if a stripped Java/C/C++ line looks like a statement missing its ';'."""
+    # Skip comments, preprocessor directives, and control structures
+    if not line or line.startswith(SEMICOLON_SKIP_PREFIXES) or line.endswith('{') or line.endswith('}'):
+        return False
+    if any(keyword in line for keyword in SEMICOLON_CONTROL_KEYWORDS) or line.endswith(';'):
+        return False
+    # Check for simple statement patterns
+    if any(pat.match(line) for pat in SEMICOLON_STATEMENT_PATTERNS):
+        return True
+    # Also check for assignment or function call
+    return ('=' in line or ('(' in line and ')' in line)) and not line.startswith('}')
+
+
+def check_semicolon_line(lineno: int, raw: str) -> Optional[Issue]:
+    """Check a single Java/C/C++ line for a missing ';'."""
+    stripped = raw.strip()
+    if not needs_semicolon(stripped):
+        return None
+    return Issue(
+        "MissingDelimiter",
+        "Statement appears to be missing a ';'",
+        line=lineno,
+        snippet=stripped,
+        suggestion="Add a ';' at the end of this line."
+    )
+
+
+def detect_indentation_errors(code: str) -> List[Issue]:
     """Detect indentation problems using compile()."""
     issues = []
     try:
         compile(code, '<string>', 'exec')
     except IndentationError as e:
-        issues.append({
-            "type": "IndentationError",
-            "message": str(e),
-            "line": getattr(e, 'lineno', None),
-            "suggestion": "Check indentation levels (use consistent tabs/spaces; prefer 4 spaces)."
-        })
+        issues.append(Issue(
+            "IndentationError",
+            str(e),
+            line=getattr(e, 'lineno', None),
+            suggestion="Check indentation levels (use consistent tabs/spaces; prefer 4 spaces)."
+        ))
     except SyntaxError:
         # Skip non-indentation syntax errors
         pass
     return issues
 
 
+# Line numbers quoted in parser messages ("... on line 3", "(detected at line 7)")
+_MESSAGE_LINE = re.compile(r"\b((?:on|at) line )(\d+)")
+
+
+def shift_syntax_error(exc: SyntaxError, offset: int) -> None:
+    """Move a SyntaxError from a parse that began offset lines into the file to file line numbers."""
+    if not offset:
+        return
+    exc.lineno += offset
+    if exc.end_lineno:
+        exc.end_lineno += offset
+    if exc.msg:
+        exc.msg = _MESSAGE_LINE.sub(lambda m: f"{m.group(1)}{int(m.group(2)) + offset}", exc.msg)
+
+
 def classify_syntax_error(exc: Exception) -> Dict[str, Any]:
     """Convert a SyntaxError or Exception from AST parsing into user-friendly info."""
     msg = str(exc)
@@ -161,33 +617,734 @@ def classify_syntax_error(exc: Exception) -> Dict[str, Any]:
     return info
 
 
-def detect_all(code: str) -> List[Dict[str, Any]]:
-    """Run all detectors and return combined list of issues."""
+# ------------------------------------------------------------
+# Rule registry
+# ------------------------------------------------------------
+
+# Comma-separated rule names to switch off (see rule_stats() for the names)
+DISABLED_RULES = {name.strip() for name in os.getenv("SYNTAX_DISABLED_RULES", "").split(",") if name.strip()}
+
+# Line-scoped rules run fused over blocks of this many lines
+LINE_BLOCK = 512
+
+RULE_SCOPES = ("line", "token", "ast")
+
+
+class Rule:
+    """
+    A registered detector
+
+    scope "line" rules see one line at a time: check(lineno, line), or
+    check(state, lineno, line) when begin() creates per-document state, in
+    which case finish(state) reports what is left at the end. All line rules
+    run fused in one pass over the lines. "token" and "ast" rules see the
+    whole document: check(ctx) with a RuleContext.
+
+    check() returns an issue, a list of issues or None. calls and
+    cpu_seconds accumulate the thread CPU time spent in the rule.
+
+    A blockwise rule finds in a file exactly what it finds in the file's
+    top-level blocks checked one by one (all line rules do), so large files
+    can run it block-parallel; the other rules must only report issues when
+    the whole-file parse fails.
+    """
+
+    def __init__(self, name: str, scope: str, check: Callable, languages: Tuple[str, ...] = ("Python",),
+                 patterns: Optional[Dict[str, Any]] = None, begin: Optional[Callable] = None,
+                 finish: Optional[Callable] = None, blockwise: Optional[bool] = None):
+        if scope not in RULE_SCOPES:
+            raise ValueError(f"Unknown rule scope: {scope}")
+        self.name = name
+        self.scope = scope
+        self.check = check
+        self.languages = languages
+        self.patterns = patterns or {}
+        self.begin = begin
+        self.finish = finish
+        self.blockwise = scope == "line" if blockwise is None else blockwise
+        self.enabled = name not in DISABLED_RULES
+        self.calls = 0
+        self.cpu_seconds = 0.0
+
+
+class RuleContext:
+    """
+    What document-scoped rules see: the code, one shared parse, the issues
+    found so far and whether every syntax error is wanted (recover).
+    """
+
+    def __init__(self, code: str, recover: bool = False, first_line: int = 1):
+        self.code = code
+        self.recover = recover
+        self.first_line = first_line  # number of the code's first line in its file
+        self.issues: List[Issue] = []
+        self._parsed: Optional[Tuple[bool, Any]] = None
+        self.parse_seconds = 0.0
+
+    @property
+    def parsed(self) -> Tuple[bool, Any]:
+        """try_ast_parse(code), computed once for all rules."""
+        if self._parsed is None:
+            started = time.thread_time()
+            self._parsed = try_ast_parse(self.code)
+            self.parse_seconds = time.thread_time() - started
+        return self._parsed
+
+
+RULES: Dict[str, Rule] = {}
+_stats_lock = threading.Lock()
+_shared_parse = [0, 0.0]  # calls, cpu seconds of the parse shared by document rules
+
+
+def register_rule(rule: Rule) -> Rule:
+    """Add (or replace) a rule; rules run and report in registration order."""
+    RULES[rule.name] = rule
+    return rule
+
+
+def rule_enabled(name: str) -> bool:
+    rule = RULES.get(name)
+    return rule.enabled if rule else name not in DISABLED_RULES
+
+
+def set_rule_enabled(name: str, enabled: bool) -> None:
+    if name not in RULES:
+        raise KeyError(f"Unknown rule: {name}")
+    RULES[name].enabled = enabled
+
+
+def disabled_rules() -> List[str]:
+    return sorted(name for name, rule in RULES.items() if not rule.enabled)
+
+
+def rule_stats() -> List[Dict[str, Any]]:
+    """Per-rule call counts and CPU time, slowest first."""
+    with _stats_lock:
+        stats = [{
+            "name": rule.name,
+            "scope": rule.scope,
+            "languages": list(rule.languages),
+            "enabled": rule.enabled,
+            "calls": rule.calls,
+            "cpu_ms": round(rule.cpu_seconds * 1000, 3)
+        } for rule in RULES.values()]
+        stats.append({
+            "name": "ast.parse (shared)",
+            "scope": "ast",
+            "languages": ["Python"],
+            "enabled": True,
+            "calls": _shared_parse[0],
+            "cpu_ms": round(_shared_parse[1] * 1000, 3)
+        })
+    return sorted(stats, key=lambda s: -s["cpu_ms"])
+
+
+def reset_rule_stats() -> None:
+    with _stats_lock:
+        for rule in RULES.values():
+            rule.calls = 0
+            rule.cpu_seconds = 0.0
+        _shared_parse[:] = [0, 0.0]
+
+
+def _collect(out: List[Issue], result) -> None:
+    if result is None:
+        return
+    if isinstance(result, list):
+        out.extend(result)
+    else:
+        out.append(result)
+
+
+def run_rules(code: str, language: str = "Python", stop_early: bool = False,
+              recover: bool = False, workers: Optional[int] = None) -> List[Issue]:
+    """
+    Run the enabled rules for a language; issues come back per rule in
+    registration order (not sorted). recover makes the syntax rule report
+    every independent syntax error (see recover_syntax_errors).
+
+    stop_early ends at the first rule step that finds an issue: line rules
+    stop after the first block with one, and document rules run cheapest
+    scope first (an AST that parses also tokenizes, so the token rule is
+    not needed for the verdict).
+
+    Python files of PARALLEL_MIN_LINES lines or more are split at top-level
+    statements and checked block by block in a process pool of `workers`
+    (default PARALLEL_WORKERS) processes; see _run_blocks. Code already
+    running in a multiprocessing worker (batch, scan jobs, the pool itself)
+    never starts a pool of its own.
+    """
+    rules = [r for r in RULES.values() if r.enabled and language in r.languages]
+    workers = PARALLEL_WORKERS if workers is None else workers
+    if (language == "Python" and not stop_early and workers > 1
+            and code.count("\n") >= PARALLEL_MIN_LINES and multiprocessing.parent_process() is None):
+        found = _run_blocks(code, rules, recover, workers)
+    else:
+        found = _apply_rules(code, rules, stop_early, recover)
+    return [issue for r in rules for issue in found[r.name]]
+
+
+def _record(rules: List[Rule], spent: Dict[str, float], parses: int = 0, parse_seconds: float = 0.0) -> None:
+    with _stats_lock:
+        for r in rules:
+            r.calls += 1
+            r.cpu_seconds += spent.get(r.name, 0.0)
+        _shared_parse[0] += parses
+        _shared_parse[1] += parse_seconds
+
+
+def _apply_rules(code: str, rules: List[Rule], stop_early: bool = False, recover: bool = False,
+                 first_line: int = 1, prior: Optional[List[Issue]] = None,
+                 record: bool = True) -> Dict[str, List[Issue]]:
+    """
+    Run rules over code whose first line is first_line; prior holds issues
+    other rules already found (for the duplicate check). Returns the issues
+    per rule name; with record=False the timings go to the returned dict's
+    "__spent__" and "__parse__" entries instead of the global stats.
+    """
+    found: Dict[str, List[Issue]] = {r.name: [] for r in rules}
+    spent: Dict[str, float] = dict.fromkeys(found, 0.0)
+    clock = time.thread_time
+
+    # Fused pass over the lines
+    line_rules = [r for r in rules if r.scope == "line"]
+    if line_rules:
+        states = {r.name: r.begin() for r in line_rules if r.begin}
+        checks = [(r.name, functools.partial(r.check, states[r.name]) if r.begin else r.check, found[r.name])
+                  for r in line_rules]
+        lines = code.splitlines()
+        for first in range(0, len(lines), LINE_BLOCK):
+            block = lines[first:first + LINE_BLOCK]
+            hit = False
+            for name, check, out in checks:
+                before = len(out)
+                started = clock()
+                for lineno, line in enumerate(block, start=first + first_line):
+                    result = check(lineno, line)
+                    if result:
+                        _collect(out, result)
+                spent[name] += clock() - started
+                hit = hit or len(out) > before
+            if hit and stop_early:
+                break
+        else:
+            for r in line_rules:
+                if r.finish:
+                    started = clock()
+                    _collect(found[r.name], r.finish(states[r.name]))
+                    spent[r.name] += clock() - started
+
+    ctx = None
+    if not (stop_early and any(found.values())):
+        ctx = RuleContext(code, recover and not stop_early, first_line)
+        doc_rules = [r for r in rules if r.scope != "line"]
+        if stop_early:
+            doc_rules.sort(key=lambda r: r.scope != "ast")
+        for r in doc_rules:
+            ctx.issues = (prior or []) + [issue for rule in rules for issue in found[rule.name]]
+            started = clock()
+            parse_before = ctx.parse_seconds
+            _collect(found[r.name], r.check(ctx))
+            spent[r.name] += clock() - started - (ctx.parse_seconds - parse_before)
+            if stop_early and found[r.name]:
+                break
+
+    parsed = ctx is not None and ctx._parsed is not None
+    if record:
+        _record(rules, spent, int(parsed), ctx.parse_seconds if parsed else 0.0)
+    else:
+        found["__spent__"] = spent
+        found["__parse__"] = (ctx.parsed[0] if parsed else None, ctx.parse_seconds if parsed else 0.0)
+    return found
+
+
+# ------------------------------------------------------------
+# Block-parallel checking of very large Python files
+# ------------------------------------------------------------
+
+# Python files with at least this many lines are checked in a process pool
+PARALLEL_MIN_LINES = int(os.getenv("SYNTAX_PARALLEL_MIN_LINES", 20000))
+# Worker processes for that (1 disables it)
+PARALLEL_WORKERS = int(os.getenv("SYNTAX_PARALLEL_WORKERS", os.cpu_count() or 1))
+# Blocks per worker (smaller blocks balance better, larger ones cost less IPC)
+BLOCKS_PER_WORKER = 4
+# Pool start method: the API, daemon, language server and Streamlit hosts
+# run threads, which fork() must not copy
+BLOCK_POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pools: Dict[int, Any] = {}
+_pools_lock = threading.Lock()
+
+
+def split_top_level(code: str, parts: int) -> List[Tuple[int, str]]:
+    """
+    Cut code into at most `parts` chunks of about equal line count, each
+    starting at a top-level statement (column 0, outside brackets, strings
+    and decorators, not an else/except continuation).
+
+    Returns:
+        (first line number, text) per chunk; the texts put together are code
+    """
+    lines = code.split("\n")
+    size = max(1, len(lines) // parts)
+    scanner = BracketScanner()
+    cuts = [0]
+    for i, line in enumerate(lines):
+        if (i >= cuts[-1] + size and len(cuts) < parts
+                and _starts_block(lines, i, (tuple(scanner.stack), scanner.string))):
+            cuts.append(i)
+        scanner.feed_line(i + 1, line)
+    cuts.append(len(lines))
+    chunks = []
+    first_line = 1
+    for a, b in zip(cuts, cuts[1:]):
+        text = "\n".join(lines[a:b]) + ("\n" if b < len(lines) else "")
+        chunks.append((first_line, text))
+        # Numbered the way the line rules number them (str.splitlines)
+        first_line += len(text.splitlines())
+    return chunks
+
+
+def _block_pool(workers: int):
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            context = multiprocessing.get_context(BLOCK_POOL_START_METHOD)
+            pool = _pools[workers] = ProcessPoolExecutor(workers, mp_context=context)
+        return pool
+
+
+@atexit.register
+def shutdown_block_pools() -> None:
+    """Stop the block-check worker processes (also run at interpreter exit)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _check_block(task: Tuple[str, int, List[str]]) -> Dict[str, Any]:
+    """Pool task: the block-local rules over one chunk, plus a parse of it."""
+    text, first_line, names = task
+    found = _apply_rules(text, [RULES[name] for name in names], first_line=first_line, record=False)
+    started = time.thread_time()
+    # After a statement, as in the file (a __future__ import is only valid first)
+    found["__parse__"] = (try_ast_parse(text if first_line == 1 else "pass\n" + text)[0],
+                          time.thread_time() - started)
+    return found
+
+
+def _run_blocks(code: str, rules: List[Rule], recover: bool, workers: int) -> Dict[str, List[Issue]]:
+    """
+    Block-parallel run_rules: the chunks from split_top_level go to the pool,
+    which runs the blockwise rules and parses each chunk; their issues are
+    concatenated in chunk order. Top-level statements parse independently,
+    so when every chunk parses the file parses, and the parse-based rules
+    have nothing to report. Otherwise those rules run here on the whole
+    file, so the result is the same as a serial run.
+
+    Workers import this module afresh, so rules registered from elsewhere
+    run here on the whole file.
+    """
+    chunks = split_top_level(code, workers * BLOCKS_PER_WORKER)
+    if len(chunks) < 2:
+        return _apply_rules(code, rules, recover=recover)
+    blockwise = [r for r in rules if r.blockwise and r.check.__module__ == __name__]
+    names = [r.name for r in blockwise]
+    found: Dict[str, List[Issue]] = {r.name: [] for r in rules}
+    spent: Dict[str, float] = dict.fromkeys(names, 0.0)
+    parses, parse_seconds, all_parsed = 0, 0.0, True
+    tasks = [(text, first_line, names) for first_line, text in chunks]
+    for result in _block_pool(workers).map(_check_block, tasks):
+        for name in names:
+            found[name] += result[name]
+            spent[name] += result["__spent__"][name]
+        ok, seconds = result["__parse__"]
+        all_parsed = all_parsed and ok
+        parses += 1
+        parse_seconds += seconds
+    _record(blockwise, spent, parses, parse_seconds)
+
+    local = [r for r in rules if r.blockwise and r not in blockwise]
+    if local:
+        found.update(_apply_rules(code, local))
+    rest = [r for r in rules if not r.blockwise]
+    if rest and not all_parsed:
+        prior = [issue for r in blockwise + local for issue in found[r.name]]
+        found.update(_apply_rules(code, rest, recover=recover, prior=prior))
+    elif rest:
+        _record(rest, {})
+    return found
+
+
+def _quotes_rule(ctx: RuleContext) -> List[Issue]:
+    # Whatever parses also tokenizes: only failed parses need the tokenizer
+    if ctx.parsed[0]:
+        return []
+    return detect_unclosed_quotes(ctx.code)
+
+
+def _indentation_rule(ctx: RuleContext) -> List[Issue]:
+    # compile() raises the parser's IndentationError, only under another filename
+    exc = ctx.parsed[1]
+    if not isinstance(exc, IndentationError):
+        return []
+    renamed = type(exc)(exc.msg, ("<string>", exc.lineno, exc.offset, exc.text, exc.end_lineno, exc.end_offset))
+    return [Issue(
+        "IndentationError",
+        str(renamed),
+        line=exc.lineno,
+        suggestion="Check indentation levels (use consistent tabs/spaces; prefer 4 spaces)."
+    )]
+
+
+def _brackets_rule(ctx: RuleContext) -> List[Issue]:
+    return detect_unmatched_brackets(ctx.code, first_line=ctx.first_line)
+
+
+def _syntax_rule(ctx: RuleContext) -> List[Issue]:
+    ok, exc = ctx.parsed
+    if ok or exc is None:
+        return []
+    errors = recover_syntax_errors(ctx.code, (ok, exc)) if ctx.recover else [exc]
     issues = []
-    issues += detect_unclosed_quotes(code)
-    issues += detect_unmatched_brackets(code)
-    issues += detect_missing_colon(code)
-    issues += detect_indentation_errors(code)
-
-    ok, exc = try_ast_parse(code)
-    if not ok and exc is not None:
-        sp = classify_syntax_error(exc)
+    for error in errors:
+        sp = Issue.from_dict(classify_syntax_error(error))
         # Avoid duplicates
-        if all(sp.get("message") != i.get("message") for i in issues):
+        if all(sp.message != i.message for i in ctx.issues + issues):
             issues.append(sp)
+    return issues
 
-    normalized = []
-    for it in issues:
-        normalized.append({
-            "type": it.get("type"),
-            "message": it.get("message"),
-            "line": it.get("line"),
-            "col": it.get("col"),
-            "snippet": it.get("snippet"),
-            "suggestion": it.get("suggestion")
-        })
 
-    def lineno_key(x):
-        return (x['line'] if x['line'] is not None else 9999)
+register_rule(Rule("unclosed_quotes", "token", _quotes_rule))
+register_rule(Rule("unmatched_brackets", "token", _brackets_rule, blockwise=True))
+register_rule(Rule("missing_colon", "line", check_colon_line, patterns={"keyword": COLON_KEYWORD_PATTERN}))
+register_rule(Rule("indentation", "ast", _indentation_rule))
+register_rule(Rule("syntax", "ast", _syntax_rule))
+register_rule(Rule("missing_semicolon", "line", check_semicolon_line, languages=("Java", "C", "C++"),
+                   patterns={"statement": SEMICOLON_STATEMENT_PATTERNS}))
+
+
+def detect_all(code: str, language: str = "Python", recover: bool = False,
+               workers: Optional[int] = None) -> List[Issue]:
+    """
+    Run all enabled rules for the language and return combined list of
+    issues; with recover, every independent syntax error instead of the first.
+    Very large Python files are checked block-parallel by `workers` processes.
+    """
+    issues = run_rules(code, language, recover=recover, workers=workers)
+
+    issues.sort(key=_BY_LINE)
+    return issues
+
+
+def first_issue(code: str, language: str = "Python") -> Optional[Issue]:
+    """
+    Pass/fail check: return the first issue found, running the cheapest
+    rules first, or None when detect_all(code) would find nothing.
+    """
+    issues = run_rules(code, language, stop_early=True)
+    if not issues:
+        return None
+    return min(issues, key=_BY_LINE)
+
+
+# ------------------------------------------------------------
+# Incremental checking (live editing)
+# ------------------------------------------------------------
+
+# Per-line state after a line: (open-bracket stack, open string or None)
+_EMPTY_STATE = ((), None)
+# A column-0 line that continues the previous statement, so no block starts there
+_CONTINUATION = re.compile(r"(?:else|elif|except|finally)\b|[)\]}]")
+
+
+def _starts_block(lines: List[str], i: int, state_before: tuple) -> bool:
+    """Does a top-level statement start at line i (column 0, no open bracket or string)?"""
+    line = lines[i]
+    if not line.strip() or line[0] in " \t#" or _CONTINUATION.match(line):
+        return False
+    if i == 0:
+        return True
+    if state_before != _EMPTY_STATE:
+        return False
+    prev = i - 1
+    while prev > 0 and not lines[prev].strip():
+        prev -= 1
+    prev_line = lines[prev].rstrip()
+    return not prev_line.startswith("@") and not prev_line.endswith("\\")
+
+
+class IncrementalChecker:
+    """
+    Per-document state for re-checking Python while it is edited
+
+    Keeps a line table with, for every line, the colon-rule result, the
+    bracket issues and a checkpoint of the bracket stack (and open string)
+    after the line. replace_lines() rescans the edited lines and then
+    only the following lines whose incoming bracket state changed, stopping
+    as soon as the state matches the old checkpoint again.
+
+    check() returns the same issue shape as detect_all(). When the local
+    checks already found an issue, no parse runs. Otherwise only the
+    top-level blocks edited since the last clean parse are parsed; a
+    whole-file parse runs only when there has been no clean parse yet.
+
+    Attributes:
+        last_scanned: lines rescanned by the last replace_lines()
+        last_parse: "region", "full" or None (no parse needed) for the last check()
+    """
+
+    def __init__(self, code: str = ""):
+        self.reset(code)
+
+    def reset(self, code: str) -> None:
+        self.lines: List[str] = []
+        self._ids: List[int] = []
+        self._colon: List[Optional[Issue]] = []
+        self._brackets: List[List[Issue]] = []
+        self._states: List[tuple] = []
+        self._next_id = 0
+        self._verified = False          # a clean parse happened and every edit since is in _dirty
+        self._dirty: Optional[Tuple[int, int]] = None  # lines edited since the last clean parse
+        self._changed = True            # edited since the last parse
+        self._parse_issue: Optional[Tuple[Optional[int], Exception]] = None
+        self.last_parse: Optional[str] = None
+        self.replace_lines(0, 0, code.split("\n"))  # marks everything dirty: the first check parses
+
+    # -- editing --------------------------------------------------
+
+    def replace_lines(self, start: int, end: int, new_lines: List[str]) -> None:
+        """Replace lines[start:end] (0-based) with new_lines and rescan what they affect."""
+        count = len(new_lines)
+        # Old incoming state of the first line after the edit
+        boundary = self._states[end - 1] if end else _EMPTY_STATE
+        ids = list(range(self._next_id, self._next_id + count))
+        self._next_id += count
+        self.lines[start:end] = new_lines
+        self._ids[start:end] = ids
+        self._colon[start:end] = [check_colon_line(line_id, line) for line_id, line in zip(ids, new_lines)]
+        self._brackets[start:end] = [[] for _ in new_lines]
+        self._states[start:end] = [_EMPTY_STATE] * count
+        self._rescan(start, start + count, boundary)
+        self._mark_dirty(start, end, count)
+        self._changed = True
+
+    def _rescan(self, start: int, stop: int, boundary: tuple) -> None:
+        state = self._states[start - 1] if start else _EMPTY_STATE
+        expected = boundary
+        scanner = BracketScanner()
+        i = start
+        while i < len(self.lines):
+            if i >= stop:
+                if state == expected:
+                    break  # downstream lines see the same state as before
+                expected = self._states[i]
+            scanner.stack = list(state[0])
+            scanner.string = state[1]
+            self._brackets[i] = scanner.feed_line(self._ids[i], self.lines[i])
+            state = (tuple(scanner.stack), scanner.string)
+            self._states[i] = state
+            i += 1
+        self.last_scanned = i - start
+
+    def _mark_dirty(self, start: int, end: int, count: int) -> None:
+        delta = count - (end - start)
+
+        def shift(i: int) -> int:
+            if i >= end:
+                return i + delta
+            return i if i <= start else start + count
+
+        if self._dirty is None:
+            self._dirty = (start, start + count)
+        else:
+            lo, hi = self._dirty
+            self._dirty = (min(shift(lo), start), max(shift(hi), start + count))
+
+    # -- checking -------------------------------------------------
+
+    def check(self) -> List[Issue]:
+        """Issues for the current text, sorted by line (same shape as detect_all)."""
+        issues = []
+        colons, brackets_on = rule_enabled("missing_colon"), rule_enabled("unmatched_brackets")
+        for index, (colon, brackets) in enumerate(zip(self._colon, self._brackets), start=1):
+            if colon and colons:
+                issues.append(colon.moved(index))
+            for issue in brackets if brackets_on else ():
+                issues.append(issue.moved(index))
+        if brackets_on and self._states and self._states[-1][0]:
+            # Unclosed openers: map their line ids back to line numbers
+            scanner = BracketScanner()
+            scanner.stack = [(ch, self._ids.index(line_id) + 1, col) for ch, line_id, col in self._states[-1][0]]
+            issues += scanner.finish()
+
+        if issues or not rule_enabled("syntax"):
+            self.last_parse = None  # decided locally
+        else:
+            parse_issue = self._parse()
+            if parse_issue:
+                issues.append(parse_issue)
+        return sorted(issues, key=lambda x: x.line or 0)
+
+    def _parse(self) -> Optional[Issue]:
+        if not self._changed:
+            self.last_parse = None
+            if self._parse_issue is None:
+                return None
+            line_id, exc = self._parse_issue
+            if line_id in self._ids:
+                # Edits may have moved the error: its message quotes line numbers too
+                shift_syntax_error(exc, self._ids.index(line_id) + 1 - exc.lineno)
+            return Issue.from_dict(classify_syntax_error(exc))
+        self._changed = False
+        if self._verified and self._dirty is not None:
+            # Everything outside the edited blocks parsed cleanly before
+            self.last_parse = "region"
+            first, last = self._block_bounds(*self._dirty)
+            ok, exc = try_ast_parse("\n".join(self.lines[first:last]) + "\n")
+            if ok:
+                self._dirty = None
+            elif isinstance(exc, SyntaxError) and exc.lineno:
+                shift_syntax_error(exc, first)
+        else:
+            self.last_parse = "full"
+            ok, exc = try_ast_parse("\n".join(self.lines) + "\n")
+            self._verified = ok
+            self._dirty = None
+        if ok or exc is None:
+            self._parse_issue = None
+            return None
+        issue = Issue.from_dict(classify_syntax_error(exc))
+        line = issue.line
+        line_id = self._ids[line - 1] if line and 0 < line <= len(self._ids) else None
+        self._parse_issue = (line_id, exc)
+        return issue
+
+    def _is_block_start(self, i: int) -> bool:
+        return _starts_block(self.lines, i, self._states[i - 1] if i else _EMPTY_STATE)
+
+    def _block_bounds(self, lo: int, hi: int) -> Tuple[int, int]:
+        """Line range of the top-level blocks covering lines lo..hi-1, plus one block on each side."""
+        # An edited line at a block boundary can end the previous block early
+        # (a dedented body line) or leave a header whose body is missing, and
+        # CPython reports those errors on the neighbouring block
+        first = max(min(lo, len(self.lines) - 1) - 1, 0)
+        while first > 0 and not self._is_block_start(first):
+            first -= 1
+        last = max(hi, first + 1)
+        while last < len(self.lines) and not self._is_block_start(last):
+            last += 1
+        if last < len(self.lines):
+            last += 1
+            while last < len(self.lines) and not self._is_block_start(last):
+                last += 1
+        return first, last
+
+
+# ------------------------------------------------------------
+# Multi-error recovery
+# ------------------------------------------------------------
+
+# Stop recovering after this many syntax errors
+MAX_RECOVERED_ERRORS = int(os.getenv("SYNTAX_MAX_RECOVERED_ERRORS", 50))
+# Lines parsed at a time after the first error
+RECOVERY_WINDOW = 200
+# Line breaks as the Python tokenizer counts them
+_PARSER_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+# Errors the tokenizer raises; CPython reports them before parser errors
+# that come earlier in the text
+_TOKENIZER_ERROR = re.compile(
+    r"unterminated|was never closed|^unmatched|does not match|invalid character|"
+    r"invalid non-printable|unexpected character after line continuation|"
+    r"inconsistent use of tabs|unindent|too many nested|invalid .*literal|unexpected EOF"
+)
+
+
+def recover_syntax_errors(code: str, first: Optional[Tuple[bool, Any]] = None,
+                          max_errors: int = MAX_RECOVERED_ERRORS) -> List[Exception]:
+    """
+    Every independent syntax error instead of only the first
+
+    After an error the parser resynchronizes at the next top-level
+    statement (a dedent to column 0 outside brackets and strings) after the
+    error line. The rest of the file is then parsed in windows of about
+    RECOVERY_WINDOW lines that end at top-level statements, so clean code
+    is parsed once and only the window holding the next error is parsed
+    again by CPython's error pass; the total stays close to one full parse.
+    An error that leaves a bracket or string open to the end of the file
+    ends the recovery.
+
+    CPython reports tokenizer errors (an unclosed string or bracket) ahead
+    of parser errors earlier in the text, so for those the lines before the
+    statement holding the error are parsed again as well.
+
+    Args:
+        code: Python source
+        first: try_ast_parse(code) when the caller already has it
+        max_errors: stop after this many errors
+
+    Returns:
+        The exceptions in file order, line numbers relative to the whole file
+    """
+    ok, exc = first if first is not None else try_ast_parse(code)
+    if ok or exc is None:
+        return []
+    lines = _PARSER_LINE_BREAK.split(code)
+    scanner = BracketScanner()
+    starts: List[int] = []  # top-level statement lines found so far
+    scanned = 0             # lines[:scanned] are fed to the scanner
+    errors: List[Exception] = []
+
+    def next_start(index: int) -> Optional[int]:
+        """First top-level statement line at or after index."""
+        nonlocal scanned
+        while scanned < len(lines) and (not starts or starts[-1] < index):
+            if _starts_block(lines, scanned, (tuple(scanner.stack), scanner.string)):
+                starts.append(scanned)
+            scanner.feed_line(scanned + 1, lines[scanned])
+            scanned += 1
+        k = bisect.bisect_left(starts, index)
+        return starts[k] if k < len(starts) else None
+
+    def statement_start(index: int) -> int:
+        """Last top-level statement line at or before index."""
+        next_start(index + 1)
+        k = bisect.bisect_right(starts, index)
+        return starts[k - 1] if k else 0
+
+    def recover(start: int, stop: int, exc: Exception) -> None:
+        """Collect the errors of lines[start:stop], exc being the first error parsing from start."""
+        while len(errors) < max_errors:
+            if not isinstance(exc, SyntaxError) or not exc.lineno:
+                errors.append(exc)
+                return
+            shift_syntax_error(exc, start)
+            if _TOKENIZER_ERROR.search(exc.msg or ""):
+                before = statement_start(exc.lineno - 1)
+                if before > start:
+                    ok, earlier = try_ast_parse("\n".join(lines[start:before]))
+                    if not ok and earlier is not None:
+                        recover(start, before, earlier)
+            if len(errors) >= max_errors:
+                return
+            errors.append(exc)
+            # Resynchronize after the error line
+            start = next_start(exc.lineno)
+            while start is not None and start < stop:
+                end = next_start(start + RECOVERY_WINDOW)
+                end = stop if end is None or end > stop else end
+                ok, exc = try_ast_parse("\n".join(lines[start:end]))
+                if not ok:
+                    break
+                start = end
+            else:
+                return
+            if exc is None:
+                return
 
-    return sorted(normalized, key=lineno_key)
+    recover(0, len(lines), exc)
+    return errors
@@ -0,0 +1,212 @@
+"""
+File Watcher Module
+Reports which source files changed under the watched paths, debouncing
+bursts of saves. Uses watchdog (inotify/FSEvents/ReadDirectoryChangesW)
+when installed and falls back to mtime polling otherwise.
+"""
+
+import fnmatch
+import os
+import queue
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from .file_discovery import _wanted, discover_files, is_candidate
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - optional dependency
+    Observer = None
+    FileSystemEventHandler = object
+
+POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", 0.5))
+DEBOUNCE_SECONDS = float(os.getenv("WATCH_DEBOUNCE", 0.3))
+# Polling re-walks the tree at least this often to catch files created in
+# directories that held no source files yet
+RESCAN_SECONDS = float(os.getenv("WATCH_RESCAN_SECONDS", 10.0))
+
+
+def _display(abs_path: str) -> str:
+    rel = os.path.relpath(abs_path)
+    return abs_path if rel.startswith("..") else rel
+
+
+def _stat(abs_path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(abs_path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, events: "queue.Queue"):
+        super().__init__()
+        self.events = events
+
+    def on_any_event(self, event):
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        self.events.put((event.src_path, event.is_directory))
+        dest = getattr(event, "dest_path", None)
+        if dest:
+            self.events.put((dest, event.is_directory))
+
+
+class FileWatcher:
+    """
+    Watch files, directories and globs for changes
+
+    wait() blocks until at least one source file was added, modified or
+    removed and no further change arrived for DEBOUNCE_SECONDS, then
+    returns (changed, removed) paths. Files whose mtime and size did not
+    change are never reported, so editor noise is filtered out.
+    """
+
+    def __init__(self, paths: List[str], include=None, exclude=None, use_gitignore: bool = True,
+                 interval: float = POLL_INTERVAL, debounce: float = DEBOUNCE_SECONDS,
+                 use_watchdog: bool = True):
+        self.paths = list(paths)
+        self.include = include
+        self.exclude = exclude
+        self.use_gitignore = use_gitignore
+        self.interval = interval
+        self.debounce = debounce
+        self.known: Dict[str, Tuple[int, int]] = {}
+        self._rescanned = time.monotonic()
+        self._dir_mtimes: Dict[str, int] = {}
+        self._events: "queue.Queue" = queue.Queue()
+        self._observer = None
+
+        for path in self._discover():
+            self.known[path] = _stat(path)
+        self._remember_dirs()
+
+        if use_watchdog and Observer is not None:
+            self._observer = Observer()
+            handler = _EventHandler(self._events)
+            for arg in self.paths:
+                if os.path.isdir(arg):
+                    self._observer.schedule(handler, arg, recursive=True)
+                elif os.path.isfile(arg):
+                    self._observer.schedule(handler, os.path.dirname(os.path.abspath(arg)), recursive=False)
+            self._observer.start()
+
+    @property
+    def backend(self) -> str:
+        return "watchdog" if self._observer is not None else "polling"
+
+    def files(self) -> List[str]:
+        return sorted(_display(p) for p in self.known)
+
+    def close(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+
+    # -- discovery --------------------------------------------------
+
+    def _discover(self) -> Set[str]:
+        return {os.path.abspath(p) for p in discover_files(
+            self.paths, include=self.include, exclude=self.exclude, use_gitignore=self.use_gitignore)}
+
+    def _accepts(self, abs_path: str) -> bool:
+        for arg in self.paths:
+            if os.path.isdir(arg):
+                if is_candidate(abs_path, arg, self.include, self.exclude, self.use_gitignore):
+                    return True
+            elif os.path.isfile(arg):
+                if os.path.abspath(arg) == abs_path:
+                    return True
+            elif fnmatch.fnmatch(abs_path, os.path.abspath(arg)) and os.path.isfile(abs_path):
+                if _wanted(abs_path.replace(os.sep, "/"), self.include, self.exclude):
+                    return True
+        return False
+
+    def _remember_dirs(self) -> None:
+        dirs = {os.path.dirname(p) for p in self.known}
+        dirs.update(os.path.abspath(a) for a in self.paths if os.path.isdir(a))
+        self._dir_mtimes = {d: (_stat(d) or (0, 0))[0] for d in dirs}
+
+    def _diff(self, candidates: Set[str], full: bool) -> Tuple[Set[str], Set[str]]:
+        """Compare candidates against known stats; a full scan also detects removals."""
+        changed, removed = set(), set()
+        for path in candidates:
+            stat = _stat(path)
+            if stat is None:
+                if path in self.known:
+                    removed.add(path)
+            elif self.known.get(path) != stat:
+                changed.add(path)
+            self._update(path, stat)
+        if full:
+            for path in set(self.known) - candidates:
+                removed.add(path)
+                self._update(path, None)
+        return changed, removed
+
+    def _update(self, path: str, stat) -> None:
+        if stat is None:
+            self.known.pop(path, None)
+        else:
+            self.known[path] = stat
+
+    # -- backends ---------------------------------------------------
+
+    def _poll(self) -> Tuple[Set[str], Set[str]]:
+        time.sleep(self.interval)
+        dirs_changed = any((_stat(d) or (0, 0))[0] != m for d, m in self._dir_mtimes.items())
+        if dirs_changed or time.monotonic() - self._rescanned >= RESCAN_SECONDS:
+            self._rescanned = time.monotonic()
+            result = self._diff(self._discover(), full=True)
+            self._remember_dirs()
+            return result
+        return self._diff(set(self.known), full=False)
+
+    def _drain_events(self) -> Tuple[Set[str], Set[str]]:
+        touched, rescan = set(), False
+        try:
+            item = self._events.get(timeout=self.interval)
+            while True:
+                path, is_dir = item
+                if is_dir:
+                    rescan = True
+                else:
+                    touched.add(os.path.abspath(path))
+                item = self._events.get_nowait()
+        except queue.Empty:
+            pass
+        if rescan:
+            return self._diff(self._discover(), full=True)
+        candidates = {p for p in touched if p in self.known or self._accepts(p)}
+        return self._diff(candidates, full=False)
+
+    # -- public -----------------------------------------------------
+
+    def poll_once(self) -> Tuple[Set[str], Set[str]]:
+        """One backend step: (changed, removed) absolute paths, not debounced."""
+        return self._drain_events() if self._observer is not None else self._poll()
+
+    def wait(self, timeout: Optional[float] = None) -> Tuple[List[str], List[str]]:
+        """
+        Block until a debounced batch of changes is available
+
+        Returns (changed, removed) display paths; both empty on timeout.
+        """
+        changed: Set[str] = set()
+        removed: Set[str] = set()
+        started = time.monotonic()
+        last_change = None
+        while True:
+            c, r = self.poll_once()
+            if c or r:
+                changed = (changed - r) | c
+                removed = (removed - c) | r
+                last_change = time.monotonic()
+            now = time.monotonic()
+            if last_change is not None and now - last_change >= self.debounce:
+                break
+            if last_change is None and timeout is not None and now - started >= timeout:
+                break
+        return sorted(_display(p) for p in changed), sorted(_display(p) for p in removed)
@@ -5,6 +5,81 @@ Start script for the Multi-Language Syntax Error Detection REST API
 import uvicorn
 import os
 import sys
+import time
+
+
+def run_preforked(config):
+    """
+    Warm up once in this process, then fork workers sharing the listening socket
+
+    Models, compiled regexes and explanation tables are loaded before fork(),
+    so workers share those pages copy-on-write instead of each loading its
+    own copy. gc.freeze() moves the warm objects out of the collector's reach
+    so worker GC passes do not touch (and un-share) them. Dead workers are
+    restarted; SIGINT/SIGTERM stop all workers.
+    """
+    import gc
+    import signal
+    import socket
+
+    start = time.perf_counter()
+    import api
+    from src.warmup import warmup
+    timings = warmup()
+    print(f"🔥 Warmup finished in {time.perf_counter() - start:.2f}s "
+          f"(imports {timings['imports']:.2f}s, pipeline {timings['pipeline']:.2f}s)")
+
+    gc.collect()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((config["host"], config["port"]))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    children = set()
+    stopping = False
+
+    def spawn_worker():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            server = uvicorn.Server(uvicorn.Config(api.app, log_level=config["log_level"]))
+            server.run(sockets=[sock])
+            os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(config["workers"]):
+        spawn_worker()
+    print(f"👷 Started {config['workers']} preloaded workers (parent pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"⚠️ Worker {pid} exited (status {status}), restarting")
+            spawn_worker()
+
+    sock.close()
+    print("\n\n✅ API server stopped")
+
 
 def main():
     """Start the API server"""
@@ -22,8 +97,8 @@ def main():
     # Configuration
     config = {
         "app": "api:app",
-        "host": "0.0.0.0",
-        "port": 8000,
+        "host": os.getenv("API_HOST", "0.0.0.0"),
+        "port": int(os.getenv("API_PORT", 8000)),
         "reload": True,  # Auto-reload on code changes
         "log_level": "info",
     }
@@ -31,7 +106,15 @@ def main():
     # Check if running in production
     if os.getenv("PRODUCTION", "false").lower() == "true":
         config["reload"] = False
-        config["workers"] = 4
+        config["workers"] = int(os.getenv("API_WORKERS", 4))
+
+        # Preload (default): warm up once, fork copy-on-write workers
+        if os.getenv("PRELOAD", "true").lower() == "true" and hasattr(os, "fork"):
+            print("🏭 Running in PRODUCTION mode (preloaded workers)")
+            print()
+            run_preforked(config)
+            return
+
         print("🏭 Running in PRODUCTION mode")
     else:
         print("🔧 Running in DEVELOPMENT mode (auto-reload enabled)")
@@ -0,0 +1,346 @@
+"""
+Unit Tests for the REST API
+"""
+import gzip
+import json
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+import api
+from src.api_codec import negotiate_encoding, dumps
+
+client = TestClient(api.app)
+
+LARGE_CODE = "\n".join(f"def f{i}()\n    pass" for i in range(200))
+
+
+class TestCompression(unittest.TestCase):
+    def test_negotiate_encoding(self):
+        self.assertEqual(negotiate_encoding("gzip, deflate"), "gzip")
+        self.assertIsNone(negotiate_encoding("gzip;q=0, br"))
+        self.assertIsNone(negotiate_encoding(""))
+        self.assertIn(negotiate_encoding("*"), ("zstd", "gzip"))
+
+    def test_dumps_is_compact(self):
+        self.assertEqual(dumps({"a": [1, 2]}), b'{"a":[1,2]}')
+
+    def test_gzip_response(self):
+        response = client.post(
+            "/check",
+            json={"code": LARGE_CODE, "filename": "test.py"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.json()["predicted_error"], "MissingColon")
+
+    def test_small_response_not_compressed(self):
+        response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", response.headers)
+
+    def test_gzip_request_body(self):
+        body = gzip.compress(json.dumps({"code": "x = 1", "filename": "test.py"}).encode())
+        response = client.post(
+            "/check",
+            content=body,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["has_errors"])
+
+    def test_invalid_request_encoding(self):
+        response = client.post(
+            "/check",
+            content=b"not gzip",
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_compression_bomb_is_stopped_early(self):
+        import tracemalloc
+        from src.api_codec import MAX_DECOMPRESSED_BYTES
+        # ~100 KB on the wire, 100 MB once expanded
+        bomb = gzip.compress(b" " * (100 * 1024 * 1024), compresslevel=9)
+        # Compressed bodies are charged as expanded: a client of its own keeps
+        # the drained token bucket from throttling the other tests
+        bomb_client = TestClient(api.app, client=("bomb-sender", 50000))
+        tracemalloc.start()
+        try:
+            response = bomb_client.post(
+                "/check",
+                content=bomb,
+                headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            )
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(response.status_code, 413)
+        self.assertLess(peak, 3 * MAX_DECOMPRESSED_BYTES)
+
+    def test_truncated_request_body(self):
+        body = gzip.compress(json.dumps({"code": "x = 1", "filename": "test.py"}).encode())
+        response = client.post(
+            "/check",
+            content=body[:-12],
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Truncated", response.json()["detail"])
+
+
+class TestZstdRequestBodies(unittest.TestCase):
+    def test_frame_end_found_from_headers(self):
+        from src.api_codec import _ZstdFrames
+        data = b"x = 1\n"
+        # Single-segment frame, 1-byte content size, one raw last block, checksum
+        block = (len(data) << 3 | 0 << 1 | 1).to_bytes(3, "little")
+        frame = b"\x28\xb5\x2f\xfd" + bytes([0x24, len(data)]) + block + data + b"\0\0\0\0"
+        skippable = b"\x5a\x2a\x4d\x18" + (3).to_bytes(4, "little") + b"abc"
+        stream = frame + skippable + frame
+        for cut in range(len(stream) + 1):
+            frames = _ZstdFrames()
+            for byte in range(cut):
+                frames.feed(stream[byte:byte + 1])
+            self.assertEqual(frames.eof, cut in (len(frame), len(frame) + len(skippable), len(stream)), cut)
+
+    def test_bomb_and_truncation(self):
+        from src import api_codec
+        if api_codec.zstandard is None:
+            self.skipTest("zstandard not installed")
+        limit = api_codec.MAX_DECOMPRESSED_BYTES
+        bomb = api_codec.zstandard.ZstdCompressor(level=19).compress(b" " * (10 * limit))
+        decoder = api_codec._StreamDecompressor("zstd", limit)
+        with self.assertRaises(OverflowError):
+            decoder.feed(bomb)
+        self.assertLessEqual(decoder.total, limit + decoder.ZSTD_CHUNK)
+        body = api_codec.zstandard.ZstdCompressor().compress(json.dumps({"code": "x = 1"}).encode())
+        response = client.post("/check", content=body[:-3],
+                               headers={"Content-Type": "application/json", "Content-Encoding": "zstd"})
+        self.assertEqual(response.status_code, 400)
+        response = client.post("/check", content=body,
+                               headers={"Content-Type": "application/json", "Content-Encoding": "zstd"})
+        self.assertEqual(response.status_code, 200)
+
+
+class TestReadiness(unittest.TestCase):
+    def test_ready_after_warmup(self):
+        from src.warmup import warmup
+        timings = warmup()
+        self.assertIn("pipeline", timings)
+        response = client.get("/ready")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "ready")
+
+
+class TestStreamingUpload(unittest.TestCase):
+    def test_raw_stream(self):
+        code = "\n".join("def f%d():\n    return (%d" % (i, i) for i in range(50))
+        response = client.post("/check/stream?filename=big.py", content=code.encode())
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result["language"], "Python")
+        self.assertEqual(result["total_lines"], 100)
+        self.assertEqual(result["total_issues"], 50)
+        self.assertEqual(result["predicted_error"], "UnmatchedBracket")
+
+    def test_multipart_upload(self):
+        response = client.post(
+            "/check/stream",
+            files={"file": ("Main.java", b"int main() {\n  int x = 1\n  return 0;\n}\n")},
+        )
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result["language"], "Java")
+        self.assertEqual(result["issues"][0]["line"], 2)
+
+    def test_multipart_is_streamed(self):
+        from unittest import mock
+        from starlette.requests import Request
+        code = b"".join(b"def f%d():\n    return (%d\n" % (i, i) for i in range(500))
+        boundary = b"xyzzy"
+        body = (b"--xyzzy\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nhello\r\n"
+                b"--xyzzy\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.py\"\r\n"
+                b"Content-Type: text/x-python\r\n\r\n" + code + b"\r\n--xyzzy--\r\n")
+
+        async def chunked(self):
+            for start in range(0, len(body), 1024):
+                yield body[start:start + 1024]
+
+        # The form is never spooled; the checker sees the file as it arrives
+        with mock.patch.object(Request, "stream", chunked), \
+                mock.patch.object(Request, "form", side_effect=AssertionError("spooled")), \
+                mock.patch("api.StreamingChecker.feed", autospec=True,
+                           side_effect=api.StreamingChecker.feed) as feed:
+            response = client.post("/check/stream", content=body,
+                                    headers={"Content-Type": "multipart/form-data; boundary=" + boundary.decode()})
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual((result["language"], result["total_lines"], result["total_issues"]), ("Python", 1000, 500))
+        self.assertEqual(result["total_bytes"], len(code))
+        self.assertGreater(feed.call_count, 10)
+
+    def test_oversized_upload_rejected_before_reading(self):
+        from unittest import mock
+        with mock.patch.object(api, "MAX_STREAM_BYTES", 1000):
+            response = client.post("/check/stream", files={"file": ("a.py", b"x = 1\n" * 500)})
+        self.assertEqual(response.status_code, 413)
+
+    def test_gzip_stream(self):
+        body = gzip.compress(b"if x\n    pass\n")
+        response = client.post(
+            "/check/stream?filename=a.py",
+            content=body,
+            headers={"Content-Encoding": "gzip"},
+        )
+        self.assertEqual(response.json()["predicted_error"], "MissingColon")
+
+    def test_empty_stream(self):
+        response = client.post("/check/stream", content=b"")
+        self.assertEqual(response.status_code, 400)
+
+
+class TestCheck(unittest.TestCase):
+    def test_response_matches_documented_model(self):
+        from unittest import mock
+        with mock.patch.object(api.ErrorResponse, "model_validate", side_effect=AssertionError("validated")):
+            response = client.post("/check", json={"code": "if x\n    pass\n", "filename": "a.py", "recover": True})
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(set(result), set(api.ErrorResponse.model_fields))
+        self.assertEqual(api.ErrorResponse(**result).predicted_error, "MissingColon")
+        self.assertEqual(result["rule_based_issues"][0]["line"], 1)
+
+
+class TestAllErrors(unittest.TestCase):
+    CODE = "if x\n    pass\nwhile y\n    pass\nif z\n    pass\n"
+
+    def test_columnar_format(self):
+        body = {"code": self.CODE, "filename": "a.py"}
+        full = client.post("/check-all", json=body).json()
+        response = client.post("/check-all?format=columnar", json=body)
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result["format"], "columnar")
+        self.assertNotIn("errors_by_type", result)
+        self.assertEqual(result["types"], ["MissingColon"])
+        self.assertEqual(result["issues"]["line"], [i["line"] for i in full["rule_based_issues"]])
+        self.assertEqual(set(result["issues"]["line"]), {1, 3, 5})
+        self.assertEqual(result["total_errors"], full["total_errors"])
+
+    def test_unknown_format(self):
+        response = client.post("/check-all?format=xml", json={"code": self.CODE})
+        self.assertEqual(response.status_code, 422)
+
+
+class TestScanJobUpload(unittest.TestCase):
+    def test_failed_upload_leaves_no_archive(self):
+        import tempfile
+        from unittest import mock
+        from src.scan_jobs import JobManager, JobStore
+        with tempfile.TemporaryDirectory() as root:
+            store = JobStore(os.path.join(root, "jobs.sqlite3"))
+            manager = JobManager(store, jobs_dir=root, workers=1)
+            try:
+                with mock.patch.object(api, "get_job_manager", return_value=manager), \
+                        mock.patch.object(api, "_is_archive", side_effect=OSError("disk gone")):
+                    with self.assertRaises(OSError):
+                        client.post("/jobs?filename=p.zip", content=b"PK\x03\x04 not really")
+                self.assertEqual([name for name in os.listdir(root) if name.endswith(".archive")], [])
+            finally:
+                store.close()
+
+
+class TestDiffCheck(unittest.TestCase):
+    BASE = "def run():\n    return 1\n"
+
+    def test_check_diff(self):
+        diff = "--- a/app.py\n+++ b/app.py\n@@ -1,2 +1,2 @@\n-def run():\n+def run()\n     return 1\n"
+        response = client.post("/check-diff", json={"diff": diff, "base_files": {"app.py": self.BASE}})
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertTrue(result["has_errors"])
+        self.assertEqual(result["files"][0]["issues"][0]["line"], 1)
+
+    def test_new_file_needs_no_base(self):
+        diff = "--- /dev/null\n+++ b/new.py\n@@ -0,0 +1,2 @@\n+def run():\n+    return 1\n"
+        response = client.post("/check-diff", json={"diff": diff})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["has_errors"])
+
+    def test_bad_base_is_rejected(self):
+        diff = "--- a/app.py\n+++ b/app.py\n@@ -1,1 +1,1 @@\n-other\n+changed\n"
+        response = client.post("/check-diff", json={"diff": diff, "base_files": {"app.py": self.BASE}})
+        self.assertEqual(response.status_code, 400)
+        response = client.post("/check-diff", json={"diff": diff})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestAdmissionControl(unittest.TestCase):
+    def setUp(self):
+        from src.admission import AdmissionController
+        self.now = 0.0
+        self.controller = AdmissionController(
+            rate=1.0, burst=10.0, max_inflight=10.0, bulk_share=0.5,
+            interactive_wait=0.05, clock=lambda: self.now
+        )
+
+    def run_async(self, coro):
+        import asyncio
+        return asyncio.run(coro)
+
+    def test_cost_scales_with_payload(self):
+        from src.admission import AdmissionController
+        small = AdmissionController.estimate_cost("/check", 100)
+        large = AdmissionController.estimate_cost("/check", 100 * 1024)
+        self.assertLess(small, 1.1)
+        self.assertGreater(large, small * 5)
+
+    def test_compressed_body_charged_as_expanded(self):
+        from src.admission import AdmissionController, COMPRESSION_RATIO
+        from src.api_codec import MAX_DECOMPRESSED_BYTES
+        plain = AdmissionController.estimate_cost("/check", 10 * 1024)
+        self.assertEqual(AdmissionController.estimate_cost("/check", 10 * 1024, "identity"), plain)
+        packed = AdmissionController.estimate_cost("/check", 10 * 1024, "gzip")
+        self.assertAlmostEqual(packed - 1.0, (plain - 1.0) * COMPRESSION_RATIO)
+        capped = AdmissionController.estimate_cost("/check", MAX_DECOMPRESSED_BYTES, "gzip")
+        self.assertEqual(capped, AdmissionController.estimate_cost("/check", MAX_DECOMPRESSED_BYTES))
+
+    def test_bucket_exhaustion_and_refill(self):
+        from src.admission import AdmissionRejected, INTERACTIVE
+        self.controller.charge("c1", INTERACTIVE, 8)
+        with self.assertRaises(AdmissionRejected) as ctx:
+            self.controller.charge("c1", INTERACTIVE, 8)
+        self.assertEqual(ctx.exception.status, 429)
+        self.assertAlmostEqual(ctx.exception.retry_after, 6.0)
+        self.now += 6.0
+        self.controller.charge("c1", INTERACTIVE, 8)
+        # Other clients and lanes have their own buckets
+        self.controller.charge("c2", INTERACTIVE, 8)
+
+    def test_bulk_shed_before_interactive(self):
+        from src.admission import AdmissionRejected, INTERACTIVE, BULK
+        held = self.run_async(self.controller.acquire("c1", INTERACTIVE, 4))
+        with self.assertRaises(AdmissionRejected) as ctx:
+            self.run_async(self.controller.acquire("c2", BULK, 2))
+        self.assertEqual(ctx.exception.status, 503)
+        # Interactive still fits under the full in-flight cap
+        self.run_async(self.controller.acquire("c3", INTERACTIVE, 4))
+        self.run_async(self.controller.release(held))
+
+    def test_lane_classification(self):
+        from src.admission import AdmissionController, BULK, INTERACTIVE
+        self.assertEqual(AdmissionController.classify("/check", None), BULK)
+        self.assertEqual(AdmissionController.classify("/check", None, browser=True), INTERACTIVE)
+        self.assertEqual(AdmissionController.classify("/check", "interactive"), INTERACTIVE)
+        self.assertEqual(AdmissionController.classify("/check", "bulk", browser=True), BULK)
+        self.assertEqual(AdmissionController.classify("/jobs", "interactive"), BULK)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,429 @@
+"""
+Unit Tests for multi-file CLI scanning
+"""
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+import xml.etree.ElementTree as ET
+from contextlib import redirect_stdout
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.file_discovery import changed_files, discover_files, staged_files
+from src.batch_checker import analyze_report, run_batch
+from src.syntax_checker import detect_all, first_issue
+from src.result_cache import ResultCache
+from src.report_writers import get_writer
+from src.daemon import CheckerDaemon, DaemonClient, DaemonUnavailable
+from src.watcher import FileWatcher
+from src.ingest import SourceFile, is_binary, open_source, sniff_encoding
+from src.batch_checker import analyze_bytes, analyze_source
+from src.diff_checker import DiffApplyError, check_diff, parse_unified_diff
+import cli
+
+
+def write(root, rel, content="x = 1\n"):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        fh.write(content)
+    return path
+
+
+class TestFileDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for rel in ["a.py", "pkg/b.py", "pkg/Main.java", "pkg/notes.txt", "build/out.py",
+                    "pkg/gen/keep.py", "pkg/gen/drop.py", "vendor/lib.c", "sub/build/deep.py"]:
+            write(self.root, rel)
+        write(self.root, ".gitignore", "/build/\n**/gen/*\n!**/gen/keep.py\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def rel(self, paths):
+        return sorted(os.path.relpath(p, self.root).replace(os.sep, "/") for p in paths)
+
+    def test_gitignore_anchored_and_negated(self):
+        found = self.rel(discover_files([self.root]))
+        self.assertEqual(found, ["a.py", "pkg/Main.java", "pkg/b.py", "pkg/gen/keep.py",
+                                 "sub/build/deep.py", "vendor/lib.c"])
+
+    def test_nested_gitignore(self):
+        write(self.root, "pkg/.gitignore", "*.java\n")
+        self.assertNotIn("pkg/Main.java", self.rel(discover_files([self.root])))
+
+    def test_no_gitignore(self):
+        found = self.rel(discover_files([self.root], use_gitignore=False))
+        self.assertIn("build/out.py", found)
+        self.assertIn("pkg/gen/drop.py", found)
+
+    def test_include_exclude(self):
+        found = self.rel(discover_files([self.root], include=["*.py"], exclude=["vendor", "sub"]))
+        self.assertEqual(found, ["a.py", "pkg/b.py", "pkg/gen/keep.py"])
+
+    def test_globs_files_and_dedup(self):
+        a = os.path.join(self.root, "a.py")
+        found = list(discover_files([a, os.path.join(self.root, "*.py"), self.root]))
+        self.assertEqual(len(found), len(set(map(os.path.abspath, found))))
+        self.assertEqual(found[0], a)
+
+
+class TestBatchChecker(unittest.TestCase):
+    def test_parallel_matches_inline(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = [write(root, f"ok{i}.py") for i in range(6)]
+            paths.append(write(root, "bad.py", "if x > 1\n    print(x)\n"))
+            paths.append(write(root, "Bad.java", "class A {\n    int x = 1\n}\n"))
+
+            inline, inline_summary = run_batch(paths, workers=1)
+            pooled, summary = run_batch(paths, workers=2)
+
+        self.assertEqual([(r["path"], r["predicted_error"]) for r in inline],
+                         [(r["path"], r["predicted_error"]) for r in pooled])
+        self.assertEqual(summary["files"], 8)
+        self.assertEqual(summary["files_with_errors"], 2)
+        self.assertEqual(summary["by_language"]["Java"], {"files": 1, "errors": 1})
+        self.assertEqual(inline_summary["files_with_errors"], 2)
+
+
+class TestProfiles(unittest.TestCase):
+    CODES = ["def f(x)\n    return x\n", "x = (1,\n", "def f():\n  x = 1\n    y = 2\n",
+             "s = 'abc\n", "def f():\n    return 1\n"]
+
+    def test_first_issue_matches_detect_all(self):
+        for code in self.CODES:
+            self.assertEqual(first_issue(code) is not None, bool(detect_all(code)), code)
+
+    def test_profile_stages(self):
+        code = self.CODES[0]
+        verdict = analyze_report(code, "a.py", profile="verdict")
+        full = analyze_report(code, "a.py", profile="full")
+        self.assertEqual(len(verdict["detection"]["rule_based_issues"]), 1)
+        self.assertIsNone(verdict["fix"])
+        self.assertIsNone(verdict["quality"])
+        self.assertTrue(full["fix"]["success"])
+        self.assertIsNotNone(full["quality"])
+
+    def test_budget_skips_remaining_stages(self):
+        report = analyze_report(self.CODES[0], "a.py", profile="full", budget=0)
+        self.assertEqual(report["skipped_stages"], ["fix", "quality"])
+        self.assertEqual(report["detection"]["predicted_error"], "MissingColon")
+
+    def test_fail_fast(self):
+        with tempfile.TemporaryDirectory() as root:
+            for i in range(5):
+                write(root, f"bad{i}.py", "if x\n    pass\n")
+            out = io.StringIO()
+            with redirect_stdout(out), self.assertRaises(SystemExit) as ctx:
+                cli.main([root, "--fail-fast", "--profile", "verdict", "--format", "jsonl",
+                          "--no-cache", "-j", "1"])
+            records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(ctx.exception.code, cli.EXIT_ERRORS_FOUND)
+        self.assertEqual(records[-1]["files"], 1)
+        self.assertTrue(records[-1]["stopped_early"])
+
+    def test_all_errors_columnar(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = write(root, "a.py", "if x\n    pass\nwhile y\n    pass\n")
+            out = io.StringIO()
+            with redirect_stdout(out), self.assertRaises(SystemExit) as ctx:
+                cli.main([path, "--all-errors", "columnar"])
+        self.assertEqual(ctx.exception.code, cli.EXIT_ERRORS_FOUND)
+        record = json.loads(out.getvalue())
+        self.assertEqual((record["path"], record["format"]), (path, "columnar"))
+        self.assertEqual(record["types"], ["MissingColon"])
+        self.assertEqual(set(record["issues"]["line"]), {1, 3})
+
+
+class TestResultCache(unittest.TestCase):
+    def test_rerun_only_analyzes_changed_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = [write(root, f"m{i}.py", f"x = {i}\n") for i in range(4)]
+            cache_dir = os.path.join(root, ".cache")
+
+            _, first = run_batch(paths, workers=1, cache=ResultCache(cache_dir, version="t"))
+            self.assertEqual(first["analyzed"], 4)
+
+            write(root, "m0.py", "if x\n    pass\n")
+            cache = ResultCache(cache_dir, version="t")
+            results, second = run_batch(paths, workers=1, cache=cache)
+            self.assertEqual(second["analyzed"], 1)
+            self.assertEqual(second["files_with_errors"], 1)
+            self.assertEqual(results[1]["predicted_error"], "NoError")
+
+            # A new tool/model version starts from an empty cache
+            _, third = run_batch(paths, workers=1, cache=ResultCache(cache_dir, version="u"))
+            self.assertEqual(third["analyzed"], 4)
+
+    def test_changed_since(self):
+        with tempfile.TemporaryDirectory() as root:
+            def git(*args):
+                subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                               cwd=root, check=True, capture_output=True)
+            git("init", "-q")
+            write(root, "a.py")
+            write(root, "sub/b.py")
+            git("add", ".")
+            git("commit", "-q", "-m", "base")
+            write(root, "sub/b.py", "y = 2\n")
+            write(root, "sub/new.java", "class A {}\n")
+            write(root, "notes.txt", "")
+
+            found = changed_files("HEAD", [os.path.join(root, "sub")], cwd=root)
+            self.assertEqual(sorted(os.path.basename(p) for p in found), ["b.py", "new.java"])
+            with self.assertRaises(RuntimeError):
+                changed_files("no-such-ref", [root], cwd=root)
+
+    def test_staged_reads_index_not_worktree(self):
+        with tempfile.TemporaryDirectory() as root:
+            def git(*args):
+                subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                               cwd=root, check=True, capture_output=True)
+            git("init", "-q")
+            write(root, "a.py")
+            write(root, "Old.java", "class A {}\n")
+            git("add", ".")
+            git("commit", "-q", "-m", "base")
+            write(root, "a.py", "if x\n    pass\n")
+            git("add", "a.py")
+            write(root, "a.py", "x = 1\n")          # unstaged fix must not hide the error
+            write(root, "b.c", "int x = 1;\n")
+            git("add", "b.c")
+            git("mv", "Old.java", "New.java")
+            write(root, "untracked.py")
+
+            staged = dict(staged_files([root], cwd=root))
+            results, summary = run_batch(list(staged.items()), workers=1)
+
+        self.assertEqual(sorted(os.path.basename(p) for p in staged), ["New.java", "a.py", "b.c"])
+        self.assertEqual(staged[os.path.relpath(os.path.join(root, "a.py"))], b"if x\n    pass\n")
+        self.assertEqual(summary["files_with_errors"], 1)
+
+
+class TestReportFormats(unittest.TestCase):
+    RESULTS = [
+        {"path": "./pkg/bad.py", "language": "Python", "predicted_error": "MissingColon",
+         "has_errors": True, "lines": 2, "error": None,
+         "issues": [{"type": "MissingColon", "line": 1, "message": "Missing ':' <here> & there"}]},
+        {"path": "Bad.java", "language": "Java", "predicted_error": "MissingDelimiter",
+         "has_errors": True, "lines": 3, "error": None, "issues": []},
+        {"path": "ok.c", "language": "C", "predicted_error": "NoError",
+         "has_errors": False, "lines": 1, "error": None, "issues": []},
+    ]
+    SUMMARY = {"files": 3, "files_with_errors": 2, "unreadable": 0, "lines": 6,
+               "analyzed": 3, "by_language": {}, "elapsed": 0.1}
+
+    def render(self, fmt):
+        out = io.StringIO()
+        writer = get_writer(fmt, out)
+        writer.begin()
+        for result in self.RESULTS:
+            writer.write(result)
+        writer.end(self.SUMMARY)
+        return out.getvalue()
+
+    def test_jsonl(self):
+        records = [json.loads(line) for line in self.render("jsonl").splitlines()]
+        self.assertEqual([r["type"] for r in records], ["file", "file", "file", "summary"])
+        self.assertEqual(records[3]["files_with_errors"], 2)
+
+    def test_sarif(self):
+        log = json.loads(self.render("sarif"))
+        results = log["runs"][0]["results"]
+        self.assertEqual(log["version"], "2.1.0")
+        self.assertEqual([r["ruleId"] for r in results], ["MissingColon", "MissingDelimiter"])
+        location = results[0]["locations"][0]["physicalLocation"]
+        self.assertEqual(location["artifactLocation"]["uri"], "pkg/bad.py")
+        self.assertEqual(location["region"]["startLine"], 1)
+
+    def test_junit(self):
+        root = ET.fromstring(self.render("junit"))
+        cases = root.findall("./testsuite/testcase")
+        self.assertEqual(len(cases), 3)
+        self.assertEqual(len(root.findall("./testsuite/testcase/failure")), 2)
+        self.assertIn("<here>", cases[0].find("failure").text)
+
+    def test_exit_codes(self):
+        with tempfile.TemporaryDirectory() as root:
+            write(root, "ok.py")
+            cache_dir = os.path.join(root, ".cache")
+            for files, expected in [(["ok.py"], cli.EXIT_OK), (["ok.py", "bad.py"], cli.EXIT_ERRORS_FOUND),
+                                    (["missing/"], cli.EXIT_FAILURE)]:
+                write(root, "bad.py", "while True\n    pass\n")
+                args = [os.path.join(root, f) for f in files] + ["--format", "jsonl", "--cache-dir", cache_dir]
+                with redirect_stdout(io.StringIO()), self.assertRaises(SystemExit) as ctx:
+                    cli.main(args + ["-j", "1"])
+                self.assertEqual(ctx.exception.code, expected, files)
+
+
+class TestIngest(unittest.TestCase):
+    def test_sniff_encoding(self):
+        self.assertEqual(sniff_encoding("x = 1".encode("utf-16")), "utf-16")
+        self.assertEqual(sniff_encoding(b"\xef\xbb\xbfx = 1"), "utf-8-sig")
+        self.assertEqual(sniff_encoding(b"# -*- coding: latin-1 -*-\nx = '\xff'"), "iso8859-1")
+        self.assertEqual(sniff_encoding("x = 'é'".encode("utf-8")[:-1]), "utf-8")
+        self.assertEqual(sniff_encoding(b"x = '\xe9'\n"), "cp1252")
+
+    def test_binary_detection(self):
+        self.assertTrue(is_binary(bytes(range(256))))
+        self.assertFalse(is_binary("def f():\n\tpass\n".encode("utf-16")))
+        self.assertFalse(is_binary(b""))
+
+    def test_non_utf8_file_is_checked(self):
+        result = analyze_bytes("a.py", "if x\n    y = 'é'\n".encode("utf-16"))
+        self.assertEqual(result["predicted_error"], "MissingColon")
+        self.assertEqual(analyze_bytes("b.py", b"\x00\x01\x02" * 100)["skipped"], "binary")
+
+    def test_size_policy(self):
+        code = b"def f():\n    return (1\n" * 10
+        streamed = analyze_source(SourceFile.from_bytes("a.py", code, policy="stream", max_bytes=64))
+        self.assertEqual(streamed["predicted_error"], "UnmatchedBracket")
+        self.assertEqual(streamed["lines"], 20)
+        skipped = analyze_source(SourceFile.from_bytes("a.py", code, policy="skip", max_bytes=64))
+        self.assertEqual(skipped["skipped"], "too large")
+        self.assertTrue(SourceFile.from_bytes("vendor/a.py", code * 2000).oversized)
+
+    def test_mmap_large_file(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = write(root, "big.py", "x = 1\n" * 300000)
+            with open_source(path) as source:
+                self.assertTrue(source.mapped)
+                self.assertEqual(sum(len(t) for t in source.iter_text()), 1800000)
+
+
+class TestDiffChecker(unittest.TestCase):
+    BASE = "".join(f"def f{i}():\n    return {i}\n\n" for i in range(200))
+
+    def diff(self, old, new, line):
+        return (f"--- a/big.py\n+++ b/big.py\n@@ -{line},1 +{line},1 @@\n"
+                f"-{old}\n+{new}\n")
+
+    def test_parse_unified_diff(self):
+        patches = parse_unified_diff(self.diff("def f1():", "def f1()", 4))
+        self.assertEqual(patches[0]["old_path"], "big.py")
+        self.assertEqual(patches[0]["hunks"][0]["lines"], [("-", "def f1():"), ("+", "def f1()")])
+
+    def test_line_check_without_full_parse(self):
+        report = check_diff(self.diff("def f1():", "def f1()", 4), {"big.py": self.BASE})
+        entry = report["files"][0]
+        self.assertEqual([(i["type"], i["line"]) for i in entry["issues"]], [("MissingColon", 4)])
+        self.assertEqual(entry["full_checks"], [])
+
+    def test_bracket_change_triggers_full_check(self):
+        report = check_diff(self.diff("    return 1", "    return (1", 5), {"big.py": self.BASE})
+        entry = report["files"][0]
+        self.assertIn("brackets", entry["full_checks"])
+        self.assertTrue(entry["has_errors"])
+        self.assertTrue(all(abs(i["line"] - 5) <= 3 for i in entry["issues"] if i.get("line")))
+
+    def test_brackets_in_strings_and_comments_ignored(self):
+        for new in ('    return "(" + str(1)', "    return 1  # )"):
+            entry = check_diff(self.diff("    return 1", new, 5), {"big.py": self.BASE})["files"][0]
+            self.assertEqual(entry["full_checks"], [], new)
+            self.assertFalse(entry["has_errors"], new)
+
+    def test_deletion_only_hunk(self):
+        base = "def g():\n    return (1,\n            2)\n\n" + self.BASE
+        diff = "--- a/big.py\n+++ b/big.py\n@@ -2,2 +2,1 @@\n     return (1,\n-            2)\n"
+        entry = check_diff(diff, {"big.py": base})["files"][0]
+        self.assertEqual(entry["changed_lines"], 1)
+        self.assertIn("brackets", entry["full_checks"])
+        self.assertTrue(entry["has_errors"])
+        self.assertIn(("UnmatchedBracket", 2), [(i["type"], i["line"]) for i in entry["issues"]])
+
+    def test_semicolon_message_matches_detector(self):
+        base = "class A {\n    int x = 1;\n}\n"
+        diff = "--- a/A.java\n+++ b/A.java\n@@ -2,1 +2,1 @@\n-    int x = 1;\n+    int x = 1\n"
+        issues = check_diff(diff, {"A.java": base})["files"][0]["issues"]
+        self.assertEqual(issues, detect_all(base.replace("1;", "1"), "Java"))
+
+    def test_clean_change_and_applied_content(self):
+        diff = self.diff("    return 1", "    return 11", 5)
+        applied = self.BASE.replace("    return 1\n", "    return 11\n", 1)
+        for base in (self.BASE, applied):
+            self.assertFalse(check_diff(diff, {"big.py": base})["has_errors"])
+
+    def test_mismatched_base(self):
+        with self.assertRaises(DiffApplyError):
+            check_diff(self.diff("nope", "still nope", 5), {"big.py": self.BASE})
+        with self.assertRaises(KeyError):
+            check_diff(self.diff("def f1():", "def f1()", 4), {})
+
+    def test_cli_diff_mode(self):
+        with tempfile.TemporaryDirectory() as root:
+            write(root, "big.py", self.BASE)
+            diff_path = write(root, "change.diff", self.diff("def f1():", "def f1()", 4))
+            out = io.StringIO()
+            with redirect_stdout(out), self.assertRaises(SystemExit) as ctx:
+                cli.main(["--diff", diff_path, "--base-dir", root])
+            self.assertEqual(ctx.exception.code, cli.EXIT_ERRORS_FOUND)
+            self.assertIn("big.py:4: MissingColon", out.getvalue())
+
+
+class TestFileWatcher(unittest.TestCase):
+    def test_polling_reports_changes_and_removals(self):
+        with tempfile.TemporaryDirectory() as root:
+            a = write(root, "a.py")
+            gone = write(root, "gone.c", "int x;\n")
+            write(root, ".gitignore", "ignored/\n")
+            watcher = FileWatcher([root], interval=0.05, debounce=0.1, use_watchdog=False)
+            self.assertEqual(len(watcher.files()), 2)
+            self.assertEqual(watcher.wait(timeout=0.2), ([], []))
+
+            write(root, "a.py", "x = 2  # longer\n")
+            os.remove(gone)
+            new = write(root, "pkg/new.java", "class A {}\n")
+            write(root, "ignored/skip.py")
+            write(root, "notes.txt")
+            changed, removed = watcher.wait(timeout=5)
+            watcher.close()
+
+        rel = lambda paths: sorted(os.path.basename(p) for p in paths)
+        self.assertEqual(rel(changed), ["a.py", "new.java"])
+        self.assertEqual(rel(removed), ["gone.c"])
+        self.assertIn(os.path.abspath(new), {os.path.abspath(p) for p in changed})
+        self.assertTrue(os.path.abspath(a) in {os.path.abspath(p) for p in changed})
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets required")
+class TestCheckerDaemon(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as root:
+            sock_path = os.path.join(root, "d.sock")
+            daemon = CheckerDaemon(sock_path, cache_entries=2)
+            daemon.bind()
+            thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+            thread.start()
+            try:
+                with DaemonClient(sock_path) as client:
+                    self.assertEqual(client.ping()["pid"], os.getpid())
+                    result = client.check("if x\n    pass\n", "a.py")
+                    self.assertEqual(result["predicted_error"], "MissingColon")
+                    report = client.report("class A {\n    int x = 1\n}\n", "A.java")
+                    self.assertEqual(report["detection"]["predicted_error"], "MissingDelimiter")
+                    self.assertIn("quality_score", report["quality"])
+                    path = write(root, "ok.py")
+                    self.assertFalse(client.analyze_file(path)["has_errors"])
+                    with self.assertRaises(RuntimeError):
+                        client.request({"op": "nope"})
+                    self.assertLessEqual(client.ping()["cached"], 2)
+                    client.shutdown()
+                thread.join(timeout=5)
+                self.assertFalse(os.path.exists(sock_path))
+            finally:
+                daemon.stop()
+            with self.assertRaises(DaemonUnavailable):
+                DaemonClient(sock_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -50,6 +50,334 @@ class TestSyntaxChecker(unittest.TestCase):
         success, error = try_ast_parse(code)
         self.assertFalse(success)
 
+class TestRuleRegistry(unittest.TestCase):
+    def tearDown(self):
+        from src.syntax_checker import RULES
+        for rule in RULES.values():
+            rule.enabled = True
+
+    def test_rules_run_per_language(self):
+        from src.syntax_checker import first_issue
+        self.assertEqual([i["type"] for i in detect_all("int x = 1\n", "Java")], ["MissingDelimiter"])
+        self.assertIsNone(first_issue("int x = 1;\n", "Java"))
+        self.assertEqual(detect_all("if x\n", "Java"), [])  # Python rules do not run
+
+    def test_disabled_rule_is_skipped(self):
+        from src.syntax_checker import disabled_rules, set_rule_enabled
+        code = "if x\n    pass\n"
+        self.assertIn("Probable missing ':'", detect_all(code)[0]["message"])
+        set_rule_enabled("missing_colon", False)
+        self.assertEqual(disabled_rules(), ["missing_colon"])
+        # The parser still reports it, the line rule does not
+        self.assertEqual([i["message"][:8] for i in detect_all(code)], ["expected"])
+
+    def test_rule_stats(self):
+        from src.syntax_checker import reset_rule_stats, rule_stats
+        reset_rule_stats()
+        detect_all("def f():\n    return (1,\n")
+        stats = {s["name"]: s for s in rule_stats()}
+        self.assertEqual(stats["missing_colon"]["calls"], 1)
+        self.assertEqual(stats["missing_semicolon"]["calls"], 0)
+        self.assertGreater(stats["ast.parse (shared)"]["cpu_ms"], 0)
+
+
+class TestIssueRecord(unittest.TestCase):
+    def test_reads_like_a_dict(self):
+        import json
+        import pickle
+        from src.syntax_checker import Issue, json_default
+        issue = detect_all("if x\n    pass\n")[0]
+        self.assertIsInstance(issue, Issue)
+        self.assertEqual((issue["type"], issue.get("line"), issue.get("raw", "-")), ("MissingColon", 1, "-"))
+        self.assertEqual(dict(issue), issue.to_dict())
+        self.assertEqual(issue, issue.to_dict())
+        self.assertEqual(json.loads(json.dumps([issue], default=json_default)), [issue.to_dict()])
+        self.assertEqual(pickle.loads(pickle.dumps(issue)), issue)
+
+    def test_issues_without_line_sort_last(self):
+        issues = detect_all("x = (1,\nif x\n")
+        self.assertIsNone(issues[-1].line)
+        self.assertEqual(issues[0].line, 1)
+
+
+class TestColumnarResult(unittest.TestCase):
+    CODE = "if x\n    y = (1]\nif z\n    w = 2\n"
+
+    def test_columns_rebuild_the_issues(self):
+        from src.multi_error_detector import detect_all_errors
+        full = detect_all_errors(self.CODE, "a.py", ml=("NoError", 0))
+        compact = detect_all_errors(self.CODE, "a.py", ml=("NoError", 0), compact=True)
+        self.assertNotIn("errors_by_type", compact)
+        columns, texts = compact["issues"], compact["messages"]
+        rebuilt = [(compact["types"][t], line, col, texts[m], texts[s] if s is not None else None)
+                   for t, line, col, m, s in zip(columns["type"], columns["line"], columns["col"],
+                                                 columns["message"], columns["suggestion"])]
+        self.assertEqual(rebuilt, [(i["type"], i["line"], i["col"], i["message"], i["suggestion"])
+                                   for i in full["rule_based_issues"]])
+        self.assertEqual(len(texts), len(set(texts)))  # the repeated colon message is stored once
+        self.assertEqual((compact["total_errors"], compact["has_errors"]), (full["total_errors"], True))
+
+    def test_tutor_text_is_shared(self):
+        from src.multi_error_detector import columnar_result
+        from src.tutor_explainer import explain_error
+        rows = [("UnclosedQuotes", None, None, "m", None), ("UnclosedString", 3, None, "m", None),
+                ("UnclosedQuotes", 5, 2, "n", "s")]
+        compact = columnar_result("Python", rows, 3)
+        self.assertEqual(compact["types"], ["UnclosedQuotes", "UnclosedString"])
+        # Both types have the same explanation: it is sent once
+        self.assertEqual(compact["type_tutor"], [0, 0])
+        self.assertEqual(compact["tutors"], [explain_error("UnclosedString")])
+        self.assertEqual(compact["issues"]["message"], [0, 0, 1])
+
+
+class TestBracketScanner(unittest.TestCase):
+    def test_strings_and_comments_are_skipped(self):
+        from src.syntax_checker import detect_unmatched_brackets
+        code = 'print("(")  # )\ns = """\n ] {\n"""\nx = ("a\\" (" + \'[\'\n'
+        self.assertEqual([(i["line"], i["col"]) for i in detect_unmatched_brackets(code)], [(5, 5)])
+
+    def test_c_family_lexer(self):
+        from src.syntax_checker import detect_unmatched_brackets
+        code = "int a = f('(');  // )\n/* {\n } */ char *s = \"[\";\nif (x) {\n"
+        issues = detect_unmatched_brackets(code, "C")
+        self.assertEqual([(i["line"], i["col"]) for i in issues], [(4, 8)])
+
+    def test_fstring_replacement_fields(self):
+        from src.syntax_checker import detect_unmatched_brackets
+        # PEP 701: the field reuses the enclosing quote; its brackets are code
+        code = 'v = f"{d["(k"]:>{w}}" + f\'{{(}}\'\nmsg = f"""{ (a,\n  b) } ("""\nx = (1\n'
+        self.assertEqual([(i["line"], i["col"]) for i in detect_unmatched_brackets(code)], [(4, 5)])
+
+    def test_skipped_blocks_keep_locations(self):
+        from src.syntax_checker import BracketScanner, detect_unmatched_brackets
+        lines = [f"def f{i}(a):\n    return [a, {{'k': (a, \"]\")}}]\n" for i in range(300)]
+        lines[50] = "def f(a):\n    return [a, (1]\n"
+        lines[200] = "x = {\n"
+        code = "".join(lines)
+        scanner = BracketScanner()
+        expected = [i for n, line in enumerate(code.splitlines(), 1) for i in scanner.feed_line(n, line)]
+        expected += scanner.finish()
+        self.assertEqual([i["line"] for i in expected], [102, 102, 102, 401])
+        self.assertEqual(detect_unmatched_brackets(code), expected)
+
+    def test_fast_path_agrees_with_line_scanner(self):
+        import random
+        from src.syntax_checker import BracketScanner, brackets_balanced
+        rng = random.Random(11)
+        pieces = list("()[]{}\"'#\n\\x") + ['"""', "\'\'\'", "/*", "*/", "//"]
+        for language in ("Python", "Java", "C"):
+            for _ in range(2000):
+                code = "".join(rng.choice(pieces) for _ in range(rng.randrange(1, 20)))
+                scanner = BracketScanner(language)
+                issues = [i for n, line in enumerate(code.splitlines(), 1) for i in scanner.feed_line(n, line)]
+                self.assertEqual(brackets_balanced(code, language), not (issues or scanner.stack), (language, code))
+
+
+class TestSyntaxRecovery(unittest.TestCase):
+    CODE = ("import os\n\ndef a(x)\n    return x\n\nclass B:\n    def m(self):\n        return = 1\n\n"
+            "def c():\n    pass\n\nz = = 4\n")
+
+    def test_reports_independent_errors(self):
+        from src.syntax_checker import recover_syntax_errors
+        self.assertEqual([e.lineno for e in recover_syntax_errors(self.CODE)], [3, 8, 13])
+        parser_issues = [i for i in detect_all(self.CODE, recover=True) if "<unknown>" in i["message"]]
+        self.assertEqual([i["line"] for i in parser_issues], [3, 8, 13])
+        self.assertEqual(len([i for i in detect_all(self.CODE) if "<unknown>" in i["message"]]), 1)
+
+    def test_tokenizer_error_does_not_hide_earlier_errors(self):
+        from src.syntax_checker import recover_syntax_errors
+        # CPython reports the unterminated string on line 14 first
+        code = "x = = 1\n" + "y = 1\n" * 10 + "def g():\nz = 1\ns = '''abc\n"
+        self.assertEqual([e.lineno for e in recover_syntax_errors(code)], [1, 13, 14])
+        self.assertEqual([e.lineno for e in recover_syntax_errors("x = = 1\n\nfoo(\n")], [1, 3])
+
+    def test_messages_use_file_line_numbers(self):
+        from src.syntax_checker import recover_syntax_errors
+        body = "y = 1\n" * 10 + "def g():\nz = 1\n"
+        errors = recover_syntax_errors("x = = 1\n" + body + "s = '''abc\n")
+        ok, whole = try_ast_parse("x = 1\n" + body)
+        self.assertEqual(str(errors[1]), str(whole))
+        self.assertIn("on line 12", errors[1].msg)
+
+    def test_windows_match_block_by_block_parse(self):
+        import random
+        from src import syntax_checker
+        rng = random.Random(2)
+        blocks = ["def f(a):\n    return (a +\n        1)\n", "x = = 1\n", "if x:\n    y = 1\nelse:\n    y = 2\n",
+                  "def g(a)\n    return a\n", "s = '''(\n'''\n", "@dec\ndef h():\n    pass\n"]
+        old_window = syntax_checker.RECOVERY_WINDOW
+        syntax_checker.RECOVERY_WINDOW = 3
+        try:
+            for _ in range(100):
+                chosen = [rng.choice(blocks) for _ in range(rng.randrange(1, 20))]
+                expected, line = [], 1
+                for block in chosen:
+                    ok, exc = try_ast_parse(block)
+                    if not ok:
+                        expected.append(exc.lineno + line - 1)
+                    line += block.count("\n") + 1
+                errors = syntax_checker.recover_syntax_errors("\n".join(chosen))
+                self.assertEqual([e.lineno for e in errors], expected)
+        finally:
+            syntax_checker.RECOVERY_WINDOW = old_window
+
+    def test_recover_profile(self):
+        from src.batch_checker import analyze_report
+        issues = analyze_report(self.CODE, "a.py", profile="recover")["detection"]["rule_based_issues"]
+        self.assertEqual(sorted({i["line"] for i in issues if "<unknown>" in i["message"]}), [3, 8, 13])
+
+
+class TestParallelBlocks(unittest.TestCase):
+    def test_split_at_top_level_statements(self):
+        from src.syntax_checker import split_top_level
+        code = "x = (1,\n2)\n@dec\ndef f():\n    pass\nif a:\n    b\nelse:\n    c\ns = \'\'\'\ny\n\'\'\'\nz = 1\n"
+        chunks = split_top_level(code, 20)
+        self.assertEqual("".join(text for _, text in chunks), code)
+        self.assertEqual([first for first, _ in chunks], [1, 3, 6, 10, 13])
+
+    def test_matches_serial_run(self):
+        import random
+        from src import syntax_checker
+        rng = random.Random(5)
+        blocks = ["def f(a):\n    return (a +\n        1)\n", "x = = 1\n", "def g(a)\n    return a\n",
+                  "y = [1,\n", "]\n", "z = 1 + \\\n2\n", "from __future__ import annotations\n", "t = 'a\n"]
+        old_min = syntax_checker.PARALLEL_MIN_LINES
+        syntax_checker.PARALLEL_MIN_LINES = 5
+        try:
+            for _ in range(30):
+                code = "".join(rng.choice(blocks) for _ in range(rng.randrange(5, 30)))
+                for recover in (False, True):
+                    self.assertEqual(detect_all(code, recover=recover, workers=2),
+                                     detect_all(code, recover=recover, workers=1), code)
+        finally:
+            syntax_checker.PARALLEL_MIN_LINES = old_min
+
+    def test_no_pool_inside_a_worker(self):
+        from unittest import mock
+        from src import syntax_checker
+        self.assertNotEqual(syntax_checker.BLOCK_POOL_START_METHOD, "fork")
+        code = "x = = 1\n" * 10
+        with mock.patch.object(syntax_checker, "PARALLEL_MIN_LINES", 5), \
+                mock.patch.object(syntax_checker.multiprocessing, "parent_process", return_value=object()), \
+                mock.patch.object(syntax_checker, "_run_blocks") as run_blocks:
+            detect_all(code, workers=2)
+        run_blocks.assert_not_called()
+
+
+class TestStreamingChecker(unittest.TestCase):
+    def test_chunked_matches_whole_file(self):
+        from src.stream_checker import check_stream
+        from src.syntax_checker import detect_missing_colon, detect_unmatched_brackets
+        code = "def a()\n    x = (1,\n         2\nif x:\r\n    y = [1]]\n"
+        chunks = [code[i:i + 3] for i in range(0, len(code), 3)]
+        result = check_stream(chunks, filename="a.py")
+        expected = detect_missing_colon(code) + detect_unmatched_brackets(code)
+        self.assertEqual(
+            sorted((i["type"], i["line"]) for i in result["issues"]),
+            sorted((i["type"], i["line"]) for i in expected)
+        )
+        self.assertEqual(result["total_lines"], len(code.splitlines()))
+
+    def test_issue_cap(self):
+        from src.stream_checker import check_stream
+        result = check_stream([b"if x\n" * 50], filename="a.py", max_issues=10)
+        self.assertEqual(result["total_issues"], 10)
+        self.assertTrue(result["truncated"])
+
+class TestIncrementalChecker(unittest.TestCase):
+    SOURCE = "".join(f"def f{i}(a):\n    x = (a +\n         1)\n    return x\n\n" for i in range(2000))
+
+    def test_edit_cost_is_local(self):
+        from src.syntax_checker import IncrementalChecker
+        checker = IncrementalChecker(self.SOURCE)
+        self.assertEqual(checker.check(), [])
+        checker.replace_lines(5003, 5004, ["    return x + 1"])
+        self.assertEqual(checker.check(), [])
+        self.assertEqual((checker.last_scanned, checker.last_parse), (1, "region"))
+        # An unclosed bracket changes the state of every later line
+        checker.replace_lines(5002, 5003, ["         1"])
+        self.assertEqual([(i["type"], i["line"]) for i in checker.check()], [("UnmatchedBracket", 5002)])
+        checker.replace_lines(5002, 5003, ["         1)"])
+        self.assertEqual(checker.check(), [])
+        self.assertEqual(checker.last_scanned, len(checker.lines) - 5002)  # ... and back
+        checker.replace_lines(5003, 5004, ["    return x x"])
+        self.assertEqual([(i["type"], i["line"]) for i in checker.check()], [("SyntaxError", 5004)])
+        self.assertEqual(checker.last_parse, "region")
+
+    def test_region_messages_match_full_parse(self):
+        from src.syntax_checker import IncrementalChecker
+        checker = IncrementalChecker("".join(f"def f{i}(a):\n    return a\n\n" for i in range(20)))
+        self.assertEqual(checker.check(), [])
+        checker.replace_lines(16, 17, ["pass"])  # the body of f5 is gone
+        for _ in range(2):
+            issues = checker.check()
+            self.assertEqual(checker.last_parse, "region")
+            ok, exc = try_ast_parse("\n".join(checker.lines) + "\n")
+            self.assertEqual([(i["line"], i["message"]) for i in issues], [(exc.lineno, str(exc))])
+            # Lines added above move the error and the line its message quotes
+            checker.replace_lines(3, 3, ["import os", "import re"])
+        self.assertIn("on line 18", issues[0]["message"])
+
+    def test_matches_fresh_check(self):
+        import random
+        from src.syntax_checker import IncrementalChecker
+        rng = random.Random(7)
+        pieces = ["x = (", ")", "if y", "if y:", "    pass", "", "z = [1, 2]", "def f():", "pass", "'''", "]"]
+        checker = IncrementalChecker(self.SOURCE[:2000])
+        checker.check()
+        for _ in range(200):
+            start = rng.randrange(len(checker.lines))
+            end = min(len(checker.lines), start + rng.randrange(3))
+            new = [rng.choice(pieces) for _ in range(rng.randrange(1, 3))]
+            checker.replace_lines(start, end, new)
+            fresh = IncrementalChecker("\n".join(checker.lines))
+            self.assertEqual(checker.check(), fresh.check())
+
+class TestIncrementalVectorizer(unittest.TestCase):
+    def setUp(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        # Same settings as the shipped model
+        corpus = ["int x = 1;\n  return (a+b);", "def f(x):\n\treturn x", "É café }", "y = [1, 2]\n"]
+        self.vectorizer = TfidfVectorizer(analyzer="char", ngram_range=(1, 3), sublinear_tf=True,
+                                          max_features=8000).fit(corpus)
+
+    def test_matches_full_vectorization(self):
+        import random
+        import numpy as np
+        from src.ml_engine import IncrementalVectorizer
+        rng = random.Random(3)
+        pieces = ["", " ", "  ", "\t", "int x = 1;", "  return (a+b);", "x", "}", "  \t ", "É café", " y "]
+        incremental = IncrementalVectorizer("\n".join(rng.choice(pieces) for _ in range(20)), tfidf=self.vectorizer)
+        for _ in range(500):
+            start = rng.randrange(len(incremental.lines) + 1)
+            end = min(len(incremental.lines), start + rng.randrange(3))
+            new = [rng.choice(pieces) for _ in range(rng.randrange(3))]
+            if len(incremental.lines) - (end - start) + len(new) == 0:
+                new = [""]
+            incremental.replace_lines(start, end, new)
+            expected = self.vectorizer.transform([incremental.text]).toarray()
+            self.assertTrue(np.allclose(incremental.transform().toarray(), expected))
+
+    def test_edit_recounts_only_nearby_lines(self):
+        from src.ml_engine import IncrementalVectorizer
+        incremental = IncrementalVectorizer("int x = 1;\n" * 2000, tfidf=self.vectorizer)
+        self.assertTrue(incremental.incremental)
+        incremental.replace_lines(1000, 1001, ["int y = 2;"])
+        self.assertLessEqual(incremental.last_recounted, 2)
+
+    def test_other_analyzers_use_full_vectorizer(self):
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from src.ml_engine import IncrementalVectorizer
+        code = "int x = 1;\nreturn x;"
+        words = TfidfVectorizer(analyzer="word").fit([code, "int y;"])
+        incremental = IncrementalVectorizer(code, tfidf=words)
+        self.assertFalse(incremental.incremental)
+        incremental.replace_lines(1, 2, ["return y;"])
+        expected = words.transform(["int x = 1;\nreturn y;"]).toarray()
+        self.assertTrue(np.allclose(incremental.transform().toarray(), expected))
+        self.assertTrue(IncrementalVectorizer("", tfidf=self.vectorizer).incremental)
+
 class TestErrorEngine(unittest.TestCase):
     def test_python_error_detection(self):
         code = "def test()\n    pass"  # Missing colon
@@ -0,0 +1,184 @@
+"""
+Unit Tests for the Language Server
+"""
+import io
+import os
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lsp_server import Document, LanguageServer, read_message, write_message
+
+URI = "file:///tmp/demo.py"
+SOURCE = (
+    "import os\n"
+    "\n"
+    "def first(x):\n"
+    "    return x\n"
+    "\n"
+    "def second(y)\n"
+    "    return y\n"
+)
+
+
+def frame(*messages):
+    stream = io.BytesIO()
+    for message in messages:
+        write_message(stream, dict(message, jsonrpc="2.0"))
+    stream.seek(0)
+    return stream
+
+
+def read_all(stream):
+    stream.seek(0)
+    messages = []
+    while True:
+        message = read_message(stream)
+        if message is None:
+            return messages
+        messages.append(message)
+
+
+class TestDocument(unittest.TestCase):
+    def test_incremental_edits(self):
+        doc = Document(URI, "a = 1\nb = 2\n")
+        doc.apply_change({"range": {"start": {"line": 0, "character": 4}, "end": {"line": 1, "character": 4}},
+                          "text": "10\nc = "})
+        self.assertEqual(doc.lines, ["a = 10", "c = 2", ""])
+        doc.apply_change({"text": "x = 1"})
+        self.assertEqual(doc.lines, ["x = 1"])
+
+    def test_utf16_positions(self):
+        # "😀" is two UTF-16 code units but one code point
+        doc = Document(URI, "s = '😀x'\n")
+        doc.apply_change({"range": {"start": {"line": 0, "character": 7}, "end": {"line": 0, "character": 8}},
+                          "text": "y"})
+        self.assertEqual(doc.lines[0], "s = '😀y'")
+
+    def test_edit_rechecks_only_affected_lines(self):
+        doc = Document(URI, SOURCE.replace("second(y)", "second(y):"))
+        self.assertEqual(doc.analyze(), [])
+        self.assertEqual(doc.checker.last_parse, "full")
+        colon = {"start": {"line": 5, "character": 13}, "end": {"line": 5, "character": 14}}
+        doc.apply_change({"range": colon, "text": ""})
+        self.assertEqual([(i["type"], i["line"]) for i in doc.analyze()], [("MissingColon", 6)])
+        # Restore it: one line is rescanned and only its block is parsed
+        doc.apply_change({"range": dict(colon, end=colon["start"]), "text": ":"})
+        self.assertEqual(doc.analyze(), [])
+        self.assertEqual(doc.checker.last_scanned, 1)
+        self.assertEqual(doc.checker.last_parse, "region")
+
+
+    def test_other_languages_keep_an_incremental_vectorizer(self):
+        doc = Document("file:///tmp/Main.java", "int x = 1;\nint y = 2;\n")
+        doc.analyze()
+        if doc.vectorizer is None:
+            self.skipTest("TF-IDF vectorizer not available")
+        doc.apply_change({"range": {"start": {"line": 1, "character": 9}, "end": {"line": 1, "character": 10}},
+                          "text": ""})
+        self.assertIn("MissingDelimiter", {i["type"] for i in doc.analyze()})
+        self.assertEqual(doc.vectorizer.text, doc.text)
+
+
+class TestLanguageServer(unittest.TestCase):
+    def open_server(self):
+        server = LanguageServer(io.BytesIO(), io.BytesIO(), debounce=0)
+        server.dispatch({"id": 1, "method": "initialize", "params": {"capabilities": {}}})
+        server.dispatch({"method": "textDocument/didOpen", "params": {"textDocument": {
+            "uri": URI, "languageId": "python", "version": 1, "text": SOURCE}}})
+        server.flush()
+        return server
+
+    def published(self, server):
+        return [m["params"] for m in read_all(server.writer) if m.get("method") == "textDocument/publishDiagnostics"]
+
+    def test_diagnostics_and_quick_fix(self):
+        server = self.open_server()
+        diagnostics = self.published(server)[-1]["diagnostics"]
+        errors = [d for d in diagnostics if d["severity"] == 1]
+        self.assertEqual(errors[0]["code"], "MissingColon")
+        self.assertEqual(errors[0]["range"]["start"]["line"], 5)
+
+        server.dispatch({"id": 2, "method": "textDocument/codeAction", "params": {
+            "textDocument": {"uri": URI}, "range": errors[0]["range"],
+            "context": {"diagnostics": errors}}})
+        response = [m for m in read_all(server.writer) if m.get("id") == 2][0]
+        edit = response["result"][0]["edit"]["changes"][URI][0]
+        self.assertEqual(edit["range"]["start"], {"line": 5, "character": 0})
+        self.assertEqual(edit["newText"], "def second(y):\n")
+
+    def test_incremental_change_clears_diagnostics(self):
+        server = self.open_server()
+        server.dispatch({"method": "textDocument/didChange", "params": {
+            "textDocument": {"uri": URI, "version": 2},
+            "contentChanges": [{"range": {"start": {"line": 5, "character": 13},
+                                          "end": {"line": 5, "character": 13}}, "text": ":"}]}})
+        server.flush()
+        latest = self.published(server)[-1]
+        self.assertEqual(latest["version"], 2)
+        self.assertEqual([d for d in latest["diagnostics"] if d["severity"] == 1], [])
+
+    def test_edits_do_not_wait_for_analysis(self):
+        import threading
+        from unittest import mock
+        server = self.open_server()
+        started, release = threading.Event(), threading.Event()
+        analyze = Document.analyze
+
+        def slow_analyze(doc, snapshot=None):
+            started.set()
+            release.wait(5)
+            return analyze(doc, snapshot)
+
+        with mock.patch.object(Document, "analyze", slow_analyze):
+            server.schedule(URI, delay=0)
+            publisher = threading.Thread(target=server.flush)
+            publisher.start()
+            self.assertTrue(started.wait(5))
+            server.dispatch({"method": "textDocument/didChange", "params": {
+                "textDocument": {"uri": URI, "version": 2},
+                "contentChanges": [{"range": {"start": {"line": 5, "character": 13},
+                                              "end": {"line": 5, "character": 13}}, "text": ":"}]}})
+            self.assertTrue(publisher.is_alive())  # the edit went through mid-analysis
+            before = len(self.published(server))
+            release.set()
+            publisher.join(5)
+        # The stale result for version 1 is dropped; version 2 is published next
+        self.assertEqual(len(self.published(server)), before)
+        server.flush()
+        latest = self.published(server)[-1]
+        self.assertEqual(latest["version"], 2)
+        self.assertEqual([d for d in latest["diagnostics"] if d["severity"] == 1], [])
+
+    def test_quality_hints(self):
+        server = self.open_server()
+        hints = [d for d in self.published(server)[-1]["diagnostics"] if d["code"] == "Quality"]
+        self.assertEqual(hints, [])
+        server.dispatch({"method": "textDocument/didChange", "params": {
+            "textDocument": {"uri": URI, "version": 2},
+            "contentChanges": [{"text": "def camelCase():\n    pass\n"}]}})
+        server.dispatch({"method": "textDocument/didSave", "params": {"textDocument": {"uri": URI}}})
+        server.flush()
+        hints = [d for d in self.published(server)[-1]["diagnostics"] if d["code"] == "Quality"]
+        self.assertEqual(hints[0]["range"]["start"], {"line": 0, "character": 4})
+
+    def test_serve_lifecycle(self):
+        reader = frame(
+            {"id": 1, "method": "initialize", "params": {"capabilities": {}}},
+            {"method": "initialized", "params": {}},
+            {"id": 2, "method": "textDocument/hover", "params": {}},
+            {"id": 3, "method": "shutdown"},
+            {"method": "exit"},
+        )
+        server = LanguageServer(reader, io.BytesIO(), debounce=0)
+        self.assertEqual(server.serve(), 0)
+        responses = {m["id"]: m for m in read_all(server.writer) if "id" in m}
+        self.assertEqual(responses[1]["result"]["capabilities"]["textDocumentSync"]["change"], 2)
+        self.assertEqual(responses[2]["error"]["code"], -32601)
+        self.assertIsNone(responses[3]["result"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Unit Tests for Archive Scan Jobs
+"""
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import scan_jobs
+from src.scan_jobs import JobStore, iter_archive_members, check_member
+
+
+class TestArchiveMembers(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_zip_members(self):
+        path = os.path.join(self.tmp.name, "p.zip")
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("src/a.py", "x = 1\n")
+            zf.writestr("docs/readme.md", "skip me")
+            zf.writestr("Main.java", "int x = 1;\n")
+        members = dict(iter_archive_members(path))
+        self.assertEqual(set(members), {"src/a.py", "Main.java"})
+        self.assertEqual(members["src/a.py"], b"x = 1\n")
+
+    def test_tar_members_and_size_limit(self):
+        path = os.path.join(self.tmp.name, "p.tar.gz")
+        with tarfile.open(path, "w:gz") as tf:
+            for name, data in [("a.py", b"if x\n    y\n"), ("big.c", b"x" * 64)]:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tf.addfile(info, io.BytesIO(data))
+        old = scan_jobs.MAX_MEMBER_BYTES
+        scan_jobs.MAX_MEMBER_BYTES = 32
+        try:
+            members = dict(iter_archive_members(path))
+        finally:
+            scan_jobs.MAX_MEMBER_BYTES = old
+        self.assertIsNone(members["big.c"])
+        self.assertEqual(check_member("a.py", members["a.py"])["predicted_error"], "MissingColon")
+
+    def test_repeated_paths_yield_once(self):
+        import warnings
+        path = os.path.join(self.tmp.name, "p.zip")
+        with warnings.catch_warnings(), zipfile.ZipFile(path, "w") as zf:
+            warnings.simplefilter("ignore")  # "Duplicate name"
+            zf.writestr("a.py", "x = 1\n")
+            zf.writestr("a.py", "if x\n")
+        self.assertEqual(list(iter_archive_members(path)), [("a.py", b"x = 1\n")])
+        self.assertEqual(scan_jobs.count_archive_members(path), 1)
+
+
+class TestJobStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = JobStore(os.path.join(self.tmp.name, "jobs.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_results_pagination_and_progress(self):
+        self.store.create_job("j1", "p.zip", "/tmp/p.zip", owner="w1")
+        for i in range(5):
+            self.store.add_result("j1", f"f{i}.py", {"predicted_error": "NoError", "has_errors": i % 2 == 0})
+        job = self.store.get_job("j1")
+        self.assertEqual((job["done_files"], job["error_files"]), (5, 3))
+        page = self.store.get_results("j1", offset=2, limit=2)
+        self.assertEqual([r["path"] for r in page], ["f2.py", "f3.py"])
+        self.assertEqual(len(self.store.get_results("j1", errors_only=True)), 3)
+        self.assertEqual(self.store.done_paths("j1"), {f"f{i}.py" for i in range(5)})
+
+    def test_results_order(self):
+        self.store.create_job("j1", "p.zip", "/tmp/p.zip", owner="w1")
+        for name, bad in [("c.py", False), ("b.py", True), ("a.py", False), ("d.py", True)]:
+            self.store.add_result("j1", name, {"predicted_error": "X", "has_errors": bad})
+        self.assertEqual([r["path"] for r in self.store.get_results("j1", order="path")],
+                         ["a.py", "b.py", "c.py", "d.py"])
+        self.assertEqual([r["path"] for r in self.store.get_results("j1", order="errors", limit=2)],
+                         ["b.py", "d.py"])
+
+    def test_replaced_result_counted_once(self):
+        self.store.create_job("j1", "p.zip", "/tmp/p.zip", owner="w1")
+        self.store.add_result("j1", "a.py", {"predicted_error": "X", "has_errors": True})
+        self.store.add_result("j1", "b.py", {"predicted_error": "NoError", "has_errors": False})
+        self.store.add_result("j1", "a.py", {"predicted_error": "NoError", "has_errors": False})
+        job = self.store.get_job("j1")
+        self.assertEqual((job["done_files"], job["error_files"]), (2, 0))
+        self.assertEqual([r["path"] for r in self.store.get_results("j1")], ["a.py", "b.py"])
+
+    def test_claim_respects_live_owner(self):
+        self.store.create_job("j1", "p.zip", "/tmp/p.zip", owner="w1")
+        self.assertTrue(self.store.claim_job("j1", "w1"))
+        self.assertFalse(self.store.claim_job("j1", "w2"))
+        self.store.update_job("j1", updated_at=0)
+        self.assertTrue(self.store.claim_job("j1", "w2"))
+
+
+class TestJobManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = scan_jobs.JobManager(JobStore(os.path.join(self.tmp.name, "jobs.sqlite3")),
+                                            jobs_dir=self.tmp.name, workers=1)
+
+    def tearDown(self):
+        self.manager.stop()
+        self.manager.store.close()
+        self.tmp.cleanup()
+
+    def run_job(self, data):
+        job_id = self.manager.new_job_id()
+        path = self.manager.archive_path(job_id)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        self.manager.submit(job_id, "p.zip")
+        self.manager._run_job(job_id)
+        return self.manager.store.get_job(job_id), path
+
+    def test_archive_removed_when_job_finishes(self):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("README.txt", "no sources")
+        job, path = self.run_job(buf.getvalue())
+        self.assertEqual((job["status"], job["total_files"]), (scan_jobs.COMPLETED, 0))
+        self.assertFalse(os.path.exists(path))
+
+        job, path = self.run_job(b"not an archive")
+        self.assertEqual(job["status"], scan_jobs.FAILED)
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()